@@ -1,9 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
 
 import math
 import random
 import typer
 from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
 
 from letterboxd_recs.availability import (
     CARED_PROVIDER_COLUMNS,
@@ -11,9 +22,11 @@ from letterboxd_recs.availability import (
     parse_availability_sources,
     provider_column_from_arg,
 )
-from letterboxd_recs.config import load_config
-from letterboxd_recs.db import repo
+from letterboxd_recs.config import DEFAULT_CONFIG_PATH, load_config
+from letterboxd_recs.db import connections, repo
+from letterboxd_recs.db.bulk import bulk_load
 from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.writer import DbWriter
 from letterboxd_recs.export.html import (
     ExportFilm,
     film_identity_key,
@@ -21,15 +34,39 @@ from letterboxd_recs.export.html import (
     render_recs_html,
 )
 from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
+from letterboxd_recs.ingest.letterboxd.data_export import import_export as import_export_zip
 from letterboxd_recs.ingest.letterboxd.ingest import ingest_user
-from letterboxd_recs.ingest.letterboxd.social import parse_following_entries
-from letterboxd_recs.graph.ingest import ingest_follow_graph
-from letterboxd_recs.models.social_simple import compute_social_scores, compute_similarity_scores
-from letterboxd_recs.util.retry import retry
+from letterboxd_recs.ingest.letterboxd.orchestrator import format_eta, ingest_users
+from letterboxd_recs.ingest.letterboxd.schedule import (
+    AVAILABILITY_REQUESTS,
+    REFRESH_REQUESTS,
+    CostEstimate,
+    estimate_user_ingests,
+    schedule_refresh,
+    seconds_per_request,
+)
+from letterboxd_recs.graph.ingest import (
+    harvest_following,
+    ingest_follow_graph,
+    ingest_follow_graph_best_first,
+    refresh_follow_graph,
+)
+from letterboxd_recs.graph.plan import estimate_follow_graph, estimate_graph_refresh
+from letterboxd_recs.models.score_cache import cached_social_scores
+from letterboxd_recs.models.social_simple import compute_similarity_scores
+from letterboxd_recs.util.budget import BudgetExhausted, RequestBudget
+from letterboxd_recs.util.ratelimit import RateLimiter
 
 app = typer.Typer(add_completion=False)
 console = Console()
 
+# The similarity pool harvests this many candidates per user it wants to add.
+POOL_OVERSAMPLE = 3
+
+
+def _bulk(cfg, enabled: bool):
+    return bulk_load(cfg.database_path, cfg.database) if enabled else nullcontext()
+
 
 def _sort_results(results, sort: str):
     sort_val = sort.lower()
@@ -43,60 +80,212 @@ def _base_recommendations(
     username: str,
     sort: str,
     similar_user_limit: int | None = None,
+    recompute: bool = False,
 ):
-    results = compute_social_scores(
-        cfg.database_path,
+    results = cached_social_scores(
+        cfg,
         username,
-        weights=cfg.social,
-        rating_weights=cfg.social_ratings,
-        similarity=cfg.social_similarity,
-        normalize=cfg.social_normalize,
-        limit=None,
         similar_user_limit=similar_user_limit,
+        recompute=recompute,
     )
     return _sort_results(results, sort)
 
 
-def _refresh_usernames(cfg, usernames: list[str]) -> tuple[int, int]:
-    ok = 0
-    failed = 0
-    for username in usernames:
-        try:
-            ingest_user(
-                username,
-                cfg,
-                refresh=True,
-                include_diary=False,
-                include_films=True,
-                include_likes=False,
-                include_watchlist=True,
-            )
-            ok += 1
-        except Exception as exc:  # noqa: BLE001
-            failed += 1
-            console.print(f"[red]Refresh failed for {username}: {exc}[/red]")
-    return ok, failed
+def _refresh_usernames(
+    cfg,
+    usernames: list[str],
+    workers: int | None = None,
+    refresh: bool = True,
+    label: str = "Refreshing",
+    use_rss: bool = False,
+    budget: RequestBudget | None = None,
+) -> tuple[int, int]:
+    result = _ingest_with_progress(
+        cfg,
+        usernames,
+        workers=workers,
+        label=label,
+        budget=budget,
+        refresh=refresh,
+        use_rss=use_rss,
+        include_diary=False,
+        include_films=True,
+        include_likes=False,
+        include_watchlist=True,
+    )
+    return result.ok, result.failed
 
 
-def _refresh_all_users(cfg) -> tuple[int, int]:
+def _ingest_with_progress(cfg, usernames: list[str], workers: int | None, label: str, **kwargs):
+    columns = (
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("failed={task.fields[failed]}"),
+        TimeElapsedColumn(),
+        TextColumn("eta"),
+        TimeRemainingColumn(),
+    )
+    with Progress(*columns, console=console, transient=False) as progress:
+        task = progress.add_task(label, total=len(usernames), failed=0)
+
+        def on_progress(update) -> None:
+            progress.update(task, total=update.total, completed=update.done, failed=update.failed)
+            if update.error:
+                progress.console.print(
+                    f"[red]{label} failed for {update.username}: {update.error}[/red]"
+                )
+
+        result = ingest_users(
+            usernames,
+            cfg,
+            workers=workers,
+            on_progress=on_progress,
+            **kwargs,
+        )
+    if result.deferred:
+        console.print(
+            f"{label}: deferred {len(result.deferred)} users (failure backoff or request budget)"
+        )
+    return result
+
+
+def _refresh_all_users(
+    cfg,
+    workers: int | None = None,
+    use_rss: bool = False,
+    budget: RequestBudget | None = None,
+) -> tuple[int, int]:
     with repo.connect(cfg.database_path) as conn:
         usernames = repo.select_all_usernames(conn)
-    return _refresh_usernames(cfg, usernames)
+    return _refresh_usernames(cfg, usernames, workers=workers, use_rss=use_rss, budget=budget)
+
+
+def _refresh_scheduled(
+    cfg,
+    roots: list[str] | None,
+    max_requests: int | None,
+    time_budget_minutes: float | None,
+    workers: int | None = None,
+    use_rss: bool = False,
+    budget: RequestBudget | None = None,
+) -> tuple[int, int]:
+    plan = schedule_refresh(
+        cfg,
+        roots=roots,
+        max_requests=max_requests,
+        max_seconds=time_budget_minutes * 60 if time_budget_minutes is not None else None,
+    )
+    planned_requests = sum(item.requests for item in plan)
+    console.print(f"Refresh plan: users={len(plan)} requests~{planned_requests}")
+    full = [item.username for item in plan if item.full_ingest]
+    shallow = [item.username for item in plan if not item.full_ingest]
+    ok, failed = _refresh_usernames(cfg, shallow, workers=workers, use_rss=use_rss, budget=budget)
+    if full:
+        full_ok, full_failed = _refresh_usernames(
+            cfg,
+            full,
+            workers=workers,
+            refresh=False,
+            label="First ingest",
+            budget=budget,
+        )
+        ok += full_ok
+        failed += full_failed
+    return ok, failed
 
 
 def _refresh_similar_users(
     cfg,
     username: str,
     similar_user_limit: int,
+    workers: int | None = None,
+    use_rss: bool = False,
+    budget: RequestBudget | None = None,
 ) -> tuple[int, int]:
+    usernames = _similar_usernames(cfg, username, similar_user_limit)
+    return _refresh_usernames(cfg, usernames, workers=workers, use_rss=use_rss, budget=budget)
+
+
+def _similar_usernames(cfg, username: str, similar_user_limit: int) -> list[str]:
     scores = compute_similarity_scores(
         cfg.database_path,
         username,
         similarity=cfg.social_similarity,
         normalize_top=False,
     )
-    usernames = [username] + [entry.username for entry in scores[:similar_user_limit]]
-    return _refresh_usernames(cfg, usernames)
+    return [username] + [entry.username for entry in scores[:similar_user_limit]]
+
+
+def _estimate_weekly(
+    cfg,
+    username: str,
+    top_n: int,
+    new_users: int,
+    similar_users: int,
+    max_requests: int | None,
+    time_budget_minutes: float | None,
+    scheduled: bool,
+    graph_refresh: bool = False,
+) -> None:
+    if scheduled:
+        plan = schedule_refresh(
+            cfg,
+            roots=[username],
+            max_requests=max_requests,
+            max_seconds=time_budget_minutes * 60 if time_budget_minutes is not None else None,
+        )
+        requests = sum(item.requests for item in plan)
+        refresh_estimate = CostEstimate(
+            users=len(plan),
+            requests=requests,
+            browser_renders=requests if cfg.scrape.use_browser else 0,
+            seconds=requests * seconds_per_request(cfg),
+        )
+    else:
+        usernames = _similar_usernames(cfg, username, similar_users)
+        refresh_estimate = estimate_user_ingests(cfg, usernames, refresh=True)
+    # Each sampled user costs one following page plus a shallow ingest.
+    pool_requests = new_users * (1 + REFRESH_REQUESTS)
+    pool_estimate = CostEstimate(
+        users=new_users,
+        requests=pool_requests,
+        browser_renders=new_users * REFRESH_REQUESTS if cfg.scrape.use_browser else 0,
+        seconds=pool_requests * seconds_per_request(cfg),
+    )
+    availability_requests = top_n * AVAILABILITY_REQUESTS
+    availability_estimate = CostEstimate(
+        requests=availability_requests,
+        browser_renders=availability_requests,
+        seconds=availability_requests * seconds_per_request(cfg),
+    )
+    graph_estimate = estimate_graph_refresh(cfg) if graph_refresh else CostEstimate()
+    if graph_refresh:
+        _print_estimate("Graph refresh", graph_estimate)
+    _print_estimate("Refresh", refresh_estimate)
+    _print_estimate("Similarity pool", pool_estimate)
+    _print_estimate("Availability", availability_estimate)
+    _print_estimate("Total", graph_estimate + refresh_estimate + pool_estimate + availability_estimate)
+
+
+def _print_estimate(label: str, estimate: CostEstimate) -> None:
+    console.print(
+        f"{label}: users~{estimate.users:.0f} requests~{estimate.requests} "
+        f"cached={estimate.cached} browser_renders~{estimate.browser_renders} "
+        f"time~{format_eta(estimate.seconds)}"
+    )
+
+
+def _print_budget(budget: RequestBudget) -> None:
+    if budget.max_requests is None:
+        console.print(f"Requests used: {budget.spent}")
+    elif budget.exhausted:
+        console.print(
+            f"[yellow]Request budget spent ({budget.spent}/{budget.max_requests}); "
+            "re-run to continue.[/yellow]"
+        )
+    else:
+        console.print(f"Requests used: {budget.spent}/{budget.max_requests}")
 
 
 def _update_top_availability(
@@ -104,12 +293,22 @@ def _update_top_availability(
     username: str,
     top_n: int = 100,
     similar_user_limit: int | None = 100,
+    recompute: bool = False,
+    budget: RequestBudget | None = None,
 ) -> tuple[int, int]:
+    """Scrape providers for the top films; stops early once ``budget`` is spent."""
+
+    def fetch(url: str) -> str:
+        if budget is not None:
+            budget.charge()
+        return browser_fetch(url, user_agent=cfg.app.user_agent).content
+
     ranked = _base_recommendations(
         cfg,
         username,
         sort="desc",
         similar_user_limit=similar_user_limit,
+        recompute=recompute,
     )
     top = ranked[:top_n]
     if not top:
@@ -123,18 +322,19 @@ def _update_top_availability(
             if not slug:
                 skipped += 1
                 continue
-            url = f"https://letterboxd.com/film/{slug}/"
-            html = browser_fetch(url, user_agent=cfg.app.user_agent).content
-            source_flags: dict[str, bool] = {}
-            base_flags, has_stream = parse_availability_sources(html)
-            source_flags.update(base_flags)
-            csi_url = extract_availability_csi_url(html)
-            if csi_url:
-                csi_html = browser_fetch(csi_url, user_agent=cfg.app.user_agent).content
-                csi_flags, csi_has_stream = parse_availability_sources(csi_html)
-                has_stream = has_stream or csi_has_stream
-                for key, val in csi_flags.items():
-                    source_flags[key] = source_flags.get(key, False) or val
+            try:
+                html = fetch(f"https://letterboxd.com/film/{slug}/")
+                source_flags: dict[str, bool] = {}
+                base_flags, has_stream = parse_availability_sources(html)
+                source_flags.update(base_flags)
+                csi_url = extract_availability_csi_url(html)
+                if csi_url:
+                    csi_flags, csi_has_stream = parse_availability_sources(fetch(csi_url))
+                    has_stream = has_stream or csi_has_stream
+                    for key, val in csi_flags.items():
+                        source_flags[key] = source_flags.get(key, False) or val
+            except BudgetExhausted:
+                break
             repo.upsert_film_availability_flags(
                 conn,
                 item.film_id,
@@ -164,6 +364,14 @@ def _scaled_scores(results):
     return scaled
 
 
+@app.callback()
+def main() -> None:
+    """Letterboxd-based film recommendations."""
+    # Commands load the config themselves; this only applies its SQLite profile.
+    if DEFAULT_CONFIG_PATH.exists():
+        connections.configure(load_config().database)
+
+
 @app.command()
 def ingest(
     username: str,
@@ -172,26 +380,57 @@ def ingest(
     graph: bool = True,
     graph_interactions: bool = False,
     graph_only: bool = False,
+    max_requests: int | None = None,
+    dry_run: bool = False,
+    resume: bool = True,
+    bulk: bool = False,
 ) -> None:
     """Ingest Letterboxd profile data for a user."""
     cfg = load_config()
     ensure_db(cfg.database_path)
-    if not graph_only:
-        console.print(f"Ingesting user: {username} (refresh={refresh})")
-        result = ingest_user(username, cfg, refresh=refresh)
-        console.print(
-            f"Ingested: watched={result.films_seen} liked={result.likes} watchlist={result.watchlist}"
-        )
-    if graph:
-        console.print("Ingesting follow graph...")
-        graph_result = ingest_follow_graph(
-            username,
-            cfg,
-            refresh=refresh,
-            max_depth=max_depth,
-            ingest_interactions=graph_interactions,
-        )
-        console.print(f"Graph: nodes={graph_result.nodes} edges={graph_result.edges}")
+    if dry_run:
+        estimate = CostEstimate()
+        if not graph_only:
+            estimate = estimate_user_ingests(cfg, [username], refresh=refresh)
+            _print_estimate("User", estimate)
+        if graph:
+            graph_estimate = estimate_follow_graph(
+                cfg,
+                username,
+                max_depth=max_depth,
+                refresh=refresh,
+                ingest_interactions=graph_interactions,
+            )
+            _print_estimate("Graph", graph_estimate)
+            estimate = estimate + graph_estimate
+        _print_estimate("Total", estimate)
+        return
+    budget = RequestBudget(max_requests)
+    with _bulk(cfg, bulk):
+        if not graph_only:
+            console.print(f"Ingesting user: {username} (refresh={refresh})")
+            try:
+                result = ingest_user(username, cfg, refresh=refresh, budget=budget)
+            except BudgetExhausted:
+                _print_budget(budget)
+                return
+            console.print(
+                f"Ingested: watched={result.films_seen} liked={result.likes} "
+                f"watchlist={result.watchlist}"
+            )
+        if graph:
+            console.print("Ingesting follow graph...")
+            graph_result = ingest_follow_graph(
+                username,
+                cfg,
+                refresh=refresh,
+                max_depth=max_depth,
+                ingest_interactions=graph_interactions,
+                budget=budget,
+                resume=resume,
+            )
+            console.print(f"Graph: nodes={graph_result.nodes} edges={graph_result.edges}")
+    _print_budget(budget)
 
 
 @app.command()
@@ -245,59 +484,174 @@ def ingest_interactions(
     )
 
 
+@app.command()
+def import_export(
+    username: str,
+    path: Path,
+    resolve: bool = True,
+) -> None:
+    """Import a Letterboxd data-export ZIP (watched, ratings, diary, likes, watchlist)."""
+    cfg = load_config()
+    ensure_db(cfg.database_path)
+    console.print(f"Importing export for: {username} ({path})")
+    result = import_export_zip(username, path, cfg, resolve=resolve)
+    console.print(
+        f"Imported: films={result.films} watched={result.watched} rated={result.rated} "
+        f"liked={result.liked} watchlist={result.watchlist} resolved_remote={result.resolved_remote}"
+    )
+    if result.unresolved:
+        console.print(f"[yellow]Unresolved films: {len(result.unresolved)}[/yellow]")
+        for name in result.unresolved[:20]:
+            console.print(f"  {name}")
+
+
 @app.command()
 def graph_ingest(
     username: str,
     max_depth: int = 1,
     ingest_missing_interactions: bool = True,
+    workers: int | None = None,
+    max_requests: int | None = None,
+    dry_run: bool = False,
+    resume: bool = True,
+    best_first: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Ingest follow graph and (optionally) scrape missing followee interactions."""
     cfg = load_config()
     ensure_db(cfg.database_path)
+    if dry_run:
+        estimate = estimate_follow_graph(cfg, username, max_depth=max_depth)
+        _print_estimate("Graph", estimate)
+        if ingest_missing_interactions:
+            with repo.connect(cfg.database_path) as conn:
+                missing = repo.select_missing_followees(conn, username, 100, 100)
+            followees = estimate_user_ingests(cfg, missing, refresh=False)
+            _print_estimate("Known missing followees", followees)
+            _print_estimate("Total", estimate + followees)
+        return
+    with _bulk(cfg, bulk):
+        _graph_ingest(
+            cfg,
+            username,
+            max_depth=max_depth,
+            ingest_missing_interactions=ingest_missing_interactions,
+            workers=workers,
+            max_requests=max_requests,
+            resume=resume,
+            best_first=best_first,
+        )
+
+
+def _graph_ingest(
+    cfg,
+    username: str,
+    max_depth: int,
+    ingest_missing_interactions: bool,
+    workers: int | None,
+    max_requests: int | None,
+    resume: bool,
+    best_first: bool,
+) -> None:
+    budget = RequestBudget(max_requests)
     console.print(f"Ingesting follow graph for: {username} (max_depth={max_depth})")
+    if best_first:
+        graph_result = ingest_follow_graph_best_first(
+            username,
+            cfg,
+            max_depth=max_depth,
+            ingest_interactions=ingest_missing_interactions,
+            budget=budget,
+            workers=workers,
+        )
+        console.print(f"Graph: nodes={graph_result.nodes} edges={graph_result.edges}")
+        _print_budget(budget)
+        return
     graph_result = ingest_follow_graph(
         username,
         cfg,
         refresh=False,
         max_depth=max_depth,
         ingest_interactions=False,
+        budget=budget,
+        resume=resume,
+        workers=workers,
     )
     console.print(f"Graph: nodes={graph_result.nodes} edges={graph_result.edges}")
-    if not ingest_missing_interactions:
+    if not ingest_missing_interactions or not graph_result.complete:
+        _print_budget(budget)
         return
     with repo.connect(cfg.database_path) as conn:
         missing = repo.select_missing_followees(conn, username, 100, 100)
     if not missing:
         console.print("No missing followees to ingest.")
+        _print_budget(budget)
         return
     console.print(f"Ingesting interactions for {len(missing)} missing followees...")
-    ok = 0
-    failed = 0
-    for followee in missing:
-        try:
-            ingest_user(
-                followee,
-                cfg,
-                refresh=False,
-                include_diary=False,
-                include_films=True,
-                include_likes=False,
-                include_watchlist=True,
-            )
-            ok += 1
-        except Exception as exc:  # noqa: BLE001
-            failed += 1
-            console.print(f"[red]Failed {followee}: {exc}[/red]")
+    ok, failed = _refresh_usernames(
+        cfg,
+        missing,
+        workers=workers,
+        refresh=False,
+        label="Followees",
+        budget=budget,
+    )
     console.print(f"Graph interaction ingest complete: ok={ok} failed={failed}")
+    _print_budget(budget)
 
 
 @app.command()
-def refresh() -> None:
+def graph_refresh(
+    workers: int | None = None,
+    max_requests: int | None = None,
+    dry_run: bool = False,
+) -> None:
+    """Re-crawl following lists whose following count changed; tombstone removed edges."""
+    cfg = load_config()
+    ensure_db(cfg.database_path)
+    if dry_run:
+        _print_estimate("Graph refresh", estimate_graph_refresh(cfg))
+        return
+    budget = RequestBudget(max_requests)
+    _refresh_graph(cfg, workers=workers, budget=budget)
+    _print_budget(budget)
+
+
+def _refresh_graph(cfg, workers: int | None, budget: RequestBudget) -> None:
+    result = refresh_follow_graph(cfg, budget=budget, workers=workers)
+    console.print(
+        f"Graph refresh: checked={result.checked} changed={result.changed} "
+        f"edges_added={result.added} edges_removed={result.removed}"
+    )
+
+
+@app.command()
+def refresh(
+    workers: int | None = None,
+    prioritize: bool = False,
+    root: list[str] | None = typer.Option(None),
+    max_requests: int | None = None,
+    time_budget_minutes: float | None = None,
+    rss: bool = False,
+) -> None:
     """Refresh first page of watched/watchlist for every user in DB."""
     cfg = load_config()
     ensure_db(cfg.database_path)
-    ok, failed = _refresh_all_users(cfg)
+    budget = RequestBudget(max_requests)
+    if prioritize or max_requests is not None or time_budget_minutes is not None:
+        ok, failed = _refresh_scheduled(
+            cfg,
+            roots=root,
+            max_requests=max_requests,
+            time_budget_minutes=time_budget_minutes,
+            workers=workers,
+            use_rss=rss,
+            budget=budget,
+        )
+    else:
+        ok, failed = _refresh_all_users(cfg, workers=workers, use_rss=rss)
     console.print(f"Refresh complete: ok={ok} failed={failed}")
+    _print_budget(budget)
 
 
 @app.command()
@@ -305,6 +659,7 @@ def update_availability(
     username: str = "spazznolo",
     top_n: int = 100,
     similar_users: int | None = 100,
+    recompute: bool = False,
 ) -> None:
     """Scrape where-to-watch providers for the top-N recommended films."""
     cfg = load_config()
@@ -314,6 +669,7 @@ def update_availability(
         username=username,
         top_n=top_n,
         similar_user_limit=similar_users,
+        recompute=recompute,
     )
     console.print(
         f"Availability update complete: updated={updated} skipped_without_slug={skipped}"
@@ -326,20 +682,64 @@ def weekly(
     top_n: int = 100,
     new_users: int = 20,
     similar_users: int = 100,
+    workers: int | None = None,
+    max_requests: int | None = None,
+    time_budget_minutes: float | None = None,
+    rss: bool = False,
+    dry_run: bool = False,
+    graph_refresh: bool = False,
+    recompute: bool = False,
 ) -> None:
     """Weekly pipeline: refresh similar users, discover users, update availability."""
     cfg = load_config()
     ensure_db(cfg.database_path)
-    ok, failed = _refresh_similar_users(cfg, username, similar_users)
-    console.print(
-        f"Refresh active similar users complete: ok={ok} failed={failed} "
-        f"(limit={similar_users})"
-    )
+    scheduled = max_requests is not None or time_budget_minutes is not None
+    if dry_run:
+        _estimate_weekly(
+            cfg,
+            username,
+            top_n=top_n,
+            new_users=new_users,
+            similar_users=similar_users,
+            max_requests=max_requests if scheduled else None,
+            time_budget_minutes=time_budget_minutes,
+            scheduled=scheduled,
+            graph_refresh=graph_refresh,
+        )
+        return
+    budget = RequestBudget(max_requests)
+    if graph_refresh:
+        _refresh_graph(cfg, workers=workers, budget=budget)
+    if scheduled:
+        ok, failed = _refresh_scheduled(
+            cfg,
+            roots=[username],
+            max_requests=max_requests,
+            time_budget_minutes=time_budget_minutes,
+            workers=workers,
+            use_rss=rss,
+            budget=budget,
+        )
+        console.print(f"Scheduled refresh complete: ok={ok} failed={failed}")
+    else:
+        ok, failed = _refresh_similar_users(
+            cfg,
+            username,
+            similar_users,
+            workers=workers,
+            use_rss=rss,
+        )
+        console.print(
+            f"Refresh active similar users complete: ok={ok} failed={failed} "
+            f"(limit={similar_users})"
+        )
     added_users = _refresh_similarity_pool(
         cfg,
         username,
         sample_count=new_users,
         base_user_limit=similar_users,
+        budget=budget,
+        workers=workers,
     )
     if added_users:
         console.print(f"Similarity pool: added={len(added_users)} -> {', '.join(added_users)}")
@@ -350,16 +750,26 @@ def weekly(
         username=username,
         top_n=top_n,
         similar_user_limit=similar_users,
+        recompute=recompute,
+        budget=budget,
     )
     console.print(
         f"Availability update complete: updated={updated} skipped_without_slug={skipped}"
     )
+    _print_budget(budget)
+    # Scores computed for the availability update are reused here.
     _export_html(
         username=username,
         limit=5000,
         out="docs/index.html",
         similar_user_limit=similar_users,
     )
+    console.print(f"Change log: pruned={_prune_change_log(cfg)}")
+
+
+def _prune_change_log(cfg) -> int:
+    with repo.connect(cfg.database_path) as conn:
+        return repo.prune_change_log(conn)
 
 
 @app.command()
@@ -376,6 +786,7 @@ def recommend(
     explain_top: int = 0,
     contributors: int = 5,
     similar_users: int | None = 100,
+    recompute: bool = False,
 ) -> None:
     """Generate recommendations for a user."""
     cfg = load_config()
@@ -387,6 +798,7 @@ def recommend(
             username,
             sort=sort,
             similar_user_limit=similar_users,
+            recompute=recompute,
         )
         display_rank = 0
         genre_filter = genre.lower() if genre else None
@@ -493,6 +905,7 @@ def recommend(
                     cfg.social_ratings,
                     cfg.social_similarity,
                     cfg.social_normalize,
+                    graph=cfg.graph,
                 )
             else:
                 contrib = compute_social_contributions(
@@ -502,6 +915,7 @@ def recommend(
                     cfg.social,
                     cfg.social_ratings,
                     cfg.social_similarity,
+                    graph=cfg.graph,
                 )
             for item in results[:explain_top]:
                 console.print(f"\nTop contributors for {item.title}:")
@@ -533,6 +947,7 @@ def export_html(
     limit: int = 5000,
     out: str = "docs/index.html",
     similar_users: int | None = 100,
+    recompute: bool = False,
 ) -> None:
     """Export static HTML recommendations for GitHub Pages."""
     _export_html(
@@ -540,6 +955,7 @@ def export_html(
         limit=limit,
         out=out,
         similar_user_limit=similar_users,
+        recompute=recompute,
     )
 
 
@@ -548,6 +964,7 @@ def _export_html(
     limit: int,
     out: str,
     similar_user_limit: int | None = 100,
+    recompute: bool = False,
 ) -> None:
     cfg = load_config()
     ensure_db(cfg.database_path)
@@ -556,6 +973,7 @@ def _export_html(
         username,
         sort="desc",
         similar_user_limit=similar_user_limit,
+        recompute=recompute,
     )
     if not results:
         console.print("[yellow]No recommendations to export.[/yellow]")
@@ -564,7 +982,7 @@ def _export_html(
     previous_rankings = load_previous_rankings(Path(out))
     film_ids = [item.film_id for item in results]
     provider_columns = list(CARED_PROVIDER_COLUMNS)
-    with repo.connect(cfg.database_path) as conn:
+    with repo.snapshot(cfg.database_path) as conn:
         slug_map = repo.select_film_slugs(conn, film_ids)
         availability = repo.select_availability_map(
             conn,
@@ -614,6 +1032,8 @@ def _refresh_similarity_pool(
     username: str,
     sample_count: int = 10,
     base_user_limit: int | None = None,
+    budget: RequestBudget | None = None,
+    workers: int | None = None,
 ) -> list[str]:
     scores = compute_similarity_scores(
         cfg.database_path,
@@ -624,76 +1044,113 @@ def _refresh_similarity_pool(
     if not scores:
         return []
 
-    remaining = list(scores[:base_user_limit] if base_user_limit is not None else scores)
-    if not remaining:
+    bases = list(scores[:base_user_limit] if base_user_limit is not None else scores)
+    if not bases:
         return []
 
-    weights = [max(0.0, s.similarity) for s in remaining]
-    if all(w == 0 for w in weights):
-        weights = [1.0 for _ in remaining]
-
-    added = 0
+    limiter = RateLimiter(cfg.scrape.rate_limit_seconds)
+    candidates = _discover_candidates(cfg, bases, sample_count, budget, limiter)
+    worker_count = max(1, workers or cfg.scrape.workers)
     added_usernames: list[str] = []
-    attempts = 0
-    max_attempts = sample_count * 6
-    while added < sample_count and attempts < max_attempts:
-        attempts += 1
-        base = random.choices(remaining, weights=weights, k=1)[0]
-        followee = _random_followee(base.username, cfg)
-        if not followee:
-            continue
-        with repo.connect(cfg.database_path) as conn:
-            if repo.select_user_id(conn, followee.username):
-                continue
-            src_id = repo.ensure_user(conn, base.username)
-            dst_id = repo.upsert_user_stats(
-                conn,
-                followee.username,
-                followee.display_name,
-                followee.followers,
-                followee.following,
-                followee.watched,
-            )
-            repo.upsert_graph_edge(conn, src_id, dst_id, 1)
-            conn.commit()
-        try:
-            ingest_user(
-                followee.username,
-                cfg,
-                refresh=True,
-                include_diary=False,
-                include_films=True,
-                include_likes=False,
-                include_watchlist=True,
-            )
-            added += 1
-            added_usernames.append(followee.username)
-        except Exception as exc:  # noqa: BLE001
-            console.print(f"[yellow]Failed ingest for {followee.username}: {exc}[/yellow]")
+    exhausted = False
+    with (
+        DbWriter(cfg.database_path) as writer,
+        ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="pool") as pool,
+    ):
+        while candidates and len(added_usernames) < sample_count and not exhausted:
+            wave = candidates[: sample_count - len(added_usernames)]
+            candidates = candidates[len(wave) :]
+            writer.call(partial(_write_pool_edges, wave=wave))
+            jobs = {
+                pool.submit(
+                    ingest_user,
+                    followee.username,
+                    cfg,
+                    refresh=True,
+                    include_diary=False,
+                    include_films=True,
+                    include_likes=False,
+                    include_watchlist=True,
+                    writer=writer,
+                    budget=budget,
+                    limiter=limiter,
+                ): followee.username
+                for followee, _base in wave
+            }
+            for future in jobs:
+                name = jobs[future]
+                try:
+                    future.result()
+                    added_usernames.append(name)
+                except BudgetExhausted:
+                    exhausted = True
+                except Exception as exc:  # noqa: BLE001
+                    console.print(f"[yellow]Failed ingest for {name}: {exc}[/yellow]")
 
     return added_usernames
 
 
-def _random_followee(username: str, cfg):
+def _discover_candidates(
+    cfg,
+    bases,
+    sample_count: int,
+    budget: RequestBudget | None,
+    limiter: RateLimiter | None = None,
+):
+    """Harvest unknown users from the bases' following pages, best first.
+
+    Every fresh cached following page of every base is read for free; then up
+    to ``sample_count`` random pages are fetched from similarity-weighted bases
+    until there are ``POOL_OVERSAMPLE`` times as many candidates as needed.
+    Candidates are ranked by the summed similarity of the bases that follow
+    them times log watched count.
+    """
     with repo.connect(cfg.database_path) as conn:
-        following_count = repo.select_following_count(conn, username)
-    pages = max(1, math.ceil(following_count / 10)) if following_count > 0 else 1
-    page = random.randint(1, pages)
-    if page == 1:
-        url = f"https://letterboxd.com/{username}/following/"
-    else:
-        url = f"https://letterboxd.com/{username}/following/page/{page}/"
-    def fetch_entries():
-        html = browser_fetch(url, user_agent=cfg.app.user_agent).content
-        return parse_following_entries(html)
-
-    def on_error(exc: Exception, attempt: int) -> None:
-        console.print(f"[yellow]Retry {attempt} for followees of {username}: {exc}[/yellow]")
-
-    entries = retry(fetch_entries, attempts=3, delay_seconds=2.0, on_error=on_error)
-    if not entries:
-        return None
-    return random.choice(entries)
+        known = set(repo.select_all_usernames(conn)) | repo.select_backed_off_usernames(conn)
+    found: dict[str, tuple[object, str, float]] = {}
+
+    def collect(base, entries) -> None:
+        for entry in entries:
+            if entry.username in known:
+                continue
+            _entry, first_base, score = found.get(entry.username, (entry, base.username, 0.0))
+            found[entry.username] = (entry, first_base, score + max(0.0, base.similarity))
+
+    for base in bases:
+        collect(base, harvest_following(base.username, cfg, fetch=False))
+
+    weights = [max(0.0, base.similarity) for base in bases]
+    if all(weight == 0 for weight in weights):
+        weights = [1.0 for _ in bases]
+    fetches = 0
+    while len(found) < sample_count * POOL_OVERSAMPLE and fetches < sample_count:
+        if budget is not None and budget.exhausted:
+            break
+        fetches += 1
+        base = random.choices(bases, weights=weights, k=1)[0]
+        try:
+            collect(base, harvest_following(base.username, cfg, budget=budget, limiter=limiter))
+        except BudgetExhausted:
+            break
+        except RuntimeError as exc:
+            console.print(f"[yellow]Failed to read followees of {base.username}: {exc}[/yellow]")
+
+    ranked = sorted(
+        found.values(),
+        key=lambda item: item[2] * (1.0 + math.log1p(item[0].watched or 0)),
+        reverse=True,
+    )
+    return [(entry, base) for entry, base, _score in ranked]
+
+
+def _write_pool_edges(conn, wave) -> None:
+    by_base: dict[str, list] = {}
+    for followee, base in wave:
+        by_base.setdefault(base, []).append(followee)
+    for base, followees in by_base.items():
+        src_id = repo.ensure_user(conn, base)
+        dst_ids = repo.upsert_followee_stats(conn, followees)
+        repo.upsert_graph_edges(conn, src_id, dst_ids.values(), 1)
 
 
 @app.command()
@@ -18,12 +18,20 @@ class ScrapeConfig:
     cache_ttl_days: int
     use_browser: bool
     max_pages: int = 100
+    workers: int = 1
+    # 0 parses on a background thread; N > 0 uses a shared pool of N processes.
+    parse_processes: int = 0
+    pipeline_depth: int = 4
 
 
 @dataclass(frozen=True)
 class GraphConfig:
     max_depth: int
     decay: float
+    # Weight of follow-graph influence in social scores (0 disables it) and how
+    # it's propagated: "decay" (decay ** hop over follow paths) or "ppr".
+    influence_weight: float = 0.0
+    influence: str = "decay"
 
 
 @dataclass(frozen=True)
@@ -80,6 +88,20 @@ class SocialNormalizeConfig:
     time_weight: float
 
 
+@dataclass(frozen=True)
+class DatabaseConfig:
+    # SQLite connection profile; cache and mmap sizes are per connection.
+    cache_size_mb: int = 64
+    mmap_size_mb: int = 256
+    temp_store_memory: bool = True
+    synchronous: str = "NORMAL"
+    cached_statements: int = 256
+    busy_timeout_ms: int = 5000
+    # Used instead while a --bulk load runs (synchronous is OFF then).
+    bulk_cache_size_mb: int = 512
+    bulk_batch_size: int = 1000
+
+
 @dataclass(frozen=True)
 class Config:
     app: AppConfig
@@ -91,6 +113,7 @@ class Config:
     social_ratings: SocialRatingsConfig
     social_similarity: SocialSimilarityConfig
     social_normalize: SocialNormalizeConfig
+    database: DatabaseConfig = DatabaseConfig()
 
     @property
     def database_path(self) -> str:
@@ -118,6 +141,7 @@ def load_config(path: Path | None = None) -> Config:
     social_ratings = raw["social_ratings"]
     social_similarity = raw["social_similarity"]
     social_normalize = raw["social_normalize"]
+    database = raw.get("database", {})
 
     return Config(
         app=AppConfig(**app),
@@ -129,4 +153,5 @@ def load_config(path: Path | None = None) -> Config:
         social_ratings=SocialRatingsConfig(**social_ratings),
         social_similarity=SocialSimilarityConfig(**social_similarity),
         social_normalize=SocialNormalizeConfig(**social_normalize),
+        database=DatabaseConfig(**database),
     )
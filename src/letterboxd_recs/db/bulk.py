@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from contextlib import closing, contextmanager
+from dataclasses import replace
+import os
+import sqlite3
+from typing import Iterator
+
+from letterboxd_recs.config import DatabaseConfig
+from letterboxd_recs.db import connections, repo
+from letterboxd_recs.util.logging import get_logger
+
+LOG = get_logger(__name__)
+
+# Secondary indexes that only serve reads; unique and primary keys stay live
+# because upserts need them.
+DEFERRED_INDEXES = (
+    "idx_interactions_watched_film",
+    "idx_graph_edges_dst",
+)
+# Per-row change_log triggers on interactions. A bulk load would double its
+# write volume logging every upsert; one ``bulk`` entry is logged instead.
+DEFERRED_TRIGGERS = (
+    "change_log_interactions_insert",
+    "change_log_interactions_update",
+    "change_log_interactions_delete",
+)
+
+_batch_size: int | None = None
+
+
+def bulk_batch_size() -> int | None:
+    """Writer jobs per transaction while a bulk load is active, else ``None``."""
+    return _batch_size
+
+
+@contextmanager
+def bulk_load(path: str, profile: DatabaseConfig) -> Iterator[None]:
+    """Run the block as a bulk load into the database at ``path``.
+
+    For the duration, the read-only indexes in ``DEFERRED_INDEXES`` and the
+    change_log triggers in ``DEFERRED_TRIGGERS`` are dropped, similarity
+    roots stop maintaining their pair counters, and
+    connections opened in the block use ``synchronous = OFF`` and the bulk
+    page cache. ``DbWriter`` commits ``bulk_batch_size`` jobs per
+    transaction. On exit, even after an error or Ctrl-C, the indexes,
+    triggers and roots are rebuilt, the WAL is checkpointed and ``ANALYZE``
+    refreshes the planner statistics.
+
+    Every step commits atomically, so an interrupted load leaves consistent
+    data. The dropped objects are recorded in ``deferred_indexes`` with this
+    process's id: other processes leave them alone while it runs, and if it
+    is killed outright, the next ``DbWriter`` or bulk load rebuilds them.
+    Roots are re-registered lazily on the next scoring run.
+    """
+    global _batch_size
+    if _batch_size is not None:
+        raise RuntimeError("A bulk load is already active")
+    with closing(connections.open_connection(path)) as conn:
+        restore_indexes(conn)
+        roots = _suspend_similarity_roots(conn)
+        defer_indexes(conn)
+    previous = connections.current_profile()
+    connections.configure(
+        replace(profile, synchronous="OFF", cache_size_mb=profile.bulk_cache_size_mb)
+    )
+    connections.close_all()
+    _batch_size = profile.bulk_batch_size
+    try:
+        yield
+    finally:
+        _batch_size = None
+        connections.configure(previous)
+        connections.close_all()
+        with closing(connections.open_connection(path)) as conn:
+            rebuilt = restore_indexes(conn)
+            with conn:
+                for username in roots:
+                    repo.ensure_similarity_root(conn, username)
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        LOG.info("Bulk load finished: rebuilt %s indexes, %s similarity roots", rebuilt, len(roots))
+
+
+def defer_indexes(conn: sqlite3.Connection) -> int:
+    """Drop ``DEFERRED_INDEXES`` and ``DEFERRED_TRIGGERS``, recording them in ``deferred_indexes``."""
+    names = DEFERRED_INDEXES + DEFERRED_TRIGGERS
+    placeholders = ",".join("?" for _ in names)
+    with conn:
+        rows = conn.execute(
+            f"""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND name IN ({placeholders})
+            """,
+            names,
+        ).fetchall()
+        for kind, name, sql in rows:
+            conn.execute(
+                "INSERT OR REPLACE INTO deferred_indexes (name, sql, owner_pid) VALUES (?, ?, ?)",
+                (name, sql, os.getpid()),
+            )
+            conn.execute(f"DROP {kind.upper()} {name}")
+    return len(rows)
+
+
+def restore_indexes(conn: sqlite3.Connection) -> int:
+    """Recreate the indexes and triggers in ``deferred_indexes``; a no-op when none are pending.
+
+    Objects deferred by a bulk load that is still running in another process
+    are left dropped; those of this process or of one that has exited are
+    rebuilt. Restoring the interactions change_log triggers logs one ``bulk``
+    entry, which bumps the dataset version and tells incremental consumers
+    that they missed per-row changes and must rebuild.
+    """
+    rows = conn.execute(
+        "SELECT name, sql, owner_pid FROM deferred_indexes ORDER BY name"
+    ).fetchall()
+    stale = [(name, sql) for name, sql, owner in rows if owner == os.getpid() or not _process_alive(owner)]
+    with conn:
+        for name, sql in stale:
+            for kind in ("INDEX", "TRIGGER"):
+                sql = sql.replace(f"CREATE {kind} ", f"CREATE {kind} IF NOT EXISTS ", 1)
+            conn.execute(sql)
+            conn.execute("DELETE FROM deferred_indexes WHERE name = ?", (name,))
+        if any(name in DEFERRED_TRIGGERS for name, _sql in stale):
+            conn.execute(
+                "INSERT INTO change_log (entity, entity_id, user_id, op) VALUES ('interaction', 0, NULL, 'bulk')"
+            )
+    return len(stale)
+
+
+def _process_alive(pid: int | None) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user.
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _suspend_similarity_roots(conn: sqlite3.Connection) -> list[str]:
+    # Pair triggers probe other users' rows for every root interaction; rebuilding
+    # the pairs once at the end is far cheaper than maintaining them row by row.
+    with conn:
+        roots = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT u.username FROM similarity_roots r
+                JOIN users u ON u.id = r.user_id
+                ORDER BY u.username
+                """
+            )
+        ]
+        conn.execute("DELETE FROM similarity_roots")
+        conn.execute("DELETE FROM user_pair_stats")
+    return roots
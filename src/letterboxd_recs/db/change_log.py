@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import sqlite3
+
+
+@dataclass(frozen=True)
+class ChangeSource:
+    """How rows of one table are recorded in ``change_log``."""
+
+    table: str
+    entity: str
+    entity_id: str
+    user_id: str | None
+    # Updates are only logged when one of these columns actually changes.
+    columns: tuple[str, ...]
+    log_inserts: bool = True
+    # Stored columns behind generated ``columns``; ``UPDATE OF`` has to name these.
+    stored_columns: tuple[str, ...] = ()
+
+
+CHANGE_SOURCES = (
+    ChangeSource(
+        "interactions",
+        "interaction",
+        "film_id",
+        "user_id",
+        ("rating", "watched", "watchlist"),
+        stored_columns=("rating_half", "flags"),
+    ),
+    ChangeSource("films", "film", "id", None, ("title", "year", "genres")),
+    ChangeSource("graph_edges", "edge", "dst_user_id", "src_user_id", ("depth", "removed_at")),
+    # New users carry no interactions yet; only their watched count and removal matter.
+    ChangeSource("users", "user", "id", "id", ("watched_count",), log_inserts=False),
+)
+
+
+def create_change_triggers(conn: sqlite3.Connection) -> None:
+    """Log every insert, relevant update and delete of the ``CHANGE_SOURCES`` tables."""
+    for source in CHANGE_SOURCES:
+        events = [("update", "NEW", _changed(source.columns))]
+        if source.log_inserts:
+            events.append(("insert", "NEW", None))
+        events.append(("delete", "OLD", None))
+        for op, row, when in events:
+            timing = f"AFTER {op.upper()}"
+            if op == "update":
+                timing += f" OF {', '.join(source.stored_columns or source.columns)}"
+            user = f"{row}.{source.user_id}" if source.user_id else "NULL"
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS change_log_{source.table}_{op}
+                {timing} ON {source.table}
+                {f"WHEN {when}" if when else ""}
+                BEGIN
+                    INSERT INTO change_log (entity, entity_id, user_id, op)
+                    VALUES ('{source.entity}', {row}.{source.entity_id}, {user}, '{op}');
+                END
+                """
+            )
+
+
+def _changed(columns: tuple[str, ...]) -> str:
+    return " OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in columns)
+
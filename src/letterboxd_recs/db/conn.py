@@ -1,24 +1,167 @@
+from contextlib import closing
 import sqlite3
 from pathlib import Path
+from typing import Callable, Iterator
 
+from letterboxd_recs.db.change_log import create_change_triggers
+from letterboxd_recs.db.pair_stats import create_pair_triggers
 from letterboxd_recs.util.logging import get_logger
 
 LOG = get_logger(__name__)
 
+SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+
 
 def ensure_db(path: str) -> None:
+    """Bring the database at ``path`` up to ``SCHEMA_VERSION``, creating it if needed.
+
+    An up-to-date database costs one ``PRAGMA user_version`` read. Otherwise
+    the pending migrations run in a single ``BEGIN IMMEDIATE`` transaction;
+    a process that loses the race for the write lock waits, re-reads the
+    version and finds nothing left to do.
+    """
     db_path = Path(path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
     created = not db_path.exists()
 
-    with sqlite3.connect(db_path) as conn:
-        schema_path = Path(__file__).parent / "schema.sql"
-        conn.executescript(schema_path.read_text(encoding="utf-8"))
-        _migrate_users(conn)
-        _migrate_availability(conn)
-
+    with closing(sqlite3.connect(db_path, timeout=30.0, isolation_level=None)) as conn:
+        if _user_version(conn) >= SCHEMA_VERSION:
+            return
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = _user_version(conn)
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                MIGRATIONS[target - 1](conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
     if created:
         LOG.info("Created database at %s", db_path)
+    elif version < SCHEMA_VERSION:
+        LOG.info("Migrated database %s from version %d to %d", db_path, version, SCHEMA_VERSION)
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def _migrate_to_v1(conn: sqlite3.Connection) -> None:
+    """Baseline: ``schema.sql`` plus the fix-ups for databases that predate versioning.
+
+    Every step is idempotent, so this is safe on empty, partial and fully
+    built unversioned databases alike.
+    """
+    for statement in _schema_statements():
+        conn.execute(statement)
+    create_pair_triggers(conn)
+    _migrate_dataset_version(conn)
+    create_change_triggers(conn)
+    _migrate_users(conn)
+    _migrate_graph_edges(conn)
+    _migrate_availability(conn)
+    _migrate_user_stats(conn)
+
+
+def _migrate_to_v2(conn: sqlite3.Connection) -> None:
+    """Indexes a bulk load has dropped and still has to rebuild (see ``db.bulk``)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deferred_indexes (
+            name TEXT PRIMARY KEY,
+            sql TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _migrate_to_v3(conn: sqlite3.Connection) -> None:
+    """Compact ``interactions`` layout from ``schema.sql`` plus its per-film index.
+
+    Databases created from the current ``schema.sql`` already have the table;
+    older ones store the booleans, the rating and the watch date directly
+    and are rebuilt.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(interactions)")}
+    if "flags" not in columns:
+        _rebuild_interactions(conn)
+    # The clustered primary key already serves per-user reads; per-film reads
+    # get a covering index over the stored columns.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_interactions_watched_film
+            ON interactions (film_id, rating_half, flags) WHERE flags & 2
+        """
+    )
+
+
+def _rebuild_interactions(conn: sqlite3.Connection) -> None:
+    # Legacy mode renames just the table: it neither re-parses the rest of the
+    # schema nor rewrites other objects that name "interactions".
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute("ALTER TABLE interactions RENAME TO interactions_legacy")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+    # Trigger and index names are global; the old ones go before the current
+    # definitions are created, and the triggers must not fire on the copy.
+    attached = conn.execute(
+        """
+        SELECT type, name FROM sqlite_master
+        WHERE tbl_name = 'interactions_legacy' AND type IN ('trigger', 'index') AND sql IS NOT NULL
+        """
+    ).fetchall()
+    for kind, name in attached:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    conn.execute("DELETE FROM deferred_indexes WHERE name LIKE 'idx_interactions_%'")
+    statements = list(_schema_statements())
+    conn.execute(next(s for s in statements if "CREATE TABLE IF NOT EXISTS interactions " in s))
+    conn.execute(
+        """
+        INSERT INTO interactions (user_id, film_id, flags, rating_half, watch_day)
+        SELECT
+            user_id,
+            film_id,
+            (liked IS 1) | ((watched IS 1) << 1) | ((watchlist IS 1) << 2),
+            CAST(ROUND(rating * 2) AS INTEGER),
+            CAST(julianday(date(watch_date)) - 2440587.5 AS INTEGER)
+        FROM interactions_legacy
+        """
+    )
+    conn.execute("DROP TABLE interactions_legacy")
+    for statement in statements:
+        conn.execute(statement)
+    create_change_triggers(conn)
+    create_pair_triggers(conn)
+    # Watch dates are now whole days, and unparseable ones are gone.
+    conn.execute(
+        """
+        UPDATE user_stats SET last_watch_date = (
+            SELECT MAX(watch_date) FROM interactions WHERE user_id = user_stats.user_id
+        )
+        """
+    )
+
+
+def _migrate_to_v4(conn: sqlite3.Connection) -> None:
+    """Record which process deferred each index (see ``db.bulk.restore_indexes``)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(deferred_indexes)").fetchall()}
+    if "owner_pid" not in existing:
+        conn.execute("ALTER TABLE deferred_indexes ADD COLUMN owner_pid INTEGER")
+
+
+def _schema_statements() -> Iterator[str]:
+    # executescript() would commit the migration transaction, so run one statement at a time.
+    pending = ""
+    for line in SCHEMA_PATH.read_text(encoding="utf-8").splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            yield pending
+            pending = ""
+    if pending.strip():
+        yield pending
 
 
 def _migrate_users(conn: sqlite3.Connection) -> None:
@@ -27,12 +170,74 @@ def _migrate_users(conn: sqlite3.Connection) -> None:
         "follower_count": "INTEGER",
         "following_count": "INTEGER",
         "watched_count": "INTEGER",
+        "refreshed_at": "TEXT",
+        "activity_rate": "REAL",
+        "films_this_year": "INTEGER",
+        "lists_count": "INTEGER",
+        "watchlist_count": "INTEGER",
+        "latest_diary_entry": "TEXT",
+        "refresh_signature": "TEXT",
+        "crawled_following_count": "INTEGER",
     }
     for name, col_type in columns.items():
         if name not in existing:
             conn.execute(f"ALTER TABLE users ADD COLUMN {name} {col_type}")
 
 
+def _migrate_graph_edges(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(graph_edges)").fetchall()}
+    if "removed_at" not in existing:
+        conn.execute("ALTER TABLE graph_edges ADD COLUMN removed_at TEXT")
+
+
+def _migrate_user_stats(conn: sqlite3.Connection) -> None:
+    """Backfill ``user_stats`` for databases whose interactions predate its triggers."""
+    if conn.execute("SELECT 1 FROM user_stats LIMIT 1").fetchone():
+        return
+    conn.execute(
+        """
+        INSERT INTO user_stats (
+            user_id, watched_count, rated_count, rating_sum, rating_sq_sum,
+            watchlist_count, last_watch_date
+        )
+        SELECT
+            user_id,
+            SUM(watched IS 1),
+            COUNT(rating),
+            COALESCE(SUM(rating), 0),
+            COALESCE(SUM(rating * rating), 0),
+            SUM(watchlist IS 1),
+            MAX(watch_date)
+        FROM interactions
+        GROUP BY user_id
+        """
+    )
+
+
+def _migrate_dataset_version(conn: sqlite3.Connection) -> None:
+    """Carry the old single-counter dataset version over to the change_log sequence.
+
+    Cached recommendations are keyed on the version, so it must never go backwards.
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dataset_version'"
+    ).fetchone()
+    if not row:
+        return
+    version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM dataset_version").fetchone()[0]
+    current = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    if current is None:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (version,))
+    elif current[0] < version:
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'change_log'", (version,))
+    legacy = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'dataset_version_%'"
+    ).fetchall()
+    for (name,) in legacy:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE dataset_version")
+
+
 def _migrate_availability(conn: sqlite3.Connection) -> None:
     existing = {
         row[1] for row in conn.execute("PRAGMA table_info(film_availability_flags)").fetchall()
@@ -64,3 +269,15 @@ def _migrate_availability(conn: sqlite3.Connection) -> None:
             conn.execute(
                 f"ALTER TABLE film_availability_flags ADD COLUMN {col} BOOLEAN NOT NULL DEFAULT 0"
             )
+
+
+# Each entry upgrades the schema by one version; never edit or reorder a
+# released entry, append a new one. schema.sql describes the current layout,
+# so a migration that changes a table also updates its definition there.
+MIGRATIONS: tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _migrate_to_v1,
+    _migrate_to_v2,
+    _migrate_to_v3,
+    _migrate_to_v4,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Iterator
+
+from letterboxd_recs.config import DatabaseConfig
+
+_profile = DatabaseConfig()
+_local = threading.local()
+
+
+def configure(profile: DatabaseConfig) -> None:
+    """Use ``profile`` for every connection opened from now on."""
+    global _profile
+    _profile = profile
+
+
+def current_profile() -> DatabaseConfig:
+    return _profile
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """The calling thread's connection to ``path``, opened on first use.
+
+    Connections are cached per process and thread, so repeated ``with
+    connect(path) as conn`` blocks reuse one handle and its statement cache.
+    A cached connection that was closed is transparently reopened.
+    """
+    cache = _thread_cache()
+    key = (os.path.abspath(path), readonly)
+    conn = cache.get(key)
+    if conn is not None and _is_open(conn):
+        return conn
+    conn = open_connection(path, readonly=readonly)
+    cache[key] = conn
+    return conn
+
+
+@contextmanager
+def snapshot(path: str) -> Iterator[sqlite3.Connection]:
+    """Read-only connection holding one read transaction for the whole block.
+
+    Under WAL every query in the block sees the same committed state and
+    never waits on, or blocks, a writer.
+    """
+    conn = connect(path, readonly=True)
+    if conn.in_transaction:
+        # Nested snapshot: keep reading the outer one.
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+
+
+def open_connection(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """A new, uncached connection configured with the current profile."""
+    profile = _profile
+    if readonly:
+        uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri, uri=True, cached_statements=profile.cached_statements
+        )
+    else:
+        conn = sqlite3.connect(path, cached_statements=profile.cached_statements)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+    conn.execute(f"PRAGMA cache_size = {-1024 * int(profile.cache_size_mb)}")
+    conn.execute(f"PRAGMA mmap_size = {1024 * 1024 * int(profile.mmap_size_mb)}")
+    if profile.temp_store_memory:
+        conn.execute("PRAGMA temp_store = MEMORY")
+    if not readonly:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {_synchronous(profile.synchronous)}")
+    return conn
+
+
+def close_all() -> None:
+    """Close the calling thread's cached connections."""
+    cache = _thread_cache()
+    for conn in cache.values():
+        conn.close()
+    cache.clear()
+
+
+def _thread_cache() -> dict[tuple[str, bool], sqlite3.Connection]:
+    # A forked child inherits the parent's thread-local state; never share handles.
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.pid = pid
+        _local.connections = {}
+    return _local.connections
+
+
+def _is_open(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+def _synchronous(value: str) -> str:
+    mode = value.upper()
+    if mode not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+        raise ValueError(f"Unknown synchronous mode: {value}")
+    return mode
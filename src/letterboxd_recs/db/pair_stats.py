@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sqlite3
+
+# Counters kept per (root, other) pair over films both users watched. The sums
+# over co-rated films are enough to rebuild rating means, variances and the
+# squared z-score distance between the two users without touching interactions.
+PAIR_COLUMNS = (
+    "overlap",
+    "rated_overlap",
+    "abs_diff_sum",
+    "root_rating_sum",
+    "other_rating_sum",
+    "root_sq_sum",
+    "other_sq_sum",
+    "cross_sum",
+)
+
+_TRIGGER_EVENTS = {
+    "insert": ("AFTER INSERT ON interactions", "NEW.watched IS 1", [("NEW", "+")]),
+    "delete": ("AFTER DELETE ON interactions", "OLD.watched IS 1", [("OLD", "-")]),
+    "update": (
+        "AFTER UPDATE OF user_id, film_id, rating_half, flags ON interactions",
+        """(OLD.watched IS 1 OR NEW.watched IS 1)
+  AND (OLD.user_id IS NOT NEW.user_id
+       OR OLD.film_id IS NOT NEW.film_id
+       OR OLD.rating IS NOT NEW.rating
+       OR OLD.watched IS NOT NEW.watched)""",
+        [("OLD", "-"), ("NEW", "+")],
+    ),
+}
+
+PAIR_TRIGGERS = tuple(f"interactions_pairs_{event}" for event in _TRIGGER_EVENTS)
+
+
+def pair_deltas(root_rating: str, other_rating: str) -> list[str]:
+    """SQL expressions for one shared watched film's contribution to each of ``PAIR_COLUMNS``."""
+    both = f"{root_rating} IS NOT NULL AND {other_rating} IS NOT NULL"
+    rated = [
+        f"ABS({root_rating} - {other_rating})",
+        root_rating,
+        other_rating,
+        f"{root_rating} * {root_rating}",
+        f"{other_rating} * {other_rating}",
+        f"{root_rating} * {other_rating}",
+    ]
+    return ["1", f"({both})"] + [f"CASE WHEN {both} THEN {expr} ELSE 0 END" for expr in rated]
+
+
+def create_pair_triggers(conn: sqlite3.Connection) -> None:
+    """Keep ``user_pair_stats`` current for every user in ``similarity_roots``.
+
+    A watched interaction changes the pairs it is on both sides of: the root's
+    pairs with everyone else who watched the film, and every tracked root's
+    pair with the interaction's user. Updates subtract the old row and add the
+    new one.
+    """
+    for event, (timing, when, rows) in _TRIGGER_EVENTS.items():
+        body = []
+        for row, sign in rows:
+            body.append(_root_side(row, sign))
+            body.append(_other_side(row, sign))
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS interactions_pairs_{event}
+            {timing}
+            WHEN {when}
+            BEGIN
+            {"".join(body)}
+            END
+            """
+        )
+
+
+def _root_side(row: str, sign: str) -> str:
+    # Reads the stored columns so the probe stays on the covering
+    # idx_interactions_watched_film; ``flags & 2`` is the watched bit.
+    deltas = ", ".join(
+        f"{sign}({expr})" for expr in pair_deltas(f"{row}.rating", "(o.rating_half / 2.0)")
+    )
+    return f"""
+    INSERT INTO user_pair_stats (root_id, other_id, {", ".join(PAIR_COLUMNS)})
+    SELECT {row}.user_id, o.user_id, {deltas}
+    FROM interactions o
+    WHERE o.film_id = {row}.film_id
+      AND o.flags & 2
+      AND o.user_id != {row}.user_id
+      AND {row}.watched IS 1
+      AND EXISTS (SELECT 1 FROM similarity_roots WHERE user_id = {row}.user_id)
+    {_accumulate()};
+    """
+
+
+def _other_side(row: str, sign: str) -> str:
+    deltas = ", ".join(f"{sign}({expr})" for expr in pair_deltas("r.rating", f"{row}.rating"))
+    return f"""
+    INSERT INTO user_pair_stats (root_id, other_id, {", ".join(PAIR_COLUMNS)})
+    SELECT r.user_id, {row}.user_id, {deltas}
+    FROM similarity_roots s
+    JOIN interactions r ON r.user_id = s.user_id AND r.film_id = {row}.film_id
+    WHERE r.watched = 1
+      AND r.user_id != {row}.user_id
+      AND {row}.watched IS 1
+    {_accumulate()};
+    """
+
+
+def _accumulate() -> str:
+    updates = ", ".join(f"{col} = {col} + excluded.{col}" for col in PAIR_COLUMNS)
+    return f"ON CONFLICT(root_id, other_id) DO UPDATE SET {updates}"
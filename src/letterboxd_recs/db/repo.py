@@ -1,36 +1,89 @@
 from __future__ import annotations
 
+from datetime import date
+import json
 import re
 import sqlite3
 from typing import Iterable
 
+from letterboxd_recs.db.connections import connect, snapshot  # noqa: F401
+from letterboxd_recs.db.pair_stats import PAIR_COLUMNS, pair_deltas
 from letterboxd_recs.ingest.letterboxd.parse import FilmItem, Profile
+from letterboxd_recs.ingest.letterboxd.social import FolloweeSummary
 
+_CHUNK_SIZE = 500
+# How long change_log entries are kept while no consumer has registered a cursor.
+CHANGE_LOG_RETENTION_DAYS = 90
 
-def connect(path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA journal_mode = WAL")
-    conn.execute("PRAGMA busy_timeout = 5000")
-    return conn
+
+def _id_set(conn: sqlite3.Connection, name: str, ids: Iterable[int]) -> str:
+    """Load ``ids`` into the connection's ``temp.<name>`` table; returns a subquery over it.
+
+    Queries filter with ``col IN (<subquery>)`` instead of one placeholder per
+    id, so the statement text stays fixed (and cached) however many ids there
+    are, and SQLite's bound-variable limit never applies.
+
+    Loading the set starts sqlite3's implicit transaction; it is committed
+    straight away unless the caller already had one open, so read helpers
+    never leave a transaction (and a pinned snapshot) behind.
+    """
+    in_transaction = conn.in_transaction
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY)")
+    conn.execute(f"DELETE FROM temp.{name}")
+    conn.executemany(
+        f"INSERT OR IGNORE INTO temp.{name} (id) VALUES (?)", ((int(i),) for i in ids)
+    )
+    if not in_transaction:
+        conn.commit()
+    return f"SELECT id FROM temp.{name}"
 
 
 def upsert_user(conn: sqlite3.Connection, profile: Profile) -> int:
     conn.execute(
         """
-        INSERT INTO users (username, display_name, fetched_at)
-        VALUES (?, ?, datetime('now'))
+        INSERT INTO users (
+            username, display_name, follower_count, following_count, watched_count,
+            films_this_year, lists_count, watchlist_count, latest_diary_entry, fetched_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
         ON CONFLICT(username) DO UPDATE SET
             display_name = COALESCE(excluded.display_name, users.display_name),
+            follower_count = COALESCE(excluded.follower_count, users.follower_count),
+            following_count = COALESCE(excluded.following_count, users.following_count),
+            watched_count = COALESCE(excluded.watched_count, users.watched_count),
+            films_this_year = COALESCE(excluded.films_this_year, users.films_this_year),
+            lists_count = COALESCE(excluded.lists_count, users.lists_count),
+            watchlist_count = COALESCE(excluded.watchlist_count, users.watchlist_count),
+            latest_diary_entry = COALESCE(excluded.latest_diary_entry, users.latest_diary_entry),
             fetched_at = datetime('now')
         """,
-        (profile.username, profile.display_name),
+        (
+            profile.username,
+            profile.display_name,
+            profile.followers_count,
+            profile.following_count,
+            profile.films_count,
+            profile.films_this_year,
+            profile.lists_count,
+            profile.watchlist_count,
+            profile.latest_diary_entry,
+        ),
     )
     row = conn.execute("SELECT id FROM users WHERE username = ?", (profile.username,)).fetchone()
     return int(row[0])
 
 
+def select_refresh_state(conn: sqlite3.Connection, username: str):
+    return conn.execute(
+        """
+        SELECT refresh_signature, latest_diary_entry
+        FROM users
+        WHERE username = ? AND refreshed_at IS NOT NULL
+        """,
+        (username,),
+    ).fetchone()
+
+
 def ensure_user(conn: sqlite3.Connection, username: str) -> int:
     conn.execute(
         """
@@ -72,6 +125,51 @@ def upsert_user_stats(
     return int(row[0])
 
 
+def upsert_followee_stats(
+    conn: sqlite3.Connection,
+    followees: Iterable[FolloweeSummary],
+) -> dict[str, int]:
+    """Bulk version of ``upsert_user_stats``; returns username -> user id."""
+    rows: dict[str, tuple[str, str | None, int | None, int | None, int | None]] = {}
+    for followee in followees:
+        rows[followee.username] = (
+            followee.username,
+            followee.display_name,
+            followee.followers,
+            followee.following,
+            followee.watched,
+        )
+    conn.executemany(
+        """
+        INSERT INTO users (
+            username, display_name, follower_count, following_count, watched_count, fetched_at
+        )
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(username) DO UPDATE SET
+            display_name = COALESCE(excluded.display_name, users.display_name),
+            follower_count = COALESCE(excluded.follower_count, users.follower_count),
+            following_count = COALESCE(excluded.following_count, users.following_count),
+            watched_count = COALESCE(excluded.watched_count, users.watched_count),
+            fetched_at = datetime('now')
+        """,
+        list(rows.values()),
+    )
+    return select_user_ids(conn, list(rows))
+
+
+def select_user_ids(conn: sqlite3.Connection, usernames: list[str]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    for start in range(0, len(usernames), _CHUNK_SIZE):
+        chunk = usernames[start : start + _CHUNK_SIZE]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT username, id FROM users WHERE username IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        ids.update({str(row[0]): int(row[1]) for row in rows})
+    return ids
+
+
 def upsert_film(conn: sqlite3.Connection, item: FilmItem) -> int:
     title = item.title or item.slug
     conn.execute(
@@ -112,6 +210,53 @@ def upsert_film_metadata(
     )
 
 
+# Bits of ``interactions.flags``. Upserts OR them together, so a flag seen
+# once stays set.
+LIKED = 1
+WATCHED = 2
+WATCHLIST = 4
+
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+_UPSERT_INTERACTION = """
+    INSERT INTO interactions (user_id, film_id, flags, rating_half, watch_day)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, film_id) DO UPDATE SET
+        flags = interactions.flags | excluded.flags,
+        rating_half = COALESCE(excluded.rating_half, interactions.rating_half),
+        watch_day = COALESCE(excluded.watch_day, interactions.watch_day)
+"""
+
+
+def pack_flags(liked: bool, watched: bool, watchlist: bool) -> int:
+    return (LIKED if liked else 0) | (WATCHED if watched else 0) | (WATCHLIST if watchlist else 0)
+
+
+def pack_rating(rating: float | None) -> int | None:
+    """Stars as integer half-stars, e.g. 3.5 -> 7."""
+    if rating is None:
+        return None
+    return int(round(rating * 2))
+
+
+def pack_day(value: str | None) -> int | None:
+    """An ISO date (or datetime) as days since 1970-01-01; ``None`` if unparseable."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10]).toordinal() - _EPOCH_DAY
+    except ValueError:
+        return None
+
+
+def _pack_interaction(item: FilmItem) -> tuple[int, int | None, int | None]:
+    return (
+        pack_flags(item.liked, item.watched, item.watchlist),
+        pack_rating(item.rating),
+        pack_day(item.watch_date),
+    )
+
+
 def upsert_interaction(
     conn: sqlite3.Connection,
     user_id: int,
@@ -119,26 +264,8 @@ def upsert_interaction(
     item: FilmItem,
 ) -> None:
     conn.execute(
-        """
-        INSERT INTO interactions (
-            user_id, film_id, rating, liked, watched, watchlist, watch_date
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(user_id, film_id) DO UPDATE SET
-            rating = COALESCE(excluded.rating, interactions.rating),
-            liked = CASE WHEN excluded.liked > interactions.liked THEN excluded.liked ELSE interactions.liked END,
-            watched = CASE WHEN excluded.watched > interactions.watched THEN excluded.watched ELSE interactions.watched END,
-            watchlist = CASE WHEN excluded.watchlist > interactions.watchlist THEN excluded.watchlist ELSE interactions.watchlist END,
-            watch_date = COALESCE(excluded.watch_date, interactions.watch_date)
-        """,
-        (
-            user_id,
-            film_id,
-            item.rating,
-            item.liked,
-            item.watched,
-            item.watchlist,
-            item.watch_date,
-        ),
+        _UPSERT_INTERACTION,
+        (user_id, film_id, *_pack_interaction(item)),
     )
 
 
@@ -147,9 +274,179 @@ def upsert_interactions(
     user_id: int,
     items: Iterable[FilmItem],
 ) -> None:
+    items = list(items)
+    if not items:
+        return
+    film_ids = upsert_films(conn, items)
+    conn.executemany(
+        _UPSERT_INTERACTION,
+        [(user_id, film_ids[item.slug], *_pack_interaction(item)) for item in items],
+    )
+
+
+def upsert_films(conn: sqlite3.Connection, items: Iterable[FilmItem]) -> dict[str, int]:
+    rows: dict[str, tuple[str, str, int | None]] = {}
     for item in items:
-        film_id = upsert_film(conn, item)
-        upsert_interaction(conn, user_id, film_id, item)
+        rows[item.slug] = (item.slug, item.title or item.slug, item.year)
+    conn.executemany(
+        """
+        INSERT INTO films (letterboxd_id, title, year, genres)
+        VALUES (?, ?, ?, NULL)
+        ON CONFLICT(letterboxd_id) DO UPDATE SET
+            title = COALESCE(excluded.title, films.title),
+            year = COALESCE(excluded.year, films.year)
+        """,
+        list(rows.values()),
+    )
+    return select_film_ids(conn, list(rows))
+
+
+def select_film_ids(conn: sqlite3.Connection, slugs: list[str]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    for start in range(0, len(slugs), _CHUNK_SIZE):
+        chunk = slugs[start : start + _CHUNK_SIZE]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT letterboxd_id, id FROM films WHERE letterboxd_id IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        ids.update({str(row[0]): int(row[1]) for row in rows})
+    return ids
+
+
+def select_film_slugs_by_title_year(conn: sqlite3.Connection) -> dict[tuple[str, int | None], str]:
+    """Map (lowercased title, year) to slug, keeping only keys that identify one film."""
+    mapping: dict[tuple[str, int | None], str] = {}
+    ambiguous: set[tuple[str, int | None]] = set()
+    rows = conn.execute(
+        "SELECT title, year, letterboxd_id FROM films WHERE letterboxd_id IS NOT NULL"
+    ).fetchall()
+    for row in rows:
+        key = (str(row[0]).lower(), row[1])
+        if key in mapping and mapping[key] != row[2]:
+            ambiguous.add(key)
+        mapping[key] = str(row[2])
+    for key in ambiguous:
+        del mapping[key]
+    return mapping
+
+
+def select_uri_slugs(conn: sqlite3.Connection) -> dict[str, str]:
+    rows = conn.execute("SELECT uri, slug FROM letterboxd_uris").fetchall()
+    return {str(row[0]): str(row[1]) for row in rows}
+
+
+def upsert_uri_slugs(conn: sqlite3.Connection, pairs: Iterable[tuple[str, str]]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO letterboxd_uris (uri, slug) VALUES (?, ?)
+        ON CONFLICT(uri) DO UPDATE SET slug = excluded.slug
+        """,
+        list(pairs),
+    )
+
+
+def select_page_fingerprints(conn: sqlite3.Connection, username: str) -> dict[str, str]:
+    rows = conn.execute(
+        """
+        SELECT p.url, p.fingerprint
+        FROM page_fingerprints p
+        JOIN users u ON u.id = p.user_id
+        WHERE u.username = ?
+        """,
+        (username,),
+    ).fetchall()
+    return {str(row[0]): str(row[1]) for row in rows}
+
+
+def upsert_page_fingerprints(
+    conn: sqlite3.Connection,
+    user_id: int,
+    fingerprints: dict[str, str],
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO page_fingerprints (url, user_id, fingerprint, seen_at)
+        VALUES (?, ?, ?, datetime('now'))
+        ON CONFLICT(url) DO UPDATE SET
+            user_id = excluded.user_id,
+            fingerprint = excluded.fingerprint,
+            seen_at = excluded.seen_at
+        """,
+        [(url, user_id, fingerprint) for url, fingerprint in fingerprints.items()],
+    )
+
+
+def select_consecutive_failures(conn: sqlite3.Connection, username: str) -> int:
+    row = conn.execute(
+        "SELECT consecutive_failures FROM fetch_outcomes WHERE username = ?",
+        (username,),
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def upsert_fetch_outcome(
+    conn: sqlite3.Connection,
+    username: str,
+    status: int | None,
+    reason: str,
+    consecutive_failures: int,
+    backoff_hours: float | None,
+) -> None:
+    conn.execute(
+        """
+        INSERT INTO fetch_outcomes (
+            username, status, reason, consecutive_failures, attempted_at, next_eligible_at
+        )
+        VALUES (?, ?, ?, ?, datetime('now'), datetime('now', ?))
+        ON CONFLICT(username) DO UPDATE SET
+            status = excluded.status,
+            reason = excluded.reason,
+            consecutive_failures = excluded.consecutive_failures,
+            attempted_at = excluded.attempted_at,
+            next_eligible_at = excluded.next_eligible_at
+        """,
+        (
+            username,
+            status,
+            reason,
+            consecutive_failures,
+            f"+{backoff_hours * 3600:.0f} seconds" if backoff_hours is not None else None,
+        ),
+    )
+
+
+def select_backed_off_usernames(conn: sqlite3.Connection) -> set[str]:
+    rows = conn.execute(
+        """
+        SELECT username
+        FROM fetch_outcomes
+        WHERE next_eligible_at IS NOT NULL AND next_eligible_at > datetime('now')
+        """
+    ).fetchall()
+    return {str(row[0]) for row in rows}
+
+
+def select_checkpoint(conn: sqlite3.Connection, name: str) -> dict | None:
+    row = conn.execute("SELECT state FROM crawl_checkpoints WHERE name = ?", (name,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_checkpoint(conn: sqlite3.Connection, name: str, state: dict) -> None:
+    conn.execute(
+        """
+        INSERT INTO crawl_checkpoints (name, state, updated_at)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(name) DO UPDATE SET
+            state = excluded.state,
+            updated_at = excluded.updated_at
+        """,
+        (name, json.dumps(state)),
+    )
+
+
+def delete_checkpoint(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute("DELETE FROM crawl_checkpoints WHERE name = ?", (name,))
 
 
 def upsert_graph_edge(conn: sqlite3.Connection, src_id: int, dst_id: int, depth: int) -> None:
@@ -158,12 +455,98 @@ def upsert_graph_edge(conn: sqlite3.Connection, src_id: int, dst_id: int, depth:
         INSERT INTO graph_edges (src_user_id, dst_user_id, depth)
         VALUES (?, ?, ?)
         ON CONFLICT(src_user_id, dst_user_id) DO UPDATE SET
-            depth = MIN(excluded.depth, graph_edges.depth)
+            depth = CASE
+                WHEN graph_edges.removed_at IS NULL THEN MIN(excluded.depth, graph_edges.depth)
+                ELSE excluded.depth
+            END,
+            removed_at = NULL
         """,
         (src_id, dst_id, depth),
     )
 
 
+def upsert_graph_edges(
+    conn: sqlite3.Connection,
+    src_id: int,
+    dst_ids: Iterable[int],
+    depth: int,
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO graph_edges (src_user_id, dst_user_id, depth)
+        VALUES (?, ?, ?)
+        ON CONFLICT(src_user_id, dst_user_id) DO UPDATE SET
+            depth = CASE
+                WHEN graph_edges.removed_at IS NULL THEN MIN(excluded.depth, graph_edges.depth)
+                ELSE excluded.depth
+            END,
+            removed_at = NULL
+        """,
+        [(src_id, dst_id, depth) for dst_id in dst_ids],
+    )
+
+
+def select_followee_ids(conn: sqlite3.Connection, src_id: int) -> set[int]:
+    """Live (not tombstoned) followees of ``src_id``."""
+    rows = conn.execute(
+        "SELECT dst_user_id FROM graph_edges WHERE src_user_id = ? AND removed_at IS NULL",
+        (src_id,),
+    ).fetchall()
+    return {int(row[0]) for row in rows}
+
+
+def tombstone_graph_edges(conn: sqlite3.Connection, src_id: int, dst_ids: Iterable[int]) -> None:
+    conn.executemany(
+        """
+        UPDATE graph_edges SET removed_at = datetime('now')
+        WHERE src_user_id = ? AND dst_user_id = ? AND removed_at IS NULL
+        """,
+        [(src_id, dst_id) for dst_id in dst_ids],
+    )
+
+
+def set_crawled_following(conn: sqlite3.Connection, user_id: int, following: int | None) -> None:
+    """Remember the following count Letterboxd showed when the user's list was last read.
+
+    ``None`` (no count on the page) falls back to the last count seen on their
+    profile or on another user's following page.
+    """
+    conn.execute(
+        """
+        UPDATE users SET
+            crawled_following_count = COALESCE(?, following_count),
+            following_count = COALESCE(?, following_count)
+        WHERE id = ?
+        """,
+        (following, following, user_id),
+    )
+
+
+def select_graph_sources(conn: sqlite3.Connection):
+    """Users whose following list is tracked, with the count it had when last crawled."""
+    return conn.execute(
+        """
+        SELECT
+            u.username AS username,
+            COALESCE(u.crawled_following_count, u.following_count) AS following_count,
+            COALESCE(
+                (
+                    SELECT MIN(g.depth) FROM graph_edges g
+                    WHERE g.dst_user_id = u.id AND g.removed_at IS NULL
+                ),
+                0
+            ) AS depth
+        FROM users u
+        WHERE u.crawled_following_count IS NOT NULL
+           OR EXISTS (
+               SELECT 1 FROM graph_edges g
+               WHERE g.src_user_id = u.id AND g.removed_at IS NULL
+           )
+        ORDER BY u.username
+        """
+    ).fetchall()
+
+
 def select_followees_for_ingest(
     conn: sqlite3.Connection,
     root_username: str,
@@ -176,6 +559,7 @@ def select_followees_for_ingest(
         FROM graph_edges g
         JOIN users u ON u.id = g.dst_user_id
         WHERE g.src_user_id = (SELECT id FROM users WHERE username = ?)
+          AND g.removed_at IS NULL
           AND COALESCE(u.follower_count, 0) >= ?
           AND COALESCE(u.watched_count, 0) >= ?
         ORDER BY u.follower_count DESC, u.watched_count DESC
@@ -196,12 +580,11 @@ def select_missing_followees(
         SELECT u.username
         FROM graph_edges g
         JOIN users u ON u.id = g.dst_user_id
-        LEFT JOIN interactions i ON i.user_id = u.id
         WHERE g.src_user_id = (SELECT id FROM users WHERE username = ?)
+          AND g.removed_at IS NULL
           AND COALESCE(u.follower_count, 0) >= ?
           AND COALESCE(u.watched_count, 0) >= ?
-        GROUP BY u.id
-        HAVING COUNT(i.film_id) = 0
+          AND NOT EXISTS (SELECT 1 FROM interactions i WHERE i.user_id = u.id)
         ORDER BY u.follower_count DESC, u.watched_count DESC
         """,
         (root_username, min_followers, min_watched),
@@ -219,9 +602,8 @@ def select_social_rows(
     if followee_ids is not None:
         if not followee_ids:
             return []
-        placeholders = ",".join("?" for _ in followee_ids)
-        followee_filter = f" AND i.user_id IN ({placeholders})"
-        params.extend(followee_ids)
+        ids = _id_set(conn, "user_id_set", followee_ids)
+        followee_filter = f" AND i.user_id IN ({ids})"
     return conn.execute(
         f"""
         SELECT
@@ -250,23 +632,64 @@ def select_social_rows(
     ).fetchall()
 
 
-def select_similarity_rows(conn: sqlite3.Connection, root_username: str):
-    return conn.execute(
-        """
-        SELECT
-            i2.user_id AS followee_id,
-            COUNT(*) AS overlap,
-            SUM(CASE WHEN i1.rating IS NOT NULL AND i2.rating IS NOT NULL THEN 1 ELSE 0 END) AS rated_overlap,
-            AVG(CASE WHEN i1.rating IS NOT NULL AND i2.rating IS NOT NULL THEN ABS(i1.rating - i2.rating) END) AS avg_diff
+def ensure_similarity_root(conn: sqlite3.Connection, root_username: str) -> None:
+    """Start maintaining ``user_pair_stats`` for the root, building its pairs on first use.
+
+    From then on the interaction triggers keep the root's pairs current, so
+    ``select_similarity_rows`` never has to self-join interactions again.
+    """
+    root_id = select_user_id(conn, root_username)
+    if root_id is None:
+        return
+    added = conn.execute(
+        "INSERT INTO similarity_roots (user_id) VALUES (?) ON CONFLICT(user_id) DO NOTHING",
+        (root_id,),
+    ).rowcount
+    if not added:
+        return
+    sums = ", ".join(
+        f"SUM({expr})" for expr in pair_deltas("i1.rating", "(i2.rating_half / 2.0)")
+    )
+    conn.execute("DELETE FROM user_pair_stats WHERE root_id = ?", (root_id,))
+    conn.execute(
+        f"""
+        INSERT INTO user_pair_stats (root_id, other_id, {", ".join(PAIR_COLUMNS)})
+        SELECT i1.user_id, i2.user_id, {sums}
         FROM interactions i1
         JOIN interactions i2 ON i1.film_id = i2.film_id
-        WHERE i1.user_id = (SELECT id FROM users WHERE username = ?)
-          AND i2.user_id != (SELECT id FROM users WHERE username = ?)
+        WHERE i1.user_id = ?
+          AND i2.user_id != ?
           AND i1.watched = 1
-          AND i2.watched = 1
+          AND i2.flags & {WATCHED}
         GROUP BY i2.user_id
         """,
-        (root_username, root_username),
+        (root_id, root_id),
+    )
+
+
+def select_similarity_rows(conn: sqlite3.Connection, root_username: str):
+    """Pair counters between the root and every user sharing a watched film.
+
+    Reads ``user_pair_stats``; call ``ensure_similarity_root`` first so the
+    root's pairs exist.
+    """
+    return conn.execute(
+        """
+        SELECT
+            other_id AS followee_id,
+            overlap,
+            rated_overlap,
+            CASE WHEN rated_overlap > 0 THEN abs_diff_sum / rated_overlap END AS avg_diff,
+            root_rating_sum,
+            other_rating_sum,
+            root_sq_sum,
+            other_sq_sum,
+            cross_sum
+        FROM user_pair_stats
+        WHERE root_id = (SELECT id FROM users WHERE username = ?)
+          AND overlap > 0
+        """,
+        (root_username,),
     ).fetchall()
 
 
@@ -293,6 +716,132 @@ def select_all_usernames(conn: sqlite3.Connection) -> list[str]:
     return [row[0] for row in rows]
 
 
+def select_root_usernames(conn: sqlite3.Connection) -> list[str]:
+    rows = conn.execute(
+        """
+        SELECT u.username
+        FROM users u
+        WHERE EXISTS (
+            SELECT 1 FROM graph_edges g
+            WHERE g.src_user_id = u.id
+              AND g.depth = 1
+              AND g.removed_at IS NULL
+        )
+        ORDER BY u.username
+        """
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def select_refresh_stats(conn: sqlite3.Connection):
+    return conn.execute(
+        """
+        SELECT
+            u.username AS username,
+            u.watched_count AS watched_count,
+            u.activity_rate AS activity_rate,
+            julianday('now') - julianday(COALESCE(u.refreshed_at, u.fetched_at)) AS staleness_days,
+            EXISTS (SELECT 1 FROM interactions i WHERE i.user_id = u.id) AS has_interactions
+        FROM users u
+        ORDER BY u.username
+        """
+    ).fetchall()
+
+
+def select_user_counts(conn: sqlite3.Connection) -> dict[str, tuple[int | None, int | None]]:
+    """username -> (following_count, watched_count) for every known user."""
+    rows = conn.execute("SELECT username, following_count, watched_count FROM users").fetchall()
+    return {str(row[0]): (row[1], row[2]) for row in rows}
+
+
+def select_follow_adjacency(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    rows = conn.execute(
+        """
+        SELECT s.username, d.username
+        FROM graph_edges e
+        JOIN users s ON s.id = e.src_user_id
+        JOIN users d ON d.id = e.dst_user_id
+        WHERE e.removed_at IS NULL
+        ORDER BY s.username, d.username
+        """
+    ).fetchall()
+    adjacency: dict[str, list[str]] = {}
+    for src, dst in rows:
+        adjacency.setdefault(str(src), []).append(str(dst))
+    return adjacency
+
+
+def select_watched_overlaps(
+    conn: sqlite3.Connection,
+    root_username: str,
+    usernames: list[str] | None = None,
+) -> dict[str, tuple[int, int]]:
+    """username -> (watched films, films the root has also watched), from ingested interactions."""
+    sql = """
+        SELECT u.username, COUNT(*), COUNT(r.film_id)
+        FROM interactions i
+        JOIN users u ON u.id = i.user_id
+        LEFT JOIN interactions r
+            ON r.film_id = i.film_id
+           AND r.watched = 1
+           AND r.user_id = (SELECT id FROM users WHERE username = ?)
+        WHERE i.watched = 1
+    """
+    if usernames is None:
+        rows = conn.execute(f"{sql} GROUP BY i.user_id", (root_username,)).fetchall()
+        return {str(row[0]): (int(row[1]), int(row[2])) for row in rows}
+    overlaps: dict[str, tuple[int, int]] = {}
+    for start in range(0, len(usernames), _CHUNK_SIZE):
+        chunk = usernames[start : start + _CHUNK_SIZE]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"{sql} AND u.username IN ({placeholders}) GROUP BY u.username",
+            [root_username, *chunk],
+        ).fetchall()
+        overlaps.update({str(row[0]): (int(row[1]), int(row[2])) for row in rows})
+    return overlaps
+
+
+def select_graph_edge_ids(conn: sqlite3.Connection) -> list[tuple[int, int]]:
+    rows = conn.execute(
+        "SELECT src_user_id, dst_user_id FROM graph_edges WHERE removed_at IS NULL"
+    ).fetchall()
+    return [(int(row[0]), int(row[1])) for row in rows]
+
+
+def count_user_interactions(conn: sqlite3.Connection, user_id: int) -> int:
+    row = conn.execute(
+        "SELECT COUNT(*) FROM interactions WHERE user_id = ?",
+        (user_id,),
+    ).fetchone()
+    return int(row[0])
+
+
+def record_refresh(
+    conn: sqlite3.Connection,
+    user_id: int,
+    new_items: int,
+    signature: str | None = None,
+) -> None:
+    """Stamp a completed interaction refresh and fold new items into the activity EMA."""
+    conn.execute(
+        """
+        UPDATE users SET
+            activity_rate = CASE
+                WHEN refreshed_at IS NULL THEN activity_rate
+                WHEN activity_rate IS NULL THEN
+                    ? / MAX(julianday('now') - julianday(refreshed_at), 1.0 / 24)
+                ELSE 0.5 * activity_rate
+                    + 0.5 * ? / MAX(julianday('now') - julianday(refreshed_at), 1.0 / 24)
+            END,
+            refreshed_at = datetime('now'),
+            refresh_signature = ?
+        WHERE id = ?
+        """,
+        (new_items, new_items, signature, user_id),
+    )
+
+
 def select_user_id(conn: sqlite3.Connection, username: str) -> int | None:
     row = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
     if not row:
@@ -305,19 +854,17 @@ def select_user_rating_stats(
 ) -> dict[int, tuple[float, float] | None]:
     if not user_ids:
         return {}
-    placeholders = ",".join("?" for _ in user_ids)
+    ids = _id_set(conn, "user_id_set", user_ids)
     rows = conn.execute(
         f"""
         SELECT user_id,
-               AVG(rating) AS mean_rating,
-               AVG(rating * rating) AS mean_sq,
-               COUNT(*) AS n
-        FROM interactions
-        WHERE rating IS NOT NULL
-          AND user_id IN ({placeholders})
-        GROUP BY user_id
-        """,
-        user_ids,
+               rating_sum / rated_count AS mean_rating,
+               rating_sq_sum / rated_count AS mean_sq,
+               rated_count AS n
+        FROM user_stats
+        WHERE rated_count > 0
+          AND user_id IN ({ids})
+        """
     ).fetchall()
     stats: dict[int, tuple[float, float] | None] = {}
     for row in rows:
@@ -342,20 +889,20 @@ def select_shared_ratings(
 ) -> list[tuple[int, float, float]]:
     if not followee_ids:
         return []
-    placeholders = ",".join("?" for _ in followee_ids)
+    ids = _id_set(conn, "user_id_set", followee_ids)
     rows = conn.execute(
         f"""
         SELECT i2.user_id, i1.rating, i2.rating
         FROM interactions i1
         JOIN interactions i2 ON i1.film_id = i2.film_id
         WHERE i1.user_id = ?
-          AND i2.user_id IN ({placeholders})
+          AND i2.user_id IN ({ids})
           AND i1.watched = 1
           AND i2.watched = 1
           AND i1.rating IS NOT NULL
           AND i2.rating IS NOT NULL
         """,
-        (root_id, *followee_ids),
+        (root_id,),
     ).fetchall()
     return [(int(r[0]), float(r[1]), float(r[2])) for r in rows]
 
@@ -384,10 +931,9 @@ def select_shared_rated_films(
 def select_watched_count(conn: sqlite3.Connection, username: str) -> int:
     row = conn.execute(
         """
-        SELECT COALESCE(u.watched_count, (
-            SELECT COUNT(*) FROM interactions WHERE user_id = u.id AND watched = 1
-        ))
+        SELECT COALESCE(u.watched_count, s.watched_count)
         FROM users u
+        LEFT JOIN user_stats s ON s.user_id = u.id
         WHERE u.username = ?
         """,
         (username,),
@@ -398,10 +944,9 @@ def select_watched_count(conn: sqlite3.Connection, username: str) -> int:
 def select_followee_watched_count(conn: sqlite3.Connection, user_id: int) -> int:
     row = conn.execute(
         """
-        SELECT COALESCE(u.watched_count, (
-            SELECT COUNT(*) FROM interactions WHERE user_id = u.id AND watched = 1
-        ))
+        SELECT COALESCE(u.watched_count, s.watched_count)
         FROM users u
+        LEFT JOIN user_stats s ON s.user_id = u.id
         WHERE u.id = ?
         """,
         (user_id,),
@@ -412,17 +957,14 @@ def select_followee_watched_count(conn: sqlite3.Connection, user_id: int) -> int
 def select_followee_watched_counts(conn: sqlite3.Connection, user_ids: list[int]) -> dict[int, int]:
     if not user_ids:
         return {}
-    placeholders = ",".join("?" for _ in user_ids)
+    ids = _id_set(conn, "user_id_set", user_ids)
     rows = conn.execute(
         f"""
-        SELECT u.id,
-               COALESCE(u.watched_count, (
-                   SELECT COUNT(*) FROM interactions WHERE user_id = u.id AND watched = 1
-               )) AS watched_count
+        SELECT u.id, COALESCE(u.watched_count, s.watched_count) AS watched_count
         FROM users u
-        WHERE u.id IN ({placeholders})
-        """,
-        user_ids,
+        LEFT JOIN user_stats s ON s.user_id = u.id
+        WHERE u.id IN ({ids})
+        """
     ).fetchall()
     return {int(row[0]): int(row[1] or 0) for row in rows}
 
@@ -430,14 +972,13 @@ def select_followee_watched_counts(conn: sqlite3.Connection, user_ids: list[int]
 def select_user_names(conn: sqlite3.Connection, user_ids: list[int]) -> dict[int, tuple[str, str | None]]:
     if not user_ids:
         return {}
-    placeholders = ",".join("?" for _ in user_ids)
+    ids = _id_set(conn, "user_id_set", user_ids)
     rows = conn.execute(
         f"""
         SELECT id, username, display_name
         FROM users
-        WHERE id IN ({placeholders})
-        """,
-        user_ids,
+        WHERE id IN ({ids})
+        """
     ).fetchall()
     return {int(row[0]): (row[1], row[2]) for row in rows}
 
@@ -454,6 +995,13 @@ def select_following_count(conn: sqlite3.Connection, username: str) -> int:
 
 def delete_user_data(conn: sqlite3.Connection, user_id: int) -> None:
     conn.execute("DELETE FROM interactions WHERE user_id = ?", (user_id,))
+    conn.execute("DELETE FROM user_stats WHERE user_id = ?", (user_id,))
+    conn.execute(
+        "DELETE FROM user_pair_stats WHERE root_id = ? OR other_id = ?",
+        (user_id, user_id),
+    )
+    conn.execute("DELETE FROM similarity_roots WHERE user_id = ?", (user_id,))
+    conn.execute("DELETE FROM page_fingerprints WHERE user_id = ?", (user_id,))
     conn.execute("DELETE FROM recommendations WHERE user_id = ?", (user_id,))
     conn.execute(
         "DELETE FROM graph_edges WHERE src_user_id = ? OR dst_user_id = ?",
@@ -473,18 +1021,120 @@ def delete_user_by_username(conn: sqlite3.Connection, username: str) -> bool:
     return True
 
 
+def select_dataset_version(conn: sqlite3.Connection) -> int:
+    """Sequence number of the latest logged change; never decreases, even after pruning."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def select_changes_since(
+    conn: sqlite3.Connection,
+    seq: int,
+    entities: Iterable[str] | None = None,
+):
+    """Changes after ``seq`` in log order.
+
+    A consumer whose ``seq`` is older than ``select_oldest_change`` has missed
+    pruned entries and must rebuild instead.
+    """
+    sql = "SELECT seq, entity, entity_id, user_id, op FROM change_log WHERE seq > ?"
+    params: list[object] = [seq]
+    if entities is not None:
+        entities = list(entities)
+        sql += f" AND entity IN ({','.join('?' for _ in entities)})"
+        params.extend(entities)
+    return conn.execute(f"{sql} ORDER BY seq", params).fetchall()
+
+
+def select_oldest_change(conn: sqlite3.Connection) -> int | None:
+    row = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+def select_change_cursor(conn: sqlite3.Connection, consumer: str) -> int:
+    row = conn.execute("SELECT seq FROM change_cursors WHERE consumer = ?", (consumer,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def save_change_cursor(conn: sqlite3.Connection, consumer: str, seq: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO change_cursors (consumer, seq, updated_at)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(consumer) DO UPDATE SET
+            seq = excluded.seq,
+            updated_at = excluded.updated_at
+        """,
+        (consumer, seq),
+    )
+
+
+def prune_change_log(conn: sqlite3.Connection, retention_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Drop entries every registered consumer has applied.
+
+    With no consumer registered, only entries older than ``retention_days``
+    go, so a consumer added later can still start from the recent ones.
+    """
+    row = conn.execute("SELECT MIN(seq) FROM change_cursors").fetchone()
+    if row and row[0] is not None:
+        upto = row[0]
+    else:
+        # changed_at rises with seq, so the walk stops at the first entry kept.
+        kept = conn.execute(
+            "SELECT seq FROM change_log WHERE changed_at >= datetime('now', ?) ORDER BY seq LIMIT 1",
+            (f"-{int(retention_days)} days",),
+        ).fetchone()
+        upto = kept[0] - 1 if kept else select_dataset_version(conn)
+    return conn.execute("DELETE FROM change_log WHERE seq <= ?", (upto,)).rowcount
+
+
+def select_recommendations(conn: sqlite3.Connection, user_id: int, model_version: str):
+    return conn.execute(
+        """
+        SELECT
+            f.id AS film_id,
+            f.title AS title,
+            f.year AS year,
+            f.genres AS genres,
+            r.score_total AS score
+        FROM recommendations r
+        JOIN films f ON f.id = r.film_id
+        WHERE r.user_id = ?
+          AND r.model_version = ?
+        ORDER BY r.score_total DESC
+        """,
+        (user_id, model_version),
+    ).fetchall()
+
+
+def replace_recommendations(
+    conn: sqlite3.Connection,
+    user_id: int,
+    model_version: str,
+    scores: Iterable[tuple[int, float]],
+) -> None:
+    """Store the user's social scores under ``model_version``, dropping older versions."""
+    conn.execute("DELETE FROM recommendations WHERE user_id = ?", (user_id,))
+    conn.executemany(
+        """
+        INSERT INTO recommendations (user_id, film_id, score_total, score_social, model_version)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(user_id, film_id, score, score, model_version) for film_id, score in scores],
+    )
+
+
 def select_film_slugs(conn: sqlite3.Connection, film_ids: list[int]) -> dict[int, str]:
     if not film_ids:
         return {}
-    placeholders = ",".join("?" for _ in film_ids)
+    ids = _id_set(conn, "film_id_set", film_ids)
     rows = conn.execute(
         f"""
         SELECT id, letterboxd_id
         FROM films
-        WHERE id IN ({placeholders})
+        WHERE id IN ({ids})
           AND letterboxd_id IS NOT NULL
-        """,
-        film_ids,
+        """
     ).fetchall()
     return {int(row[0]): str(row[1]) for row in rows}
 
@@ -539,16 +1189,16 @@ def select_available_film_ids(
     _validate_availability_column(provider_column)
     if not film_ids:
         return set()
-    placeholders = ",".join("?" for _ in film_ids)
+    ids = _id_set(conn, "film_id_set", film_ids)
     rows = conn.execute(
         f"""
         SELECT film_id
         FROM film_availability_flags
-        WHERE film_id IN ({placeholders})
+        WHERE film_id IN ({ids})
           AND region = ?
           AND "{provider_column}" = 1
         """,
-        (*film_ids, region),
+        (region,),
     ).fetchall()
     return {int(row[0]) for row in rows}
 
@@ -576,15 +1226,14 @@ def select_availability_map(
         return {}
     for col in cols:
         _validate_availability_column(col)
-    placeholders = ",".join("?" for _ in film_ids)
+    ids = _id_set(conn, "film_id_set", film_ids)
     col_expr = ", ".join(f'"{col}"' for col in cols)
     rows = conn.execute(
         f"""
         SELECT film_id, {col_expr}
         FROM film_availability_flags
-        WHERE film_id IN ({placeholders})
-        """,
-        film_ids,
+        WHERE film_id IN ({ids})
+        """
     ).fetchall()
     results: dict[int, dict[str, bool]] = {}
     for row in rows:
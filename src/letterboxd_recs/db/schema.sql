@@ -7,7 +7,15 @@ CREATE TABLE IF NOT EXISTS users (
     follower_count INTEGER,
     following_count INTEGER,
     watched_count INTEGER,
-    fetched_at TEXT
+    fetched_at TEXT,
+    refreshed_at TEXT,
+    activity_rate REAL,
+    films_this_year INTEGER,
+    lists_count INTEGER,
+    watchlist_count INTEGER,
+    latest_diary_entry TEXT,
+    refresh_signature TEXT,
+    crawled_following_count INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS films (
@@ -18,17 +26,53 @@ CREATE TABLE IF NOT EXISTS films (
     genres TEXT
 );
 
+-- Clustered on (user_id, film_id). The three booleans are one `flags` bit set
+-- (1 liked, 2 watched, 4 watchlist), ratings are integer half-stars and watch
+-- dates are days since 1970-01-01; the virtual columns give back the readable
+-- values. Generated columns can't be assigned, so `UPDATE OF` trigger lists
+-- name the stored columns.
 CREATE TABLE IF NOT EXISTS interactions (
     user_id INTEGER NOT NULL,
     film_id INTEGER NOT NULL,
-    rating REAL,
-    liked BOOLEAN DEFAULT 0,
-    watched BOOLEAN DEFAULT 0,
-    watchlist BOOLEAN DEFAULT 0,
-    watch_date DATE,
+    flags INTEGER NOT NULL DEFAULT 0,
+    rating_half INTEGER,
+    watch_day INTEGER,
+    rating REAL GENERATED ALWAYS AS (rating_half / 2.0) VIRTUAL,
+    liked INTEGER GENERATED ALWAYS AS (flags & 1) VIRTUAL,
+    watched INTEGER GENERATED ALWAYS AS ((flags >> 1) & 1) VIRTUAL,
+    watchlist INTEGER GENERATED ALWAYS AS ((flags >> 2) & 1) VIRTUAL,
+    watch_date TEXT GENERATED ALWAYS AS (date(watch_day * 86400, 'unixepoch')) VIRTUAL,
     PRIMARY KEY (user_id, film_id),
     FOREIGN KEY (user_id) REFERENCES users(id),
     FOREIGN KEY (film_id) REFERENCES films(id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS letterboxd_uris (
+    uri TEXT PRIMARY KEY,
+    slug TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS page_fingerprints (
+    url TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS fetch_outcomes (
+    username TEXT PRIMARY KEY,
+    status INTEGER,
+    reason TEXT NOT NULL,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    attempted_at TEXT NOT NULL,
+    next_eligible_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS crawl_checkpoints (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at TEXT NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS film_features (
@@ -54,6 +98,7 @@ CREATE TABLE IF NOT EXISTS graph_edges (
     src_user_id INTEGER NOT NULL,
     dst_user_id INTEGER NOT NULL,
     depth INTEGER NOT NULL,
+    removed_at TEXT,
     PRIMARY KEY (src_user_id, dst_user_id),
     FOREIGN KEY (src_user_id) REFERENCES users(id),
     FOREIGN KEY (dst_user_id) REFERENCES users(id)
@@ -97,3 +142,159 @@ CREATE TABLE IF NOT EXISTS film_availability_flags (
     last_updated TEXT NOT NULL,
     FOREIGN KEY (film_id) REFERENCES films(id)
 );
+
+-- Per-user aggregates over interactions, kept current by the triggers below so
+-- rating stats and watched counts are a primary-key lookup instead of a scan.
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY,
+    watched_count INTEGER NOT NULL DEFAULT 0,
+    rated_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_sq_sum REAL NOT NULL DEFAULT 0,
+    watchlist_count INTEGER NOT NULL DEFAULT 0,
+    last_watch_date DATE,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE TRIGGER IF NOT EXISTS interactions_stats_insert
+AFTER INSERT ON interactions
+BEGIN
+    INSERT INTO user_stats (
+        user_id, watched_count, rated_count, rating_sum, rating_sq_sum,
+        watchlist_count, last_watch_date
+    ) VALUES (
+        NEW.user_id, NEW.watched IS 1, NEW.rating IS NOT NULL, COALESCE(NEW.rating, 0),
+        COALESCE(NEW.rating * NEW.rating, 0), NEW.watchlist IS 1, NEW.watch_date
+    )
+    ON CONFLICT(user_id) DO UPDATE SET
+        watched_count = watched_count + excluded.watched_count,
+        rated_count = rated_count + excluded.rated_count,
+        rating_sum = rating_sum + excluded.rating_sum,
+        rating_sq_sum = rating_sq_sum + excluded.rating_sq_sum,
+        watchlist_count = watchlist_count + excluded.watchlist_count,
+        last_watch_date = MAX(
+            COALESCE(last_watch_date, excluded.last_watch_date),
+            COALESCE(excluded.last_watch_date, last_watch_date)
+        );
+END;
+
+-- Removing the row that held the latest watch date is the only case that
+-- has to look back at the user's interactions.
+CREATE TRIGGER IF NOT EXISTS interactions_stats_delete
+AFTER DELETE ON interactions
+BEGIN
+    UPDATE user_stats SET
+        watched_count = watched_count - (OLD.watched IS 1),
+        rated_count = rated_count - (OLD.rating IS NOT NULL),
+        rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+        rating_sq_sum = rating_sq_sum - COALESCE(OLD.rating * OLD.rating, 0),
+        watchlist_count = watchlist_count - (OLD.watchlist IS 1),
+        last_watch_date = CASE
+            WHEN OLD.watch_date >= last_watch_date THEN
+                (SELECT MAX(watch_date) FROM interactions WHERE user_id = OLD.user_id)
+            ELSE last_watch_date
+        END
+    WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS interactions_stats_update
+AFTER UPDATE OF user_id, rating_half, flags, watch_day ON interactions
+WHEN OLD.user_id IS NOT NEW.user_id
+  OR OLD.rating IS NOT NEW.rating
+  OR OLD.watched IS NOT NEW.watched
+  OR OLD.watchlist IS NOT NEW.watchlist
+  OR OLD.watch_date IS NOT NEW.watch_date
+BEGIN
+    UPDATE user_stats SET
+        watched_count = watched_count - (OLD.watched IS 1),
+        rated_count = rated_count - (OLD.rating IS NOT NULL),
+        rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+        rating_sq_sum = rating_sq_sum - COALESCE(OLD.rating * OLD.rating, 0),
+        watchlist_count = watchlist_count - (OLD.watchlist IS 1),
+        last_watch_date = CASE
+            WHEN OLD.watch_date >= last_watch_date THEN
+                (SELECT MAX(watch_date) FROM interactions WHERE user_id = OLD.user_id)
+            ELSE last_watch_date
+        END
+    WHERE user_id = OLD.user_id;
+    INSERT INTO user_stats (
+        user_id, watched_count, rated_count, rating_sum, rating_sq_sum,
+        watchlist_count, last_watch_date
+    ) VALUES (
+        NEW.user_id, NEW.watched IS 1, NEW.rating IS NOT NULL, COALESCE(NEW.rating, 0),
+        COALESCE(NEW.rating * NEW.rating, 0), NEW.watchlist IS 1, NEW.watch_date
+    )
+    ON CONFLICT(user_id) DO UPDATE SET
+        watched_count = watched_count + excluded.watched_count,
+        rated_count = rated_count + excluded.rated_count,
+        rating_sum = rating_sum + excluded.rating_sum,
+        rating_sq_sum = rating_sq_sum + excluded.rating_sq_sum,
+        watchlist_count = watchlist_count + excluded.watchlist_count,
+        last_watch_date = MAX(
+            COALESCE(last_watch_date, excluded.last_watch_date),
+            COALESCE(excluded.last_watch_date, last_watch_date)
+        );
+END;
+
+-- Users whose similarity to everyone else is maintained in user_pair_stats.
+CREATE TABLE IF NOT EXISTS similarity_roots (
+    user_id INTEGER PRIMARY KEY,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Overlap counters between a similarity root and every user sharing a watched
+-- film; maintained by the triggers in db/pair_stats.py.
+CREATE TABLE IF NOT EXISTS user_pair_stats (
+    root_id INTEGER NOT NULL,
+    other_id INTEGER NOT NULL,
+    overlap INTEGER NOT NULL DEFAULT 0,
+    rated_overlap INTEGER NOT NULL DEFAULT 0,
+    abs_diff_sum REAL NOT NULL DEFAULT 0,
+    root_rating_sum REAL NOT NULL DEFAULT 0,
+    other_rating_sum REAL NOT NULL DEFAULT 0,
+    root_sq_sum REAL NOT NULL DEFAULT 0,
+    other_sq_sum REAL NOT NULL DEFAULT 0,
+    cross_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (root_id, other_id),
+    FOREIGN KEY (root_id) REFERENCES users(id),
+    FOREIGN KEY (other_id) REFERENCES users(id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_user_pair_stats_other
+    ON user_pair_stats (other_id);
+
+-- Covering indexes for the similarity, social and shared-rating reads in repo.py;
+-- tests/test_query_plans.py fails when one of those queries stops using them.
+-- The interactions primary key serves the per-user reads, and migration 3 in
+-- db/conn.py adds idx_interactions_watched_film for the per-film ones: older
+-- databases only have its columns once that migration has rebuilt the table.
+CREATE INDEX IF NOT EXISTS idx_graph_edges_dst
+    ON graph_edges (dst_user_id, depth);
+
+CREATE INDEX IF NOT EXISTS idx_page_fingerprints_user
+    ON page_fingerprints (user_id);
+
+CREATE INDEX IF NOT EXISTS idx_fetch_outcomes_next_eligible
+    ON fetch_outcomes (next_eligible_at) WHERE next_eligible_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_recommendations_version
+    ON recommendations (user_id, model_version, score_total);
+
+-- One row per change to data that feeds scoring, written by the triggers in
+-- db/change_log.py. The AUTOINCREMENT sequence doubles as the dataset version,
+-- so it keeps rising after old entries are pruned.
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    user_id INTEGER,
+    op TEXT NOT NULL,
+    changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Last change_log sequence number each incremental consumer has applied.
+CREATE TABLE IF NOT EXISTS change_cursors (
+    consumer TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future
+import queue
+import sqlite3
+import threading
+from typing import TypeVar
+
+from letterboxd_recs.db.bulk import bulk_batch_size, restore_indexes
+from letterboxd_recs.db.connections import open_connection
+from letterboxd_recs.util.logging import get_logger
+
+LOG = get_logger(__name__)
+T = TypeVar("T")
+
+_STOP = object()
+# In bulk mode a partial batch is committed once the queue has been idle this long.
+_BULK_IDLE_SECONDS = 0.5
+
+
+class DbWriter:
+    """Single thread that owns the write connection.
+
+    Worker threads submit callables that receive the connection; jobs run in
+    submission order and are committed in groups, so concurrent ingests never
+    compete for the SQLite write lock.
+
+    Inside ``db.bulk.bulk_load`` the writer batches ``bulk_batch_size`` jobs
+    per transaction and no longer commits whenever the queue drains; ``call``
+    still commits right away because its caller is waiting.
+    """
+
+    def __init__(self, path: str, batch_size: int | None = None) -> None:
+        self.path = path
+        bulk = bulk_batch_size()
+        self.bulk = bulk is not None
+        self.batch_size = max(1, batch_size if batch_size is not None else bulk or 25)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._started = False
+        self._closed = False
+
+    def __enter__(self) -> DbWriter:
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T], flush: bool = False) -> Future[T]:
+        if self._closed:
+            raise RuntimeError("DbWriter is closed")
+        self.start()
+        future: Future[T] = Future()
+        self._queue.put((fn, future, flush))
+        return future
+
+    def call(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        return self.submit(fn, flush=True).result()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._started:
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        # A dedicated handle: the thread owns it and closes it on shutdown.
+        conn = open_connection(self.path)
+        if not self.bulk:
+            # Rebuild indexes left dropped by a bulk load that was killed mid-way;
+            # one still running in another process keeps its deferral.
+            restore_indexes(conn)
+        pending: list[tuple[Future, object]] = []
+        try:
+            while True:
+                idle = _BULK_IDLE_SECONDS if self.bulk and pending else None
+                try:
+                    job = self._queue.get(timeout=idle)
+                except queue.Empty:
+                    self._commit(conn, pending)
+                    pending = []
+                    continue
+                if job is _STOP:
+                    break
+                fn, future, flush = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                conn.execute("SAVEPOINT writer_job")
+                try:
+                    result = fn(conn)
+                except BaseException as exc:  # noqa: BLE001
+                    conn.execute("ROLLBACK TO writer_job")
+                    conn.execute("RELEASE writer_job")
+                    future.set_exception(exc)
+                    continue
+                conn.execute("RELEASE writer_job")
+                pending.append((future, result))
+                due = flush if self.bulk else self._queue.empty()
+                if len(pending) >= self.batch_size or due:
+                    self._commit(conn, pending)
+                    pending = []
+        finally:
+            self._commit(conn, pending)
+            conn.close()
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, pending: list[tuple[Future, object]]) -> None:
+        try:
+            conn.commit()
+        except sqlite3.Error as exc:
+            LOG.warning("Writer commit failed: %s", exc)
+            conn.rollback()
+            for future, _ in pending:
+                future.set_exception(exc)
+            return
+        for future, result in pending:
+            future.set_result(result)
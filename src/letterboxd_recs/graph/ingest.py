@@ -1,21 +1,52 @@
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass
+import heapq
+import math
+import random
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+import sqlite3
 
 from letterboxd_recs.config import Config
 from letterboxd_recs.db import repo
 from letterboxd_recs.db.conn import ensure_db
-from letterboxd_recs.ingest.letterboxd.client import LetterboxdClient
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.client import FetchError, LetterboxdClient, cache_key_for_url
 from letterboxd_recs.ingest.letterboxd.ingest import ingest_user
-from letterboxd_recs.ingest.letterboxd.parse import is_challenge_page, parse_next_page
-from letterboxd_recs.ingest.letterboxd.social import FolloweeSummary, parse_following_entries
+from letterboxd_recs.ingest.letterboxd.parse import (
+    is_challenge_page,
+    is_not_found_page,
+    parse_next_page,
+    parse_profile,
+)
+from letterboxd_recs.ingest.letterboxd.schedule import FOLLOWING_PAGE_SIZE, full_ingest_requests
+from letterboxd_recs.ingest.letterboxd.social import (
+    FolloweeSummary,
+    parse_following_entries,
+    parse_following_total,
+)
+from letterboxd_recs.util.budget import BudgetExhausted, RequestBudget
+from letterboxd_recs.util.cache import CacheEntry
 from letterboxd_recs.util.logging import get_logger
-from letterboxd_recs.util.ratelimit import sleep_seconds
+from letterboxd_recs.util.ratelimit import RateLimiter, sleep_seconds
 
 LOG = get_logger(__name__)
 BASE_URL = "https://letterboxd.com"
+# Share of a follower's similarity a best-first frontier user is assumed to inherit.
+INHERITED_SIMILARITY = 0.5
+# Stand-in for the root's similarity before any followee has been ingested.
+DEFAULT_ROOT_SIMILARITY = 0.1
+
+
+@dataclass(frozen=True)
+class FollowingList:
+    """A user's deduplicated, unfiltered following list."""
+
+    followees: list[FolloweeSummary]
+    # The following count Letterboxd showed when the list was read, if any.
+    total: int | None = None
 
 
 @dataclass(frozen=True)
@@ -23,6 +54,8 @@ class GraphIngestResult:
     username: str
     nodes: int
     edges: int
+    complete: bool = True
+    requests: int = 0
 
 
 def ingest_follow_graph(
@@ -31,73 +64,586 @@ def ingest_follow_graph(
     refresh: bool = False,
     max_depth: int | None = None,
     ingest_interactions: bool = True,
+    budget: RequestBudget | None = None,
+    resume: bool = True,
+    workers: int | None = None,
 ) -> GraphIngestResult:
+    """Level-synchronous breadth-first crawl of the follow graph.
+
+    The following lists of a whole frontier are fetched ``workers`` at a time,
+    with every request (following pages and followee ingests alike) spaced by
+    one shared rate limiter. Followee interactions are ingested on a separate
+    pool so they don't hold up the traversal; all writes go through a single
+    ``DbWriter``.
+
+    When ``budget`` runs out the frontier is saved as a checkpoint and the crawl
+    returns with ``complete=False``; the next call with the same root and depth
+    resumes from it.
+    """
     ensure_db(cfg.database_path)
     depth_limit = max_depth if max_depth is not None else cfg.graph.max_depth
+    worker_count = max(1, workers or cfg.scrape.workers)
+    limiter = RateLimiter(cfg.scrape.rate_limit_seconds)
     cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
-    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir)
+    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir, budget=budget, limiter=limiter)
+    checkpoint = f"graph:{username}"
 
     with repo.connect(cfg.database_path) as conn:
-        root_id = repo.ensure_user(conn, username)
-        visited: set[str] = {username}
-        edges_added = 0
+        repo.ensure_user(conn, username)
+        conn.commit()
+        state = repo.select_checkpoint(conn, checkpoint) if resume else None
+    if state is not None and state.get("max_depth") == depth_limit:
+        LOG.info("Resuming graph crawl for %s (%s queued)", username, len(state["queue"]))
+        visited = set(state["visited"])
+        queue = [(name, depth) for name, depth in state["queue"]]
+        pending: list[str] = list(state["pending"])
+    else:
+        visited = {username}
+        queue = [(username, 0)]
+        pending = []
+    edges_added = 0
+    exhausted = False
 
-        queue: deque[tuple[str, int]] = deque([(username, 0)])
-        while queue:
-            current, depth = queue.popleft()
+    with (
+        DbWriter(cfg.database_path) as writer,
+        ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="graph") as fetchers,
+        ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="graph-ingest") as ingesters,
+    ):
+        ingests = {
+            ingesters.submit(_ingest_followee, name, cfg, budget, limiter, writer): name for name in pending
+        }
+        writes: list[Future] = []
+        while queue and not exhausted:
+            depth = min(d for _, d in queue)
             if depth >= depth_limit:
-                continue
-
-            followees = _collect_followees(current, client, refresh)
-            for followee in followees:
-                if not _passes_filters(followee):
+                break
+            level = [name for name, d in queue if d == depth]
+            queue = [(name, d) for name, d in queue if d != depth]
+            fetches = {
+                fetchers.submit(_collect_followees, name, client, refresh): name for name in level
+            }
+            crawled: set[str] = set()
+            for future in as_completed(fetches):
+                current = fetches[future]
+                try:
+                    collected = future.result()
+                except BudgetExhausted:
+                    exhausted = True
                     continue
-
-                if followee.username not in visited:
+                except RuntimeError as exc:
+                    LOG.warning("Failed following list for %s: %s", current, exc)
+                    crawled.add(current)
+                    continue
+                crawled.add(current)
+                kept = [followee for followee in collected.followees if _passes_filters(followee)]
+                for followee in kept:
+                    if followee.username in visited:
+                        continue
                     visited.add(followee.username)
                     queue.append((followee.username, depth + 1))
                     if ingest_interactions:
-                        try:
-                            ingest_user(followee.username, cfg, refresh=False)
-                        except Exception as exc:  # noqa: BLE001
-                            LOG.warning("Failed ingest for %s: %s", followee.username, exc)
-
-                src_id = repo.ensure_user(conn, current)
-                dst_id = repo.upsert_user_stats(
-                    conn,
-                    followee.username,
-                    followee.display_name,
-                    followee.followers,
-                    followee.following,
-                    followee.watched,
+                        pending.append(followee.username)
+                        job = ingesters.submit(
+                            _ingest_followee, followee.username, cfg, budget, limiter, writer
+                        )
+                        ingests[job] = followee.username
+                write = partial(
+                    _write_edges,
+                    src=current,
+                    followees=collected.followees,
+                    depth=depth + 1,
+                    following=collected.total,
                 )
-                repo.upsert_graph_edge(conn, src_id, dst_id, depth + 1)
-                edges_added += 1
+                writes.append(writer.submit(write))
+                edges_added += len(kept)
+            # Unfetched nodes go back to the front so a checkpoint keeps BFS order.
+            queue = [(name, depth) for name in level if name not in crawled] + queue
+
+        for future in as_completed(ingests):
+            try:
+                future.result()
+            except BudgetExhausted:
+                exhausted = True
+                continue
+            pending.remove(ingests[future])
+        for future in writes:
+            future.result()
+
+    with repo.connect(cfg.database_path) as conn:
+        if exhausted:
+            repo.save_checkpoint(
+                conn,
+                checkpoint,
+                {
+                    "max_depth": depth_limit,
+                    "queue": [[name, depth] for name, depth in queue],
+                    "visited": sorted(visited),
+                    "pending": pending,
+                },
+            )
+            LOG.info("Request budget spent; saved graph checkpoint for %s", username)
+        else:
+            repo.delete_checkpoint(conn, checkpoint)
+        conn.commit()
+
+    return GraphIngestResult(
+        username=username,
+        nodes=len(visited),
+        edges=edges_added,
+        complete=not exhausted,
+        requests=budget.spent if budget is not None else 0,
+    )
+
+
+@dataclass(frozen=True)
+class GraphRefreshResult:
+    checked: int
+    changed: int
+    added: int
+    removed: int
+    complete: bool = True
+    requests: int = 0
+
+
+@dataclass
+class FrontierUser:
+    """A user found by the best-first crawl, scored before spending requests on them."""
+
+    username: str
+    depth: int
+    watched: int
+    following: int
+    # Similarity to the root of every expanded user that follows them.
+    parent_similarities: list[float] = field(default_factory=list)
+    # Watched-film Jaccard with the root, once their interactions are in the DB.
+    similarity: float | None = None
+    ingested: bool = False
+    expanded: bool = False
+
+    def predicted_similarity(self) -> float:
+        """Measured similarity, else a noisy-or over the users that led us here."""
+        if self.similarity is not None:
+            return self.similarity
+        missed = 1.0
+        for similarity in self.parent_similarities:
+            missed *= 1.0 - INHERITED_SIMILARITY * min(1.0, similarity)
+        return 1.0 - missed
+
+    def requests(self, ingest_interactions: bool, depth_limit: int) -> int:
+        requests = 0
+        if ingest_interactions and not self.ingested:
+            requests += full_ingest_requests(self.watched)
+        if not self.expanded and self.depth < depth_limit:
+            requests += max(1, math.ceil(self.following / FOLLOWING_PAGE_SIZE))
+        return requests
+
+    def priority(self, ingest_interactions: bool, depth_limit: int) -> float:
+        """Expected similarity-weighted signal (log watched films) per request."""
+        value = self.predicted_similarity() * math.log1p(self.watched)
+        return value / max(1, self.requests(ingest_interactions, depth_limit))
+
+
+def ingest_follow_graph_best_first(
+    username: str,
+    cfg: Config,
+    refresh: bool = False,
+    max_depth: int | None = None,
+    ingest_interactions: bool = True,
+    budget: RequestBudget | None = None,
+    workers: int | None = None,
+) -> GraphIngestResult:
+    """Crawl the follow graph best-first by expected recommendation value.
+
+    Frontier users are ranked by ``FrontierUser.priority``: their predicted
+    similarity to the root (measured from ingested interactions where we have
+    them, otherwise inherited from the users that follow them) times their
+    watched count, per request it would take to ingest and expand them. The
+    best ``workers`` users are ingested and expanded at a time until the budget
+    runs out. Edges and interactions already in the DB are reused rather than
+    fetched, so a later run carries on where an exhausted one stopped.
+    """
+    ensure_db(cfg.database_path)
+    depth_limit = max_depth if max_depth is not None else cfg.graph.max_depth
+    worker_count = max(1, workers or cfg.scrape.workers)
+    limiter = RateLimiter(cfg.scrape.rate_limit_seconds)
+    cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
+    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir, budget=budget, limiter=limiter)
+
+    with repo.connect(cfg.database_path) as conn:
+        repo.ensure_user(conn, username)
+        conn.commit()
+        overlaps = repo.select_watched_overlaps(conn, username)
+        counts = repo.select_user_counts(conn)
+        adjacency = {} if refresh else repo.select_follow_adjacency(conn)
+        backed_off = repo.select_backed_off_usernames(conn)
+    root_watched = overlaps.get(username, (0, 0))[0]
+    similarities = {
+        name: _jaccard(watched, overlap, root_watched)
+        for name, (watched, overlap) in overlaps.items()
+        if name != username
+    }
+    # The root's own "similarity" is the best measured one, so its followees
+    # compete on the same scale as everyone else's.
+    root_similarity = max(similarities.values(), default=DEFAULT_ROOT_SIMILARITY) or DEFAULT_ROOT_SIMILARITY
+
+    users: dict[str, FrontierUser] = {}
+    heap: list[tuple[float, int, str]] = []
+    latest: dict[str, int] = {}
+    sequence = 0
+
+    def push(user: FrontierUser) -> None:
+        nonlocal sequence
+        if user.requests(ingest_interactions, depth_limit) == 0 and user.depth >= depth_limit:
+            return
+        sequence += 1
+        latest[user.username] = sequence
+        heapq.heappush(heap, (-user.priority(ingest_interactions, depth_limit), sequence, user.username))
+
+    root = FrontierUser(username, 0, root_watched, counts.get(username, (None, None))[0] or 0)
+    root.ingested = True
+    root.similarity = root_similarity
+    users[username] = root
+    push(root)
+
+    edges_added = 0
+    exhausted = False
+    writes: list[Future] = []
+    with (
+        DbWriter(cfg.database_path) as writer,
+        ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="graph") as pool,
+    ):
+        while heap and not exhausted:
+            batch: list[FrontierUser] = []
+            while heap and len(batch) < worker_count:
+                _priority, seq, name = heapq.heappop(heap)
+                if latest.get(name) != seq:
+                    continue
+                latest.pop(name)
+                batch.append(users[name])
+
+            jobs = {}
+            for user in batch:
+                ingest = ingest_interactions and not user.ingested and user.username not in backed_off
+                expand = user.depth < depth_limit
+                known = adjacency.get(user.username) if expand else None
+                jobs[
+                    pool.submit(
+                        _expand_user,
+                        user.username,
+                        cfg,
+                        client,
+                        refresh,
+                        ingest,
+                        expand and known is None,
+                        budget,
+                        limiter,
+                        writer,
+                    )
+                ] = (user, known)
+
+            fetched: dict[str, tuple[FrontierUser, list[FolloweeSummary]]] = {}
+            for future in as_completed(jobs):
+                user, known = jobs[future]
+                try:
+                    ingested, collected = future.result()
+                except BudgetExhausted:
+                    exhausted = True
+                    continue
+                # Users skipped for backoff or a failed ingest stay eligible.
+                user.ingested = user.ingested or ingested
+                if known is not None:
+                    followees = [
+                        FolloweeSummary(name, None, None, *counts.get(name, (None, None)))
+                        for name in known
+                    ]
+                elif collected is not None:
+                    write = partial(
+                        _write_edges,
+                        src=user.username,
+                        followees=collected.followees,
+                        depth=user.depth + 1,
+                        following=collected.total,
+                    )
+                    writes.append(writer.submit(write))
+                    followees = [followee for followee in collected.followees if _passes_filters(followee)]
+                    edges_added += len(followees)
+                else:
+                    followees = []
+                fetched[user.username] = (user, followees)
+
+            if ingest_interactions and fetched:
+                with repo.connect(cfg.database_path) as conn:
+                    measured = repo.select_watched_overlaps(conn, username, list(fetched))
+                for name, (watched, overlap) in measured.items():
+                    if name != username:
+                        users[name].similarity = _jaccard(watched, overlap, root_watched)
+
+            for user, followees in fetched.values():
+                if user.depth >= depth_limit:
+                    continue
+                user.expanded = True
+                parent_similarity = user.predicted_similarity()
+                for followee in followees:
+                    child = users.get(followee.username)
+                    if child is None:
+                        child = FrontierUser(
+                            followee.username,
+                            user.depth + 1,
+                            int(followee.watched or 0),
+                            int(followee.following or 0),
+                        )
+                        name = followee.username
+                        if name in similarities:
+                            child.similarity = similarities[name]
+                            child.ingested = True
+                        users[name] = child
+                    elif child.expanded or child is root:
+                        continue
+                    child.depth = min(child.depth, user.depth + 1)
+                    child.parent_similarities.append(parent_similarity)
+                    push(child)
 
-            conn.commit()
+        for future in writes:
+            future.result()
 
-    return GraphIngestResult(username=username, nodes=len(visited), edges=edges_added)
+    if exhausted:
+        LOG.info("Request budget spent; best-first crawl for %s stopped", username)
+    return GraphIngestResult(
+        username=username,
+        nodes=len(users),
+        edges=edges_added,
+        complete=not exhausted,
+        requests=budget.spent if budget is not None else 0,
+    )
 
 
-def _collect_followees(username: str, client: LetterboxdClient, refresh: bool) -> list[FolloweeSummary]:
+def _expand_user(
+    username: str,
+    cfg: Config,
+    client: LetterboxdClient,
+    refresh: bool,
+    ingest: bool,
+    fetch_following: bool,
+    budget: RequestBudget | None,
+    limiter: RateLimiter,
+    writer: DbWriter,
+) -> tuple[bool, FollowingList | None]:
+    """(whether the user's interactions were ingested, their following list if fetched)."""
+    ingested = ingest and _ingest_followee(username, cfg, budget, limiter, writer)
+    if not fetch_following:
+        return ingested, None
+    try:
+        return ingested, _collect_followees(username, client, refresh)
+    except RuntimeError as exc:
+        LOG.warning("Failed following list for %s: %s", username, exc)
+        return ingested, None
+
+
+def _jaccard(watched: int, overlap: int, root_watched: int) -> float:
+    union = watched + root_watched - overlap
+    return overlap / union if union > 0 else 0.0
+
+
+def refresh_follow_graph(
+    cfg: Config,
+    budget: RequestBudget | None = None,
+    workers: int | None = None,
+) -> GraphRefreshResult:
+    """Re-crawl only the following lists whose size changed since they were last read.
+
+    Every tracked source (a user with live outgoing edges or a recorded crawl)
+    costs one profile request to read its current following count; only users
+    whose count differs from the one stored at their last crawl have their full
+    list fetched again. Followees that are gone are tombstoned rather than
+    deleted, and accounts that no longer exist lose all their outgoing edges.
+    New followees get edges but are not expanded further; run a graph ingest
+    for that.
+    """
+    ensure_db(cfg.database_path)
+    worker_count = max(1, workers or cfg.scrape.workers)
+    limiter = RateLimiter(cfg.scrape.rate_limit_seconds)
+    with repo.connect(cfg.database_path) as conn:
+        sources = repo.select_graph_sources(conn)
+        backed_off = repo.select_backed_off_usernames(conn)
+
+    checked = changed = added = removed = 0
+    exhausted = False
+    with (
+        DbWriter(cfg.database_path) as writer,
+        ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="graph-refresh") as pool,
+    ):
+        jobs = {
+            pool.submit(
+                _refresh_following, row["username"], row["following_count"], cfg, budget, limiter
+            ): row
+            for row in sources
+            if row["username"] not in backed_off
+        }
+        writes: list[Future] = []
+        for future in as_completed(jobs):
+            row = jobs[future]
+            try:
+                collected = future.result()
+            except BudgetExhausted:
+                exhausted = True
+                continue
+            except RuntimeError as exc:
+                LOG.warning("Failed graph refresh for %s: %s", row["username"], exc)
+                continue
+            checked += 1
+            if collected is None:
+                continue
+            changed += 1
+            write = partial(
+                _write_edges,
+                src=row["username"],
+                followees=collected.followees,
+                depth=row["depth"] + 1,
+                following=collected.total,
+            )
+            writes.append(writer.submit(write))
+        for write_future in writes:
+            edges_added, edges_removed = write_future.result()
+            added += edges_added
+            removed += edges_removed
+
+    return GraphRefreshResult(
+        checked=checked,
+        changed=changed,
+        added=added,
+        removed=removed,
+        complete=not exhausted,
+        requests=budget.spent if budget is not None else 0,
+    )
+
+
+def _refresh_following(
+    username: str,
+    known_following: int | None,
+    cfg: Config,
+    budget: RequestBudget | None,
+    limiter: RateLimiter,
+) -> FollowingList | None:
+    """The user's fresh following list if its size changed, else None.
+
+    The list carries the profile's count, which is what the next refresh
+    compares against.
+    """
+    cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
+    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir, budget=budget, limiter=limiter)
+    html = _fetch_following_page(client, f"{BASE_URL}/{username}/", f"profile_{username}", refresh=True)
+    if is_not_found_page(html):
+        LOG.info("%s no longer exists; tombstoning their follow edges", username)
+        return FollowingList([], 0)
+    following = parse_profile(username, html).following_count
+    if following is None or following == known_following:
+        return None
+    LOG.info("%s following count changed (%s -> %s)", username, known_following, following)
+    return FollowingList(_collect_followees(username, client, refresh=True).followees, following)
+
+
+def harvest_following(
+    username: str,
+    cfg: Config,
+    budget: RequestBudget | None = None,
+    fetch: bool = True,
+    limiter: RateLimiter | None = None,
+) -> list[FolloweeSummary]:
+    """Followees of ``username`` from every fresh cached following page.
+
+    Pages cached by any earlier crawl are free. When none is cached and
+    ``fetch`` is set, one random page of the list is fetched (and cached),
+    paced by ``limiter``.
+    """
+    cache_root = Path(cfg.app.cache_dir) / "letterboxd"
+    url = f"{BASE_URL}/{username}/following/"
+    entries: list[FolloweeSummary] = []
+    for path in sorted(cache_root.glob(f"*/{cache_key_for_url(url)}*.html")):
+        if CacheEntry(path).is_fresh(cfg.scrape.cache_ttl_days):
+            entries.extend(parse_following_entries(path.read_text(encoding="utf-8")))
+    if not entries and fetch:
+        with repo.connect(cfg.database_path) as conn:
+            following = repo.select_following_count(conn, username)
+        page = random.randint(1, max(1, math.ceil(following / FOLLOWING_PAGE_SIZE)))
+        page_url = url if page == 1 else f"{url}page/{page}/"
+        client = LetterboxdClient(
+            cfg.app.user_agent, cfg.scrape, cache_root / username, budget=budget, limiter=limiter
+        )
+        html = _fetch_following_page(client, page_url, client.cache_key(page_url), refresh=False)
+        entries = parse_following_entries(html)
+    deduped: dict[str, FolloweeSummary] = {}
+    for entry in entries:
+        deduped.setdefault(entry.username, entry)
+    return list(deduped.values())
+
+
+def _write_edges(
+    conn: sqlite3.Connection,
+    src: str,
+    followees: list[FolloweeSummary],
+    depth: int,
+    following: int | None,
+) -> tuple[int, int]:
+    """Write one source's full following list; returns (edges added, edges tombstoned).
+
+    ``followees`` is the unfiltered list. Edges are written for the followees
+    that pass ``_passes_filters``; live edges are tombstoned with ``removed_at``
+    only when the account is missing from the list altogether, not when it
+    merely dropped below the filters. ``following`` is the count Letterboxd
+    showed at crawl time, kept for incremental refresh.
+    """
+    src_id = repo.ensure_user(conn, src)
+    before = repo.select_followee_ids(conn, src_id)
+    kept = [followee for followee in followees if _passes_filters(followee)]
+    dst_ids = set(repo.upsert_followee_stats(conn, kept).values())
+    listed = set(repo.select_user_ids(conn, [followee.username for followee in followees]).values())
+    gone = before - listed
+    repo.upsert_graph_edges(conn, src_id, dst_ids, depth)
+    repo.tombstone_graph_edges(conn, src_id, gone)
+    repo.set_crawled_following(conn, src_id, following)
+    return len(dst_ids - before), len(gone)
+
+
+def _ingest_followee(
+    username: str,
+    cfg: Config,
+    budget: RequestBudget | None,
+    limiter: RateLimiter,
+    writer: DbWriter,
+) -> bool:
+    try:
+        ingest_user(username, cfg, refresh=False, writer=writer, budget=budget, limiter=limiter)
+    except BudgetExhausted:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        LOG.warning("Failed ingest for %s: %s", username, exc)
+        return False
+    return True
+
+
+def _collect_followees(username: str, client: LetterboxdClient, refresh: bool) -> FollowingList:
     url = f"{BASE_URL}/{username}/following/"
     followees: list[FolloweeSummary] = []
+    total = None
     page_url = url
 
     while page_url:
         cache_key = client.cache_key(page_url)
         html = _fetch_following_page(client, page_url, cache_key, refresh)
 
+        if page_url == url:
+            total = parse_following_total(html, username)
         followees.extend(parse_following_entries(html))
         next_rel = parse_next_page(html)
         page_url = f"{BASE_URL}{next_rel}" if next_rel else None
-        sleep_seconds(client.scrape.rate_limit_seconds)
+        if client.limiter is None:
+            sleep_seconds(client.scrape.rate_limit_seconds)
 
     deduped: dict[str, FolloweeSummary] = {}
     for entry in followees:
         if entry.username not in deduped:
             deduped[entry.username] = entry
-    return list(deduped.values())
+    return FollowingList(list(deduped.values()), total)
 
 
 def _passes_filters(entry: FolloweeSummary) -> bool:
@@ -113,24 +659,29 @@ def _fetch_following_page(
     refresh: bool,
 ) -> str:
     if refresh and client.scrape.use_browser:
-        from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
-
-        html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
-        client.write_cache(cache_key, html)
-        return html
+        return _browser_fetch(client, url, cache_key)
 
     try:
         html = client.fetch_html(url, cache_key=cache_key, refresh=refresh).content
     except RuntimeError:
-        from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
-
-        html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
-        client.write_cache(cache_key, html)
+        return _browser_fetch(client, url, cache_key)
 
     if is_challenge_page(html):
-        from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
+        return _browser_fetch(client, url, cache_key)
+    return html
 
-        html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
-        client.write_cache(cache_key, html)
 
+def _browser_fetch(client: LetterboxdClient, url: str, cache_key: str) -> str:
+    """Fetch ``url`` through the browser, raising if it is still a challenge page.
+
+    A challenge page parses as an empty last page, which would cut the
+    following list short and tombstone every edge after it.
+    """
+    from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
+
+    client.charge()
+    html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
+    if is_challenge_page(html):
+        raise FetchError("Blocked by Cloudflare challenge on following page.", reason="challenge")
+    client.write_cache(cache_key, html)
     return html
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from letterboxd_recs.config import Config
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd.client import cache_key_for_url
+from letterboxd_recs.ingest.letterboxd.schedule import (
+    BASE_URL,
+    FOLLOWING_PAGE_SIZE,
+    CostEstimate,
+    full_ingest_requests,
+    seconds_per_request,
+)
+from letterboxd_recs.util.cache import FileCache
+
+# Used until the graph has enough crawled users to measure them.
+DEFAULT_PASS_RATE = 0.5
+DEFAULT_FOLLOWING = 100.0
+DEFAULT_WATCHED = 500.0
+
+
+def estimate_follow_graph(
+    cfg: Config,
+    username: str,
+    max_depth: int | None = None,
+    refresh: bool = False,
+    ingest_interactions: bool = False,
+) -> CostEstimate:
+    """Estimate the requests a follow-graph crawl will make, without fetching anything.
+
+    Users whose followees are already in ``graph_edges`` are expanded exactly;
+    the rest are extrapolated from their ``following_count`` and the share of
+    followees that passed the crawl filters so far.
+    """
+    ensure_db(cfg.database_path)
+    depth_limit = max_depth if max_depth is not None else cfg.graph.max_depth
+    with repo.connect(cfg.database_path) as conn:
+        counts = repo.select_user_counts(conn)
+        adjacency = repo.select_follow_adjacency(conn)
+    pass_rate, mean_following, mean_watched = _graph_priors(counts, adjacency)
+    cache = FileCache(Path(cfg.app.cache_dir) / "letterboxd" / username)
+
+    following_pages = 0
+    cached = 0
+    new_users = 0.0
+    interaction_requests = 0.0
+    visited = {username}
+    known = [username]
+    unknown = 0.0
+    for _depth in range(depth_limit):
+        next_known: list[str] = []
+        next_unknown = 0.0
+        for name in known:
+            following = counts.get(name, (None, None))[0]
+            following = float(following) if following is not None else mean_following
+            for url in _following_urls(name, following):
+                fresh = cache.entry(f"{cache_key_for_url(url)}.html").is_fresh(cfg.scrape.cache_ttl_days)
+                if fresh and not refresh:
+                    cached += 1
+                else:
+                    following_pages += 1
+            if name in adjacency:
+                for dst in adjacency[name]:
+                    if dst not in visited:
+                        visited.add(dst)
+                        next_known.append(dst)
+            else:
+                next_unknown += following * pass_rate
+        following_pages += math.ceil(unknown * _page_count(mean_following))
+        next_unknown += unknown * mean_following * pass_rate
+
+        if ingest_interactions:
+            for name in next_known:
+                watched = counts.get(name, (None, None))[1]
+                interaction_requests += full_ingest_requests(int(watched or mean_watched))
+            interaction_requests += next_unknown * full_ingest_requests(int(mean_watched))
+        new_users += len(next_known) + next_unknown
+        known, unknown = next_known, next_unknown
+
+    requests = following_pages + math.ceil(interaction_requests)
+    renders = 0
+    if cfg.scrape.use_browser:
+        renders = math.ceil(interaction_requests) + (following_pages if refresh else 0)
+    return CostEstimate(
+        users=new_users,
+        requests=requests,
+        cached=cached,
+        browser_renders=renders,
+        seconds=requests * seconds_per_request(cfg),
+    )
+
+
+def estimate_graph_refresh(cfg: Config) -> CostEstimate:
+    """Lower bound for ``refresh_follow_graph``: one profile request per tracked user.
+
+    Users whose following count changed add their following pages on top.
+    """
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        sources = len(repo.select_graph_sources(conn))
+    return CostEstimate(
+        users=sources,
+        requests=sources,
+        browser_renders=sources if cfg.scrape.use_browser else 0,
+        seconds=sources * seconds_per_request(cfg),
+    )
+
+
+def _graph_priors(
+    counts: dict[str, tuple[int | None, int | None]],
+    adjacency: dict[str, list[str]],
+) -> tuple[float, float, float]:
+    following = [float(f) for f, _ in counts.values() if f is not None]
+    watched = [float(w) for _, w in counts.values() if w is not None]
+    mean_following = sum(following) / len(following) if following else DEFAULT_FOLLOWING
+    mean_watched = sum(watched) / len(watched) if watched else DEFAULT_WATCHED
+    crawled_following = sum(
+        counts[src][0] or 0 for src in adjacency if counts.get(src, (None, None))[0]
+    )
+    edges = sum(len(dsts) for src, dsts in adjacency.items() if counts.get(src, (None, None))[0])
+    pass_rate = edges / crawled_following if crawled_following else DEFAULT_PASS_RATE
+    return min(1.0, pass_rate), mean_following, mean_watched
+
+
+def _page_count(following: float) -> int:
+    return max(1, math.ceil(following / FOLLOWING_PAGE_SIZE))
+
+
+def _following_urls(username: str, following: float) -> list[str]:
+    url = f"{BASE_URL}/{username}/following/"
+    return [url] + [f"{url}page/{page}/" for page in range(2, _page_count(following) + 1)]
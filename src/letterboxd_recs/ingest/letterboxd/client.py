@@ -8,13 +8,25 @@ from typing import Iterable
 import requests
 
 from letterboxd_recs.config import ScrapeConfig
+from letterboxd_recs.util.budget import RequestBudget
 from letterboxd_recs.util.cache import FileCache
 from letterboxd_recs.util.logging import get_logger
-from letterboxd_recs.util.ratelimit import sleep_seconds
+from letterboxd_recs.util.ratelimit import RateLimiter, sleep_seconds
 
 LOG = get_logger(__name__)
 
 
+# Statuses that won't change on retry; failing fast saves the backoff sleeps.
+PERMANENT_STATUSES = frozenset({404, 410})
+
+
+class FetchError(RuntimeError):
+    def __init__(self, message: str, status: int | None = None, reason: str = "error") -> None:
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
 @dataclass(frozen=True)
 class FetchResult:
     url: str
@@ -28,8 +40,12 @@ class LetterboxdClient:
         user_agent: str,
         scrape_config: ScrapeConfig,
         cache_dir: Path,
+        budget: RequestBudget | None = None,
+        limiter: RateLimiter | None = None,
     ) -> None:
         self.scrape = scrape_config
+        self.budget = budget
+        self.limiter = limiter
         self.cache = FileCache(cache_dir)
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": user_agent})
@@ -41,10 +57,22 @@ class LetterboxdClient:
             LOG.info("Cache hit: %s", url)
             return FetchResult(url=url, content=entry.read_text(), from_cache=True)
 
+        self.charge()
         content = self._fetch_with_retries(url)
         entry.write_text(content)
         return FetchResult(url=url, content=content, from_cache=False)
 
+    def charge(self, requests: int = 1) -> None:
+        """Count a network request (HTTP or browser render) against the budget, if any.
+
+        With a shared ``limiter`` this also waits for the request's slot, so
+        concurrent clients stay within one rate limit between them.
+        """
+        if self.budget is not None:
+            self.budget.charge(requests)
+        if self.limiter is not None:
+            self.limiter.wait()
+
     def write_cache(self, cache_key: str, content: str) -> None:
         entry = self.cache.entry(f"{cache_key}.html")
         entry.write_text(content)
@@ -59,6 +87,7 @@ class LetterboxdClient:
 
     def _fetch_with_retries(self, url: str) -> str:
         last_error: Exception | None = None
+        status: int | None = None
         for attempt in range(1, self.scrape.max_retries + 1):
             try:
                 LOG.info("Fetching: %s", url)
@@ -67,14 +96,47 @@ class LetterboxdClient:
                 return resp.text
             except Exception as exc:  # noqa: BLE001
                 last_error = exc
+                status = _http_status(exc)
+                if status in PERMANENT_STATUSES:
+                    raise FetchError(f"Failed to fetch {url}: HTTP {status}", status, "not_found") from exc
                 wait = self.scrape.rate_limit_seconds * (2 ** (attempt - 1))
                 LOG.warning("Fetch failed (%s). Retry in %.1fs", exc, wait)
                 time.sleep(wait)
-        raise RuntimeError(f"Failed to fetch {url}") from last_error
+        raise FetchError(f"Failed to fetch {url}", status) from last_error
+
+    def resolve_redirect(self, url: str) -> str:
+        """Follow redirects (e.g. boxd.it short links) and return the final URL."""
+        self.charge()
+        last_error: Exception | None = None
+        for attempt in range(1, self.scrape.max_retries + 1):
+            try:
+                LOG.info("Resolving: %s", url)
+                resp = self.session.get(url, timeout=30, allow_redirects=True, stream=True)
+                resp.close()
+                # Letterboxd may challenge the final page; the redirect target is still valid.
+                if resp.url != url:
+                    return resp.url
+                resp.raise_for_status()
+                return resp.url
+            except Exception as exc:  # noqa: BLE001
+                last_error = exc
+                wait = self.scrape.rate_limit_seconds * (2 ** (attempt - 1))
+                LOG.warning("Resolve failed (%s). Retry in %.1fs", exc, wait)
+                time.sleep(wait)
+        raise RuntimeError(f"Failed to resolve {url}") from last_error
 
     def cache_key(self, url: str) -> str:
         return self._cache_key_from_url(url)
 
     @staticmethod
     def _cache_key_from_url(url: str) -> str:
-        return url.replace("https://", "").replace("http://", "").replace("/", "_")
+        return cache_key_for_url(url)
+
+
+def cache_key_for_url(url: str) -> str:
+    return url.replace("https://", "").replace("http://", "").replace("/", "_")
+
+
+def _http_status(exc: Exception) -> int | None:
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+import csv
+from dataclasses import dataclass
+from functools import partial
+import io
+from pathlib import Path
+import sqlite3
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+import zipfile
+
+from letterboxd_recs.config import Config
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.client import LetterboxdClient
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem, slug_from_film_path
+from letterboxd_recs.util.logging import get_logger
+
+LOG = get_logger(__name__)
+
+# Files read from the export, in merge order; ratings.csv is last so the current
+# rating wins over whatever was logged with older diary entries.
+EXPORT_FILES = (
+    "diary.csv",
+    "watched.csv",
+    "watchlist.csv",
+    "likes/films.csv",
+    "ratings.csv",
+)
+
+
+# Interactions per writer job; rows are written as they are read, not collected first.
+EXPORT_BATCH_ROWS = 500
+
+FilmKey = tuple[str, int | None]
+
+
+@dataclass(frozen=True)
+class ExportRow:
+    """One CSV row of the export, as the interaction it records."""
+
+    name: str
+    year: int | None
+    uri: str | None
+    rating: float | None = None
+    liked: bool = False
+    watched: bool = False
+    watch_date: str | None = None
+    watchlist: bool = False
+
+    @property
+    def key(self) -> FilmKey:
+        return (self.name.lower(), self.year)
+
+    def to_item(self, slug: str, watch_date: str | None) -> FilmItem:
+        return FilmItem(
+            slug=slug,
+            title=self.name,
+            year=self.year,
+            rating=self.rating,
+            liked=self.liked,
+            watched=self.watched,
+            watch_date=watch_date,
+            watchlist=self.watchlist,
+        )
+
+
+@dataclass(frozen=True)
+class ExportImportResult:
+    username: str
+    films: int
+    watched: int
+    rated: int
+    liked: int
+    watchlist: int
+    resolved_remote: int
+    unresolved: list[str]
+
+
+def iter_export_rows(path: str | Path) -> Iterator[tuple[str, dict[str, str]]]:
+    """Stream (file name, row) pairs from the CSVs of a Letterboxd export ZIP."""
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        for name in EXPORT_FILES:
+            if name not in names:
+                continue
+            with archive.open(name) as raw:
+                reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+                for row in reader:
+                    yield name, row
+
+
+def parse_export_row(name: str, row: dict[str, str]) -> ExportRow | None:
+    title = (row.get("Name") or "").strip()
+    if not title:
+        return None
+    year = _to_int(row.get("Year"))
+    uri = (row.get("Letterboxd URI") or "").strip() or None
+    if name == "watchlist.csv":
+        return ExportRow(title, year, uri, watchlist=True)
+    return ExportRow(
+        title,
+        year,
+        uri,
+        rating=_to_float(row.get("Rating")),
+        liked=name == "likes/films.csv",
+        watched=True,
+        watch_date=(row.get("Watched Date") or "").strip() or None,
+    )
+
+
+class SlugLookup:
+    """Resolve export rows to slugs via the URI cache, then title/year, then the network.
+
+    A film keeps the first slug found for it, and URIs that failed to resolve
+    aren't retried. URIs seen on rows with a slug are collected in ``learned``.
+    """
+
+    def __init__(
+        self,
+        known_uris: dict[str, str],
+        title_year: dict[FilmKey, str],
+        resolver: Callable[[str], str] | None = None,
+    ) -> None:
+        self.known_uris = known_uris
+        self.title_year = title_year
+        self.resolver = resolver
+        self.films: dict[FilmKey, str] = {}
+        self.learned: dict[str, str] = {}
+        self._failed: set[str] = set()
+
+    def resolve(self, row: ExportRow) -> str | None:
+        slug = self.films.get(row.key)
+        if slug is None and row.uri:
+            slug = self.known_uris.get(row.uri) or _slug_from_uri(row.uri)
+        if slug is None:
+            slug = self.title_year.get(row.key)
+        if slug is None and row.uri and self.resolver is not None and row.uri not in self._failed:
+            try:
+                slug = _slug_from_uri(self.resolver(row.uri))
+            except RuntimeError as exc:
+                LOG.warning("Could not resolve %s: %s", row.uri, exc)
+            if slug is None:
+                self._failed.add(row.uri)
+        if slug is not None:
+            self.films[row.key] = slug
+        return slug
+
+    def learn(self, uri: str | None, slug: str) -> None:
+        if uri and uri not in self.known_uris:
+            self.known_uris[uri] = slug
+            self.learned[uri] = slug
+
+    def take_learned(self) -> dict[str, str]:
+        learned, self.learned = self.learned, {}
+        return learned
+
+
+def import_export(
+    username: str,
+    path: str | Path,
+    cfg: Config,
+    resolve: bool = True,
+    client: LetterboxdClient | None = None,
+) -> ExportImportResult:
+    """Stream a Letterboxd data-export ZIP into the interactions table for a user.
+
+    Rows are written through a ``DbWriter`` in batches of ``EXPORT_BATCH_ROWS``
+    as they are read; only per-film state (slug, latest watch date, counts) is
+    kept. Rows of a film that can't be resolved yet wait until a later row of
+    the same film resolves it. The upsert's merge rules combine the files:
+    flags accumulate and ratings.csv, read last, sets the current rating. A
+    watch date older than one already written for the film is dropped, so the
+    latest one wins.
+    """
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        known_uris = repo.select_uri_slugs(conn)
+        title_year = repo.select_film_slugs_by_title_year(conn)
+
+    resolved_remote = 0
+    resolver = None
+    if resolve:
+        if client is None:
+            cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
+            client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir)
+        resolve_redirect = client.resolve_redirect
+
+        def resolver(uri: str) -> str:
+            nonlocal resolved_remote
+            resolved_remote += 1
+            return resolve_redirect(uri)
+
+    lookup = SlugLookup(known_uris, title_year, resolver)
+    waiting: dict[FilmKey, list[ExportRow]] = {}
+    latest: dict[FilmKey, str] = {}
+    counts: dict[str, set[FilmKey]] = {name: set() for name in ("watched", "rated", "liked", "watchlist")}
+    batch: list[FilmItem] = []
+    writes: list[Future] = []
+
+    with DbWriter(cfg.database_path) as writer:
+        user_id = writer.call(lambda conn: repo.ensure_user(conn, username))
+
+        def flush() -> None:
+            nonlocal batch
+            if batch or lookup.learned:
+                job = partial(_write_batch, user_id=user_id, items=batch, uris=lookup.take_learned())
+                writes.append(writer.submit(job))
+            batch = []
+
+        def add(row: ExportRow, slug: str) -> None:
+            watch_date = row.watch_date
+            if watch_date is not None:
+                if watch_date < latest.get(row.key, watch_date):
+                    watch_date = None
+                else:
+                    latest[row.key] = watch_date
+            batch.append(row.to_item(slug, watch_date))
+            lookup.learn(row.uri, slug)
+            for name, flag in (
+                ("watched", row.watched),
+                ("rated", row.rating is not None),
+                ("liked", row.liked),
+                ("watchlist", row.watchlist),
+            ):
+                if flag:
+                    counts[name].add(row.key)
+            if len(batch) >= EXPORT_BATCH_ROWS:
+                flush()
+
+        for name, raw in iter_export_rows(path):
+            row = parse_export_row(name, raw)
+            if row is None:
+                continue
+            slug = lookup.resolve(row)
+            if slug is None:
+                waiting.setdefault(row.key, []).append(row)
+                continue
+            for earlier in waiting.pop(row.key, []):
+                add(earlier, slug)
+            add(row, slug)
+        flush()
+        for future in writes:
+            future.result()
+
+    unresolved = [
+        f"{rows[0].name} ({rows[0].year})" if rows[0].year else rows[0].name
+        for rows in waiting.values()
+    ]
+    return ExportImportResult(
+        username=username,
+        films=len(lookup.films),
+        watched=len(counts["watched"]),
+        rated=len(counts["rated"]),
+        liked=len(counts["liked"]),
+        watchlist=len(counts["watchlist"]),
+        resolved_remote=resolved_remote,
+        unresolved=unresolved,
+    )
+
+
+def _write_batch(
+    conn: sqlite3.Connection,
+    user_id: int,
+    items: list[FilmItem],
+    uris: dict[str, str],
+) -> None:
+    repo.upsert_interactions(conn, user_id, items)
+    repo.upsert_uri_slugs(conn, uris.items())
+
+
+def _slug_from_uri(uri: str) -> str | None:
+    parsed = urlparse(uri)
+    if not parsed.netloc.endswith("letterboxd.com"):
+        return None
+    return slug_from_film_path(parsed.path)
+
+
+def _to_int(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _to_float(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -1,27 +1,39 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+import sqlite3
+from typing import Iterable, Iterator
 from urllib.parse import urljoin
+import xml.etree.ElementTree as ET
 
 from letterboxd_recs.config import Config
 from letterboxd_recs.db import repo
 from letterboxd_recs.db.conn import ensure_db
-from letterboxd_recs.ingest.letterboxd.client import LetterboxdClient
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.client import FetchError, LetterboxdClient
 from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
 from letterboxd_recs.ingest.letterboxd.parse import (
+    FilmItem,
     is_challenge_page,
+    is_not_found_page,
+    is_private_profile,
     merge_items,
+    page_fingerprint,
     parse_diary,
     parse_films_list,
     parse_likes_list,
     parse_next_page,
     parse_profile,
     parse_watchlist,
+    Profile,
 )
+from letterboxd_recs.ingest.letterboxd import outcomes
+from letterboxd_recs.ingest.letterboxd.pipeline import PagePipeline
+from letterboxd_recs.ingest.letterboxd.rss import parse_rss
+from letterboxd_recs.util.budget import RequestBudget
 from letterboxd_recs.util.logging import get_logger
-from letterboxd_recs.util.ratelimit import sleep_seconds
+from letterboxd_recs.util.ratelimit import RateLimiter, sleep_seconds
 
 LOG = get_logger(__name__)
 BASE_URL = "https://letterboxd.com"
@@ -33,6 +45,25 @@ class IngestResult:
     films_seen: int
     likes: int
     watchlist: int
+    skipped: bool = False
+    pages_unchanged: int = 0
+
+
+@dataclass
+class PageLedger:
+    """Fingerprints of pages persisted by the last ingest; unchanged pages aren't re-parsed."""
+
+    known: dict[str, str] = field(default_factory=dict)
+    seen: dict[str, str] = field(default_factory=dict)
+    unchanged: int = 0
+
+    def is_unchanged(self, url: str, html: str) -> bool:
+        fingerprint = page_fingerprint(html)
+        self.seen[url] = fingerprint
+        if self.known.get(url) == fingerprint:
+            self.unchanged += 1
+            return True
+        return False
 
 
 def ingest_user(
@@ -43,52 +74,183 @@ def ingest_user(
     include_films: bool = True,
     include_likes: bool = True,
     include_watchlist: bool = True,
+    writer: DbWriter | None = None,
+    skip_unchanged: bool = True,
+    use_rss: bool = False,
+    budget: RequestBudget | None = None,
+    limiter: RateLimiter | None = None,
 ) -> IngestResult:
     ensure_db(cfg.database_path)
+    if writer is None:
+        with DbWriter(cfg.database_path) as own_writer:
+            return ingest_user(
+                username,
+                cfg,
+                refresh=refresh,
+                include_diary=include_diary,
+                include_films=include_films,
+                include_likes=include_likes,
+                include_watchlist=include_watchlist,
+                writer=own_writer,
+                skip_unchanged=skip_unchanged,
+                use_rss=use_rss,
+                budget=budget,
+                limiter=limiter,
+            )
+
     cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
-    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir)
+    client = LetterboxdClient(cfg.app.user_agent, cfg.scrape, cache_dir, budget=budget, limiter=limiter)
 
-    profile_url = _user_url(username)
-    profile_html = _fetch_page(
-        client,
-        profile_url,
-        cache_key=f"profile_{username}",
-        refresh=refresh,
-    )
-    if is_challenge_page(profile_html):
-        raise RuntimeError("Blocked by Cloudflare challenge on profile page.")
-    profile = parse_profile(username, profile_html)
-
-    with repo.connect(cfg.database_path) as conn:
-        user_id = repo.upsert_user(conn, profile)
-        items = []
-
-        if include_diary:
-            items.extend(_collect_diary(username, client, refresh))
-        if include_films:
-            items.extend(_collect_films(username, client, refresh))
-        if include_likes:
-            items.extend(_collect_likes(username, client, refresh))
-        if include_watchlist:
-            items.extend(_collect_watchlist(username, client, refresh))
-
-        merged = merge_items(items)
-        repo.upsert_interactions(conn, user_id, merged.values())
+    try:
+        profile_url = _user_url(username)
+        profile_html = _fetch_page(
+            client,
+            profile_url,
+            cache_key=f"profile_{username}",
+            refresh=refresh,
+        )
+        if is_challenge_page(profile_html):
+            raise FetchError("Blocked by Cloudflare challenge on profile page.", reason="challenge")
+        if is_not_found_page(profile_html):
+            raise FetchError(f"Profile not found: {username}", 404, "not_found")
+        if is_private_profile(profile_html):
+            raise FetchError(f"Profile is private: {username}", 200, "private")
+        profile = parse_profile(username, profile_html)
+        with repo.connect(cfg.database_path) as conn:
+            state = repo.select_refresh_state(conn, username)
+            ledger = PageLedger(repo.select_page_fingerprints(conn, username)) if skip_unchanged else None
+        unchanged = (
+            refresh
+            and skip_unchanged
+            and state is not None
+            and profile.signature is not None
+            and state["refresh_signature"] == profile.signature
+        )
+        if unchanged:
+            LOG.info("Profile unchanged for %s; skipping list pages", username)
+
+        def _start(conn: sqlite3.Connection) -> tuple[int, int]:
+            user_id = repo.upsert_user(conn, profile)
+            return user_id, repo.count_user_interactions(conn, user_id)
+
+        user_id, before = writer.call(_start)
+
+        def _persist_page(items: list[FilmItem]):
+            return writer.submit(lambda conn: repo.upsert_interactions(conn, user_id, items))
+
+        with PagePipeline(
+            _persist_page,
+            processes=cfg.scrape.parse_processes,
+            max_pending=cfg.scrape.pipeline_depth,
+        ) as pipeline:
+            if not unchanged:
+                if include_diary:
+                    _collect_diary(username, client, refresh, ledger, pipeline)
+                if include_films:
+                    feed_items = _collect_rss(username, client, refresh, state, profile) if use_rss else None
+                    if feed_items is None:
+                        _collect_films(username, client, refresh, ledger, pipeline)
+                    else:
+                        pipeline.add(feed_items)
+                if include_likes:
+                    _collect_likes(username, client, refresh, ledger, pipeline)
+                if include_watchlist:
+                    _collect_watchlist(username, client, refresh, ledger, pipeline)
+            items = pipeline.finish()
+    except RuntimeError as exc:
+        _record_failure(writer, username, exc)
+        raise
+    merged = merge_items(items)
+
+    def _finish(conn: sqlite3.Connection) -> None:
+        after = repo.count_user_interactions(conn, user_id)
+        repo.record_refresh(conn, user_id, after - before, profile.signature)
+        if ledger is not None:
+            repo.upsert_page_fingerprints(conn, user_id, ledger.seen)
+        outcomes.record_success(conn, username, empty=profile.films_count == 0 and not merged)
+
+    writer.call(_finish)
 
     return IngestResult(
         username=username,
         films_seen=sum(1 for i in merged.values() if i.watched),
         likes=sum(1 for i in merged.values() if i.liked),
         watchlist=sum(1 for i in merged.values() if i.watchlist),
+        skipped=unchanged,
+        pages_unchanged=ledger.unchanged if ledger is not None else 0,
     )
 
 
-def _collect_diary(username: str, client: LetterboxdClient, refresh: bool) -> list:
+def _record_failure(writer: DbWriter, username: str, exc: Exception) -> None:
+    status, reason = outcomes.classify_failure(exc)
+    hours = writer.call(lambda conn: outcomes.record_failure(conn, username, status, reason))
+    if hours is not None:
+        LOG.info("Backing off %s for %.1fh (%s)", username, hours, reason)
+
+
+def _collect_rss(
+    username: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    state,
+    profile: Profile,
+) -> list[FilmItem] | None:
+    """Diary entries from the RSS feed, or None when HTML pagination is still needed."""
+    known = state["latest_diary_entry"] if state is not None else None
+    if not known:
+        return None
+    url = _user_url(username, "rss/")
+    try:
+        xml_text = client.fetch_html(url, cache_key=f"rss_{username}", refresh=refresh).content
+        entries = parse_rss(xml_text)
+    except (RuntimeError, ET.ParseError) as exc:
+        LOG.warning("RSS unavailable for %s: %s", username, exc)
+        return None
+
+    newer = []
+    for entry in entries:
+        if entry.entry == known:
+            break
+        newer.append(entry)
+    else:
+        LOG.info("RSS window for %s does not reach %s; using HTML pages", username, known)
+        return None
+
+    previous_films = _films_count_from_signature(state["refresh_signature"])
+    if previous_films is not None and profile.films_count is not None:
+        first_watches = {entry.item.slug for entry in newer if not entry.rewatch}
+        if profile.films_count - previous_films > len(first_watches):
+            # Films were marked watched without a diary entry, which the feed never shows.
+            LOG.info("RSS for %s misses undiaried films; using HTML pages", username)
+            return None
+    return [entry.item for entry in entries]
+
+
+def _films_count_from_signature(signature: str | None) -> int | None:
+    if not signature:
+        return None
+    head = signature.split("|", 1)[0]
+    return int(head) if head.isdigit() else None
+
+
+def _collect_diary(
+    username: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    ledger: PageLedger | None = None,
+    pipeline: PagePipeline | None = None,
+) -> list:
     url = _user_url(username, "films/diary/")
-    return _collect_paginated(url, client, refresh, parse_diary)
+    return _collect_paginated(url, client, refresh, parse_diary, ledger=ledger, pipeline=pipeline)
 
 
-def _collect_films(username: str, client: LetterboxdClient, refresh: bool) -> list:
+def _collect_films(
+    username: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    ledger: PageLedger | None = None,
+    pipeline: PagePipeline | None = None,
+) -> list:
     url = _user_url(username, "films/by/date/")
     max_pages = 1 if refresh else client.scrape.max_pages
     return _collect_paginated(
@@ -98,15 +260,31 @@ def _collect_films(username: str, client: LetterboxdClient, refresh: bool) -> li
         parse_films_list,
         max_pages=max_pages,
         browser_first=client.scrape.use_browser and not refresh,
+        ledger=ledger,
+        pipeline=pipeline,
     )
 
 
-def _collect_likes(username: str, client: LetterboxdClient, refresh: bool) -> list:
+def _collect_likes(
+    username: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    ledger: PageLedger | None = None,
+    pipeline: PagePipeline | None = None,
+) -> list:
     url = _user_url(username, "likes/films/")
-    return _collect_paginated(url, client, refresh, parse_likes_list)
+    return _collect_paginated(
+        url, client, refresh, parse_likes_list, ledger=ledger, pipeline=pipeline
+    )
 
 
-def _collect_watchlist(username: str, client: LetterboxdClient, refresh: bool) -> list:
+def _collect_watchlist(
+    username: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    ledger: PageLedger | None = None,
+    pipeline: PagePipeline | None = None,
+) -> list:
     url = _user_url(username, "watchlist/")
     max_pages = 1 if refresh else client.scrape.max_pages
     return _collect_paginated(
@@ -116,6 +294,8 @@ def _collect_watchlist(username: str, client: LetterboxdClient, refresh: bool) -
         parse_watchlist,
         max_pages=max_pages,
         browser_first=client.scrape.use_browser and not refresh,
+        ledger=ledger,
+        pipeline=pipeline,
     )
 
 
@@ -126,8 +306,27 @@ def _collect_paginated(
     parser,
     max_pages: int | None = None,
     browser_first: bool = False,
+    ledger: PageLedger | None = None,
+    pipeline: PagePipeline | None = None,
 ) -> list:
+    """Parse every changed page; with a pipeline, pages are handed off and nothing is returned."""
     items = []
+    for html in _iter_pages(url, client, refresh, max_pages, browser_first, ledger):
+        if pipeline is not None:
+            pipeline.submit(parser, html)
+        else:
+            items.extend(parser(html))
+    return items
+
+
+def _iter_pages(
+    url: str,
+    client: LetterboxdClient,
+    refresh: bool,
+    max_pages: int | None = None,
+    browser_first: bool = False,
+    ledger: PageLedger | None = None,
+) -> Iterator[str]:
     page_url = url
     page = 1
     while page_url:
@@ -143,13 +342,20 @@ def _collect_paginated(
             refresh=refresh,
         )
         if is_challenge_page(html):
-            raise RuntimeError("Blocked by Cloudflare challenge while scraping.")
-        items.extend(parser(html))
+            raise FetchError("Blocked by Cloudflare challenge while scraping.", reason="challenge")
+        unchanged = ledger is not None and ledger.is_unchanged(page_url, html)
+        if not unchanged:
+            yield html
         next_rel = parse_next_page(html)
         page_url = urljoin(BASE_URL, next_rel) if next_rel else None
+        if unchanged and (page_url is None or page_url in ledger.known):
+            # Lists are newest-first: nothing was added in front of this page, so the
+            # already-ingested pages behind it are unchanged too.
+            LOG.info("Page unchanged since last ingest; stopping at page %s of %s", page, url)
+            break
         page += 1
-        sleep_seconds(client.scrape.rate_limit_seconds)
-    return items
+        if client.limiter is None:
+            sleep_seconds(client.scrape.rate_limit_seconds)
 
 
 def _user_url(username: str, path: str | None = None) -> str:
@@ -166,6 +372,7 @@ def _fetch_page(
     browser_first: bool = False,
 ) -> str:
     if client.scrape.use_browser:
+        client.charge()
         html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
         client.write_cache(cache_key, html)
         return html
@@ -176,10 +383,12 @@ def _fetch_page(
     except RuntimeError:
         if not client.scrape.use_browser:
             raise
+        client.charge()
         html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
         client.write_cache(cache_key, html)
 
     if is_challenge_page(html) and client.scrape.use_browser:
+        client.charge()
         html = browser_fetch(url, user_agent=client.session.headers.get("User-Agent", "")).content
         client.write_cache(cache_key, html)
 
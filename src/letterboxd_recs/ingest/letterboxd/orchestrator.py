@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from letterboxd_recs.config import Config
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.ingest import IngestResult, ingest_user
+from letterboxd_recs.util.budget import BudgetExhausted, RequestBudget
+from letterboxd_recs.util.logging import get_logger
+from letterboxd_recs.util.ratelimit import RateLimiter
+
+LOG = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchProgress:
+    username: str
+    done: int
+    total: int
+    ok: int
+    failed: int
+    elapsed_seconds: float
+    error: str | None = None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        if self.done == 0:
+            return None
+        return self.elapsed_seconds / self.done * (self.total - self.done)
+
+
+@dataclass(frozen=True)
+class BatchIngestResult:
+    ok: int
+    failed: int
+    results: dict[str, IngestResult] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    deferred: list[str] = field(default_factory=list)
+
+
+def ingest_users(
+    usernames: list[str],
+    cfg: Config,
+    workers: int | None = None,
+    on_progress: Callable[[BatchProgress], None] | None = None,
+    ingest: Callable[..., IngestResult] | None = None,
+    skip_backed_off: bool = True,
+    budget: RequestBudget | None = None,
+    **ingest_kwargs: Any,
+) -> BatchIngestResult:
+    """Ingest many users concurrently, funnelling all writes through one DbWriter.
+
+    A failure for one user is recorded and reported through ``on_progress``;
+    it never cancels the remaining users. All workers share one rate limiter,
+    so more workers never raise the request rate. Users still inside a failure
+    backoff window, and users not finished before ``budget`` runs out, are
+    returned as ``deferred``.
+    """
+    ingest_fn = ingest or ingest_user
+    pool_size = max(1, workers if workers is not None else cfg.scrape.workers)
+    ordered = list(dict.fromkeys(usernames))
+    results: dict[str, IngestResult] = {}
+    errors: dict[str, str] = {}
+    deferred: list[str] = []
+    if not ordered:
+        return BatchIngestResult(ok=0, failed=0)
+
+    ensure_db(cfg.database_path)
+    if skip_backed_off:
+        with repo.connect(cfg.database_path) as conn:
+            backed_off = repo.select_backed_off_usernames(conn)
+        deferred = [name for name in ordered if name in backed_off]
+        ordered = [name for name in ordered if name not in backed_off]
+        if deferred:
+            LOG.info("Deferring %s users in failure backoff", len(deferred))
+    total = len(ordered)
+    if not ordered:
+        return BatchIngestResult(ok=0, failed=0, deferred=deferred)
+
+    started = time.monotonic()
+
+    if budget is not None:
+        ingest_kwargs["budget"] = budget
+    limiter = RateLimiter(cfg.scrape.rate_limit_seconds)
+
+    def _run(username: str) -> IngestResult:
+        if budget is not None and budget.exhausted:
+            raise BudgetExhausted("Request budget spent")
+        return ingest_fn(username, cfg, writer=writer, limiter=limiter, **ingest_kwargs)
+
+    with DbWriter(cfg.database_path) as writer:
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="ingest") as pool:
+            futures = {pool.submit(_run, username): username for username in ordered}
+            for done, future in enumerate(as_completed(futures), start=1):
+                username = futures[future]
+                error = None
+                try:
+                    results[username] = future.result()
+                except BudgetExhausted:
+                    deferred.append(username)
+                except Exception as exc:  # noqa: BLE001
+                    error = str(exc) or exc.__class__.__name__
+                    errors[username] = error
+                    LOG.warning("Failed ingest for %s: %s", username, error)
+                if on_progress:
+                    on_progress(
+                        BatchProgress(
+                            username=username,
+                            done=done,
+                            total=total,
+                            ok=len(results),
+                            failed=len(errors),
+                            elapsed_seconds=time.monotonic() - started,
+                            error=error,
+                        )
+                    )
+
+    return BatchIngestResult(
+        ok=len(results),
+        failed=len(errors),
+        results=results,
+        errors=errors,
+        deferred=deferred,
+    )
+
+
+def format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
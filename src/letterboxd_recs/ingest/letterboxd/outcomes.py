@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sqlite3
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.ingest.letterboxd.client import FetchError
+
+# First retry delay per user-specific failure reason; it doubles with every
+# further consecutive failure. Other reasons (network errors, parser bugs) say
+# nothing about the account, so they never back a user off.
+BACKOFF_BASE_HOURS = {
+    "not_found": 7 * 24.0,
+    "empty": 7 * 24.0,
+    "private": 7 * 24.0,
+    "challenge": 24.0,
+}
+# Consecutive failures a reason needs before the backoff starts (default 1).
+# A single challenge can be Cloudflare blocking the whole run; an account that
+# is challenged run after run costs browser fetches every time.
+BACKOFF_THRESHOLD = {
+    "challenge": 3,
+}
+MAX_BACKOFF_HOURS = 90 * 24.0
+
+
+def backoff_hours(reason: str, consecutive_failures: int) -> float | None:
+    base = BACKOFF_BASE_HOURS.get(reason)
+    threshold = BACKOFF_THRESHOLD.get(reason, 1)
+    if base is None or consecutive_failures < threshold:
+        return None
+    return min(MAX_BACKOFF_HOURS, base * 2 ** (consecutive_failures - threshold))
+
+
+def classify_failure(exc: Exception) -> tuple[int | None, str]:
+    if isinstance(exc, FetchError):
+        return exc.status, exc.reason
+    return None, "error"
+
+
+def record_success(conn: sqlite3.Connection, username: str, empty: bool = False) -> None:
+    """Clear the user's backoff, or start one if the account has nothing to ingest."""
+    if empty:
+        record_failure(conn, username, 200, "empty")
+        return
+    repo.upsert_fetch_outcome(conn, username, 200, "ok", 0, None)
+
+
+def record_failure(
+    conn: sqlite3.Connection,
+    username: str,
+    status: int | None,
+    reason: str,
+) -> float | None:
+    """Record a failed ingest; returns the backoff in hours, or ``None`` if there is none.
+
+    Transient failures are recorded without a backoff and leave the
+    consecutive-failure count alone; challenges count but only back off
+    once they reach ``BACKOFF_THRESHOLD``.
+    """
+    failures = repo.select_consecutive_failures(conn, username)
+    if reason in BACKOFF_BASE_HOURS:
+        failures += 1
+    hours = backoff_hours(reason, failures)
+    repo.upsert_fetch_outcome(conn, username, status, reason, failures, hours)
+    return hours
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import hashlib
 import re
 from typing import Iterable
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 
 @dataclass(frozen=True)
@@ -23,6 +24,21 @@ class FilmItem:
 class Profile:
     username: str
     display_name: str | None
+    films_count: int | None = None
+    films_this_year: int | None = None
+    lists_count: int | None = None
+    following_count: int | None = None
+    followers_count: int | None = None
+    watchlist_count: int | None = None
+    latest_diary_entry: str | None = None
+
+    @property
+    def signature(self) -> str | None:
+        """Cheap change marker: unchanged means no new films, diary entries or watchlist adds."""
+        if self.films_count is None:
+            return None
+        parts = (self.films_count, self.watchlist_count, self.latest_diary_entry)
+        return "|".join("" if part is None else str(part) for part in parts)
 
 
 def parse_film_page(html: str) -> tuple[str | None, int | None, list[str]]:
@@ -61,7 +77,62 @@ def parse_profile(username: str, html: str) -> Profile:
     header = soup.select_one("h1.title-2") or soup.select_one("h1.profile-name")
     if header:
         display = header.get_text(strip=True) or None
-    return Profile(username=username, display_name=display)
+    stats = _profile_stats(soup)
+    return Profile(
+        username=username,
+        display_name=display,
+        films_count=stats.get("films"),
+        films_this_year=stats.get("this_year"),
+        lists_count=stats.get("lists"),
+        following_count=stats.get("following"),
+        followers_count=stats.get("followers"),
+        watchlist_count=_aside_count(soup, "/watchlist/"),
+        latest_diary_entry=_latest_diary_entry(soup),
+    )
+
+
+def _profile_stats(soup) -> dict[str, int]:
+    stats: dict[str, int] = {}
+    for node in soup.select("h4.profile-statistic"):
+        value = _to_count(_text(node.select_one("span.value")))
+        label = (_text(node.select_one("span.definition")) or "").strip().lower()
+        if value is None or not label:
+            continue
+        if label.startswith("in "):
+            stats["this_year"] = value
+        elif label in ("film", "films"):
+            stats["films"] = value
+        elif label in ("list", "lists"):
+            stats["lists"] = value
+        elif label == "following":
+            stats["following"] = value
+        elif label in ("follower", "followers"):
+            stats["followers"] = value
+    return stats
+
+
+def _aside_count(soup, href_suffix: str) -> int | None:
+    for link in soup.select("section a.all-link"):
+        if link.get("href", "").endswith(href_suffix):
+            return _to_count(link.get_text(strip=True))
+    return None
+
+
+def _latest_diary_entry(soup) -> str | None:
+    link = soup.select_one(".diary-summary-by-month dd.title a[href]")
+    if link:
+        return link["href"]
+    return None
+
+
+def _text(node) -> str | None:
+    return node.get_text(strip=True) if node else None
+
+
+def _to_count(value: str | None) -> int | None:
+    if not value:
+        return None
+    return _to_int(value.replace(",", "").strip())
 
 
 def is_challenge_page(html: str) -> bool:
@@ -75,6 +146,46 @@ def is_challenge_page(html: str) -> bool:
     return any(marker in html for marker in markers)
 
 
+def is_not_found_page(html: str) -> bool:
+    """Letterboxd's error page, as rendered for deleted or renamed accounts."""
+    markers = (
+        "Sorry, we can’t find the page",
+        "Sorry, we can't find the page",
+    )
+    return any(marker in html for marker in markers)
+
+
+def is_private_profile(html: str) -> bool:
+    """The notice Letterboxd shows instead of a private account's profile."""
+    markers = (
+        "This profile is private",
+        "This member’s profile is private",
+        "This member's profile is private",
+    )
+    return any(marker in html for marker in markers)
+
+
+# Markup that changes between otherwise identical fetches (CSRF tokens, inline
+# analytics, ad slots) and must not affect a page fingerprint.
+_VOLATILE_HTML = (
+    re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL),
+    re.compile(r"<style\b.*?</style>", re.IGNORECASE | re.DOTALL),
+    re.compile(r"<!--.*?-->", re.DOTALL),
+    re.compile(r"<input[^>]*__csrf[^>]*>", re.IGNORECASE),
+    re.compile(r'<div[^>]*class="[^"]*\bbanner\b[^"]*"[^>]*>.*?</div>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'\snonce="[^"]*"', re.IGNORECASE),
+)
+
+
+def page_fingerprint(html: str) -> str:
+    """Hash of a page with volatile markup and whitespace normalised away."""
+    text = html
+    for pattern in _VOLATILE_HTML:
+        text = pattern.sub("", text)
+    text = "".join(text.split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
 def parse_diary(html: str) -> list[FilmItem]:
     soup = BeautifulSoup(html, "lxml")
     items: list[FilmItem] = []
@@ -173,7 +284,8 @@ def parse_watchlist(html: str) -> list[FilmItem]:
 
 
 def parse_next_page(html: str) -> str | None:
-    soup = BeautifulSoup(html, "lxml")
+    # Only anchors matter here; skipping the rest keeps this cheap on the fetch path.
+    soup = BeautifulSoup(html, "lxml", parse_only=SoupStrainer("a"))
     link = soup.select_one("a.next") or soup.select_one("a.next-page")
     if link and link.get("href"):
         return link["href"]
@@ -330,6 +442,17 @@ def parse_genres_page(html: str) -> list[str]:
     return genres
 
 
+def slug_from_film_path(path: str) -> str | None:
+    """Film slug from /film/<slug>/ or /<user>/film/<slug>/[n/] paths."""
+    parts = [part for part in path.split("/") if part]
+    if "film" not in parts:
+        return None
+    idx = parts.index("film")
+    if idx + 1 >= len(parts):
+        return None
+    return parts[idx + 1]
+
+
 def merge_items(items: Iterable[FilmItem]) -> dict[str, FilmItem]:
     merged: dict[str, FilmItem] = {}
     for item in items:
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import atexit
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+Parser = Callable[[str], list[FilmItem]]
+
+_PROCESS_POOLS: dict[int, ProcessPoolExecutor] = {}
+_PROCESS_POOLS_LOCK = threading.Lock()
+
+
+def parse_pool(processes: int) -> ProcessPoolExecutor:
+    """Shared process pool so concurrent ingests don't each spawn their own workers."""
+    with _PROCESS_POOLS_LOCK:
+        pool = _PROCESS_POOLS.get(processes)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=processes)
+            _PROCESS_POOLS[processes] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_parse_pools() -> None:
+    """Stop every shared parse process; runs at interpreter exit."""
+    with _PROCESS_POOLS_LOCK:
+        pools = list(_PROCESS_POOLS.values())
+        _PROCESS_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class PagePipeline:
+    """Overlap fetching, parsing and persisting of one user's pages.
+
+    The caller fetches pages and hands them to ``submit``; parsing runs in the
+    background (one thread, or a shared process pool when ``processes`` > 0) and
+    parsed items go to ``persist`` in page order. At most ``max_pending`` pages
+    wait on each of the parse and persist stages, so a slow stage throttles the
+    fetcher instead of buffering the whole crawl.
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[list[FilmItem]], Future],
+        processes: int = 0,
+        max_pending: int = 4,
+    ) -> None:
+        self._persist = persist
+        self._owns_executor = processes <= 0
+        self._executor: Executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+            if self._owns_executor
+            else parse_pool(processes)
+        )
+        self.max_pending = max(1, max_pending)
+        self._parsing: deque[Future] = deque()
+        self._writing: deque[Future] = deque()
+        self.items: list[FilmItem] = []
+
+    def __enter__(self) -> PagePipeline:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def submit(self, parser: Parser, html: str) -> None:
+        self._enqueue(self._executor.submit(parser, html))
+
+    def add(self, items: Iterable[FilmItem]) -> None:
+        """Queue items that were parsed elsewhere (e.g. from the RSS feed) behind pending pages."""
+        parsed: Future = Future()
+        parsed.set_result(list(items))
+        self._enqueue(parsed)
+
+    def finish(self) -> list[FilmItem]:
+        """Wait for every page to be parsed and persisted; returns all parsed items."""
+        while self._parsing:
+            self._forward(self._parsing.popleft().result())
+        while self._writing:
+            self._writing.popleft().result()
+        return self.items
+
+    def close(self) -> None:
+        for future in self._parsing:
+            future.cancel()
+        self._parsing.clear()
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def _enqueue(self, parsed: Future) -> None:
+        self._parsing.append(parsed)
+        while len(self._parsing) > self.max_pending:
+            self._forward(self._parsing.popleft().result())
+        while self._parsing and self._parsing[0].done():
+            self._forward(self._parsing.popleft().result())
+
+    def _forward(self, items: list[FilmItem]) -> None:
+        if not items:
+            return
+        self.items.extend(items)
+        self._writing.append(self._persist(items))
+        while len(self._writing) > self.max_pending:
+            self._writing.popleft().result()
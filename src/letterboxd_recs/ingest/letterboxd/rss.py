@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+from typing import Iterator
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
+
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem, slug_from_film_path
+
+LETTERBOXD_NS = "{https://letterboxd.com}"
+
+
+@dataclass(frozen=True)
+class RssEntry:
+    entry: str
+    item: FilmItem
+    rewatch: bool = False
+
+
+def iter_rss_entries(xml_text: str) -> Iterator[RssEntry]:
+    """Stream diary entries from a /<username>/rss/ feed; list and other items are skipped."""
+    source = io.BytesIO(xml_text.encode("utf-8"))
+    for _event, elem in ET.iterparse(source, events=("end",)):
+        if elem.tag != "item":
+            continue
+        entry = _entry_from_item(elem)
+        elem.clear()
+        if entry is not None:
+            yield entry
+
+
+def parse_rss(xml_text: str) -> list[RssEntry]:
+    return list(iter_rss_entries(xml_text))
+
+
+def _entry_from_item(elem: ET.Element) -> RssEntry | None:
+    title = _text(elem, f"{LETTERBOXD_NS}filmTitle")
+    link = _text(elem, "link")
+    if title is None or link is None:
+        return None
+    path = urlparse(link).path
+    slug = slug_from_film_path(path)
+    if not slug:
+        return None
+    return RssEntry(
+        entry=path,
+        item=FilmItem(
+            slug=slug,
+            title=title,
+            year=_to_int(_text(elem, f"{LETTERBOXD_NS}filmYear")),
+            rating=_to_float(_text(elem, f"{LETTERBOXD_NS}memberRating")),
+            liked=_text(elem, f"{LETTERBOXD_NS}memberLike") == "Yes",
+            watched=True,
+            watch_date=_text(elem, f"{LETTERBOXD_NS}watchedDate"),
+            watchlist=False,
+        ),
+        rewatch=_text(elem, f"{LETTERBOXD_NS}rewatch") == "Yes",
+    )
+
+
+def _text(elem: ET.Element, tag: str) -> str | None:
+    node = elem.find(tag)
+    if node is None or node.text is None:
+        return None
+    return node.text.strip() or None
+
+
+def _to_int(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _to_float(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+
+from letterboxd_recs.config import Config
+from letterboxd_recs.db import repo
+from letterboxd_recs.ingest.letterboxd.client import cache_key_for_url
+from letterboxd_recs.models.social_simple import compute_similarity_scores
+from letterboxd_recs.util.cache import FileCache
+
+BASE_URL = "https://letterboxd.com"
+FILMS_PAGE_SIZE = 72
+WATCHLIST_PAGE_SIZE = 28
+FOLLOWING_PAGE_SIZE = 25
+# A refresh reads the profile plus the first films and watchlist pages.
+REFRESH_REQUESTS = 3
+# The availability update renders the film page and its where-to-watch fragment.
+AVAILABILITY_REQUESTS = 2
+# Share of the watched count assumed to sit on the watchlist when sizing a full ingest.
+WATCHLIST_RATIO = 0.3
+# Prior activity (films/day) spread over an assumed five years of logging.
+ACTIVITY_PRIOR_DAYS = 5 * 365
+BROWSER_SECONDS_PER_REQUEST = 4.0
+HTTP_SECONDS_PER_REQUEST = 1.0
+
+
+@dataclass(frozen=True)
+class CostEstimate:
+    users: float = 0.0
+    requests: int = 0
+    cached: int = 0
+    browser_renders: int = 0
+    seconds: float = 0.0
+
+    def __add__(self, other: CostEstimate) -> CostEstimate:
+        return CostEstimate(
+            users=self.users + other.users,
+            requests=self.requests + other.requests,
+            cached=self.cached + other.cached,
+            browser_renders=self.browser_renders + other.browser_renders,
+            seconds=self.seconds + other.seconds,
+        )
+
+
+@dataclass(frozen=True)
+class RefreshCandidate:
+    username: str
+    score: float
+    value: float
+    requests: int
+    similarity: float
+    staleness_days: float
+    activity_rate: float
+    full_ingest: bool
+
+
+def seconds_per_request(cfg: Config) -> float:
+    overhead = BROWSER_SECONDS_PER_REQUEST if cfg.scrape.use_browser else HTTP_SECONDS_PER_REQUEST
+    return cfg.scrape.rate_limit_seconds + overhead
+
+
+def full_ingest_requests(watched: int) -> int:
+    """Profile plus every films page and the expected watchlist pages."""
+    return (
+        1
+        + max(1, math.ceil(watched / FILMS_PAGE_SIZE))
+        + max(1, math.ceil(watched * WATCHLIST_RATIO / WATCHLIST_PAGE_SIZE))
+    )
+
+
+def request_cost(cfg: Config, pages: list[str], cache_dir: Path, refresh: bool) -> CostEstimate:
+    """Cost of fetching ``pages`` through ``ingest_user``: with the browser every page is
+    rendered; over HTTP, pages still fresh in the cache are free unless refreshing."""
+    if cfg.scrape.use_browser:
+        return CostEstimate(
+            requests=len(pages),
+            browser_renders=len(pages),
+            seconds=len(pages) * seconds_per_request(cfg),
+        )
+    cache = FileCache(cache_dir)
+    cached = 0
+    if not refresh:
+        cached = sum(
+            1
+            for url in pages
+            if cache.entry(f"{cache_key_for_url(url)}.html").is_fresh(cfg.scrape.cache_ttl_days)
+        )
+    requests = len(pages) - cached
+    return CostEstimate(requests=requests, cached=cached, seconds=requests * seconds_per_request(cfg))
+
+
+def estimate_user_ingests(cfg: Config, usernames: list[str], refresh: bool = True) -> CostEstimate:
+    """Upper-bound cost of ``ingest_users`` (films + watchlist) for ``usernames``."""
+    with repo.connect(cfg.database_path) as conn:
+        counts = repo.select_user_counts(conn)
+        backed_off = repo.select_backed_off_usernames(conn)
+    total = CostEstimate()
+    for username in dict.fromkeys(usernames):
+        if username in backed_off:
+            continue
+        watched = int(counts.get(username, (None, None))[1] or 0)
+        pages = user_page_urls(username, watched, refresh)
+        cache_dir = Path(cfg.app.cache_dir) / "letterboxd" / username
+        total = total + CostEstimate(users=1) + request_cost(cfg, pages, cache_dir, refresh)
+    return total
+
+
+def user_page_urls(username: str, watched: int, refresh: bool) -> list[str]:
+    films_pages = 1 if refresh else max(1, math.ceil(watched / FILMS_PAGE_SIZE))
+    watchlist_pages = 1 if refresh else max(1, math.ceil(watched * WATCHLIST_RATIO / WATCHLIST_PAGE_SIZE))
+    return (
+        [f"{BASE_URL}/{username}/"]
+        + _paged_urls(f"{BASE_URL}/{username}/films/by/date/", films_pages)
+        + _paged_urls(f"{BASE_URL}/{username}/watchlist/", watchlist_pages)
+    )
+
+
+def _paged_urls(url: str, pages: int) -> list[str]:
+    return [url] + [f"{url}page/{page}/" for page in range(2, pages + 1)]
+
+
+def root_similarity_weights(cfg: Config, roots: list[str]) -> dict[str, float]:
+    """Best similarity of every scored user to any root; roots themselves weigh 1.0."""
+    weights: dict[str, float] = {}
+    with repo.connect(cfg.database_path) as conn:
+        known = [root for root in roots if repo.select_user_id(conn, root) is not None]
+    for root in roots:
+        weights[root] = 1.0
+    for root in known:
+        scores = compute_similarity_scores(
+            cfg.database_path,
+            root,
+            similarity=cfg.social_similarity,
+            normalize_top=True,
+        )
+        for entry in scores:
+            if entry.similarity > weights.get(entry.username, 0.0):
+                weights[entry.username] = entry.similarity
+    return weights
+
+
+def rank_refresh_candidates(
+    conn: sqlite3.Connection,
+    similarity: dict[str, float],
+    unknown_similarity: float = 0.05,
+) -> list[RefreshCandidate]:
+    candidates: list[RefreshCandidate] = []
+    backed_off = repo.select_backed_off_usernames(conn)
+    for row in repo.select_refresh_stats(conn):
+        username = row["username"]
+        if username in backed_off:
+            continue
+        watched = int(row["watched_count"] or 0)
+        staleness = row["staleness_days"]
+        staleness = float(staleness) if staleness is not None else 365.0
+        rate = row["activity_rate"]
+        if rate is None:
+            rate = watched / ACTIVITY_PRIOR_DAYS
+        rate = max(0.0, float(rate))
+        sim = similarity.get(username, unknown_similarity)
+        full_ingest = not row["has_interactions"]
+        if full_ingest:
+            requests = full_ingest_requests(watched)
+            expected_new = float(watched)
+        else:
+            requests = REFRESH_REQUESTS
+            expected_new = min(float(FILMS_PAGE_SIZE), rate * max(0.0, staleness))
+        value = sim * expected_new
+        candidates.append(
+            RefreshCandidate(
+                username=username,
+                score=value / requests,
+                value=value,
+                requests=requests,
+                similarity=sim,
+                staleness_days=staleness,
+                activity_rate=rate,
+                full_ingest=full_ingest,
+            )
+        )
+    candidates.sort(key=lambda c: (-c.score, -c.staleness_days, c.username))
+    return candidates
+
+
+def plan_refresh(
+    candidates: list[RefreshCandidate],
+    max_requests: int | None = None,
+    max_seconds: float | None = None,
+    seconds_per_request: float = 1.0,
+) -> list[RefreshCandidate]:
+    """Greedy knapsack by value density: take the best candidates that still fit."""
+    budget = float("inf") if max_requests is None else float(max_requests)
+    if max_seconds is not None:
+        budget = min(budget, max_seconds / max(seconds_per_request, 1e-9))
+    chosen: list[RefreshCandidate] = []
+    spent = 0
+    for candidate in candidates:
+        if spent + candidate.requests > budget:
+            continue
+        chosen.append(candidate)
+        spent += candidate.requests
+    return chosen
+
+
+def schedule_refresh(
+    cfg: Config,
+    roots: list[str] | None = None,
+    max_requests: int | None = None,
+    max_seconds: float | None = None,
+) -> list[RefreshCandidate]:
+    with repo.connect(cfg.database_path) as conn:
+        root_names = roots if roots else repo.select_root_usernames(conn)
+    similarity = root_similarity_weights(cfg, root_names)
+    with repo.connect(cfg.database_path) as conn:
+        ranked = rank_refresh_candidates(conn, similarity)
+    return plan_refresh(
+        ranked,
+        max_requests=max_requests,
+        max_seconds=max_seconds,
+        seconds_per_request=seconds_per_request(cfg),
+    )
@@ -85,6 +85,15 @@ def parse_following_entries(html: str) -> list[FolloweeSummary]:
     ]
 
 
+def parse_following_total(html: str, username: str) -> int | None:
+    """How many accounts ``username`` follows, from the tooltip on a following page's nav."""
+    soup = BeautifulSoup(html, "lxml")
+    link = soup.select_one(f'a.tooltip[href="/{username}/following/"]')
+    if link is None:
+        return None
+    return _parse_int(link.get("data-original-title") or "")
+
+
 def _parse_int(text: str) -> int | None:
     if not text:
         return None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+import hashlib
+import json
+
+from letterboxd_recs.config import Config
+from letterboxd_recs.db import repo
+from letterboxd_recs.models.social_simple import SocialScore, compute_social_scores
+
+MODEL_NAME = "social"
+
+
+def scoring_hash(cfg: Config, similar_user_limit: int | None = None) -> str:
+    """Fingerprint of every setting that changes social scores.
+
+    The current year is included because time weights are relative to it.
+    """
+    parts = [
+        _plain(cfg.social),
+        _plain(cfg.social_ratings),
+        _plain(cfg.social_similarity),
+        _plain(cfg.social_normalize),
+        _plain(cfg.graph),
+        similar_user_limit,
+        datetime.now().year,
+    ]
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_social_scores(
+    cfg: Config,
+    username: str,
+    similar_user_limit: int | None = None,
+    recompute: bool = False,
+) -> list[SocialScore]:
+    """Social scores for the user, reused from ``recommendations`` while still current.
+
+    Stored results are keyed by ``social:<config hash>:<dataset version>``; any
+    scoring-relevant write bumps the dataset version, so a stale entry is never
+    read back. Scoring reads several snapshots, so results are only stored
+    when the version is still the one read up front. ``recompute`` skips the
+    lookup and overwrites the entry.
+    """
+    with repo.snapshot(cfg.database_path) as conn:
+        user_id = repo.select_user_id(conn, username)
+        version = repo.select_dataset_version(conn)
+        model_version = f"{MODEL_NAME}:{scoring_hash(cfg, similar_user_limit)}:{version}"
+        if user_id is not None and not recompute:
+            rows = repo.select_recommendations(conn, user_id, model_version)
+            if rows:
+                return [
+                    SocialScore(
+                        film_id=int(row["film_id"]),
+                        title=row["title"],
+                        year=row["year"],
+                        genres=row["genres"],
+                        score=float(row["score"]),
+                    )
+                    for row in rows
+                ]
+
+    results = compute_social_scores(
+        cfg.database_path,
+        username,
+        weights=cfg.social,
+        rating_weights=cfg.social_ratings,
+        similarity=cfg.social_similarity,
+        normalize=cfg.social_normalize,
+        limit=None,
+        similar_user_limit=similar_user_limit,
+        graph=cfg.graph,
+    )
+    if user_id is not None and results:
+        with repo.connect(cfg.database_path) as conn:
+            repo.replace_recommendations(
+                conn, user_id, model_version, [(item.film_id, item.score) for item in results]
+            )
+            # The write above holds the lock, so this is the latest version. If a
+            # write landed while scoring, the results may already include it.
+            if repo.select_dataset_version(conn) != version:
+                conn.rollback()
+    return results
+
+
+def _plain(value):
+    if is_dataclass(value):
+        return asdict(value)
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    return value
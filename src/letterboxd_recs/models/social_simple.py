@@ -5,7 +5,9 @@ from datetime import datetime
 from typing import Iterable
 
 from letterboxd_recs.db import repo
+from letterboxd_recs.graph.csr import influence_weights, load_follow_graph
 from letterboxd_recs.config import (
+    GraphConfig,
     SocialConfig,
     SocialRatingsConfig,
     SocialSimilarityConfig,
@@ -52,6 +54,7 @@ def compute_social_scores(
     normalize: SocialNormalizeConfig | None = None,
     limit: int | None = 200,
     similar_user_limit: int | None = None,
+    graph: GraphConfig | None = None,
 ) -> list[SocialScore]:
     if weights is None:
         weights = SocialWeights()
@@ -84,6 +87,8 @@ def compute_social_scores(
         )
 
     with repo.connect(db_path) as conn:
+        repo.ensure_similarity_root(conn, username)
+    with repo.snapshot(db_path) as conn:
         sim_rows = repo.select_similarity_rows(conn, username)
         me_watched = repo.select_watched_count(conn, username)
         root_id = conn.execute(
@@ -120,6 +125,7 @@ def compute_social_scores(
         top = max(sim_map.values())
         if top > 0:
             sim_map = {k: v / top for k, v in sim_map.items()}
+    sim_map = _apply_influence(db_path, root_id, sim_map, graph)
 
     allowed_followee_ids = None
     if similar_user_limit is not None:
@@ -138,7 +144,7 @@ def compute_social_scores(
             if followee_id in allowed_followee_set
         }
 
-    with repo.connect(db_path) as conn:
+    with repo.snapshot(db_path) as conn:
         rows = repo.select_social_rows(conn, username, allowed_followee_ids)
         watchlist_rows = repo.select_user_watchlist(conn, username)
 
@@ -339,6 +345,8 @@ def compute_similarity_scores(
         )
 
     with repo.connect(db_path) as conn:
+        repo.ensure_similarity_root(conn, username)
+    with repo.snapshot(db_path) as conn:
         sim_rows = repo.select_similarity_rows(conn, username)
         me_watched = repo.select_watched_count(conn, username)
         root_id = conn.execute(
@@ -418,11 +426,14 @@ def compute_social_contributions(
     weights: SocialWeights | SocialConfig,
     rating_weights: SocialRatingsConfig,
     similarity: SocialSimilarityConfig,
+    graph: GraphConfig | None = None,
 ) -> dict[int, list[dict[str, float | str]]]:
     if not film_ids:
         return {}
 
     with repo.connect(db_path) as conn:
+        repo.ensure_similarity_root(conn, username)
+    with repo.snapshot(db_path) as conn:
         rows = repo.select_social_rows(conn, username)
         sim_rows = repo.select_similarity_rows(conn, username)
         me_watched = repo.select_watched_count(conn, username)
@@ -463,6 +474,7 @@ def compute_social_contributions(
         top = max(sim_map.values())
         if top > 0:
             sim_map = {k: v / top for k, v in sim_map.items()}
+    sim_map = _apply_influence(db_path, root_id, sim_map, graph)
 
     film_set = set(film_ids)
     contributions: dict[int, list[dict[str, float | str]]] = {}
@@ -546,11 +558,14 @@ def compute_social_contributions_normalized(
     rating_weights: SocialRatingsConfig,
     similarity: SocialSimilarityConfig,
     normalize: SocialNormalizeConfig,
+    graph: GraphConfig | None = None,
 ) -> dict[int, list[dict[str, float | str | int | None]]]:
     if not film_ids:
         return {}
 
     with repo.connect(db_path) as conn:
+        repo.ensure_similarity_root(conn, username)
+    with repo.snapshot(db_path) as conn:
         rows = repo.select_social_rows(conn, username)
         sim_rows = repo.select_similarity_rows(conn, username)
         me_watched = repo.select_watched_count(conn, username)
@@ -590,6 +605,7 @@ def compute_social_contributions_normalized(
         top = max(sim_map.values())
         if top > 0:
             sim_map = {k: v / top for k, v in sim_map.items()}
+    sim_map = _apply_influence(db_path, root_id, sim_map, graph)
 
     current_year = datetime.now().year
     component_rows: list[dict[str, float | int | None | str]] = []
@@ -688,6 +704,27 @@ def compute_social_contributions_normalized(
     }
 
 
+def _apply_influence(
+    db_path: str,
+    root_id: int,
+    sim_map: dict[int, float],
+    graph: GraphConfig | None,
+) -> dict[int, float]:
+    """Blend follow-graph influence into similarities when ``graph.influence_weight`` > 0.
+
+    Each similarity is scaled by ``(1 - w) + w * influence``, so users the root
+    can't reach through the follow graph keep ``1 - w`` of their weight.
+    """
+    if graph is None or graph.influence_weight <= 0 or not sim_map:
+        return sim_map
+    weight = min(1.0, graph.influence_weight)
+    influence = influence_weights(load_follow_graph(db_path), root_id, graph)
+    return {
+        followee_id: sim * ((1.0 - weight) + weight * influence.get(followee_id, 0.0))
+        for followee_id, sim in sim_map.items()
+    }
+
+
 def _scale(value: float, min_val: float, max_val: float, out_min: float, out_max: float) -> float:
     if max_val == min_val:
         return out_min
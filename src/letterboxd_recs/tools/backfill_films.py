@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import argparse
+from contextlib import nullcontext
 import sqlite3
-import time
 from pathlib import Path
 
-from letterboxd_recs.config import ScrapeConfig
+from letterboxd_recs.config import DatabaseConfig, ScrapeConfig
+from letterboxd_recs.db.bulk import bulk_load
 from letterboxd_recs.db.conn import ensure_db
 from letterboxd_recs.db import repo
+from letterboxd_recs.db.writer import DbWriter
 from letterboxd_recs.ingest.letterboxd.client import LetterboxdClient
 from letterboxd_recs.ingest.letterboxd.browser import fetch_html as browser_fetch
 from letterboxd_recs.ingest.letterboxd.parse import (
@@ -148,12 +150,12 @@ def _fetch_film_metadata(
 
 
 def _upsert_film_metadata(
-    conn,
+    writer: DbWriter,
     items: dict[str, FilmItem],
     client: LetterboxdClient | None,
     refresh: bool,
 ) -> int:
-    updated = 0
+    pending = []
     for item in items.values():
         title = item.title
         year = item.year
@@ -166,31 +168,22 @@ def _upsert_film_metadata(
         if title is None and year is None and not genres:
             continue
         genres_text = ", ".join(genres) if genres else None
-        _retry_upsert(conn, item.slug, title, year, genres_text)
-        updated += 1
-        if updated % 25 == 0:
-            conn.commit()
-    return updated
+        pending.append(writer.submit(_film_metadata_job(item.slug, title, year, genres_text)))
+    for future in pending:
+        future.result()
+    return len(pending)
 
 
-def _retry_upsert(
-    conn: sqlite3.Connection,
+def _film_metadata_job(
     slug: str,
     title: str | None,
     year: int | None,
     genres_text: str | None,
-) -> None:
-    for attempt in range(1, 6):
-        try:
-            repo.upsert_film_metadata(conn, slug, title, year, genres_text)
-            return
-        except sqlite3.OperationalError as exc:
-            if "locked" not in str(exc).lower():
-                raise
-            wait = 0.5 * attempt
-            LOG.warning("DB locked (attempt %s). Retrying in %.1fs", attempt, wait)
-            time.sleep(wait)
-    repo.upsert_film_metadata(conn, slug, title, year, genres_text)
+):
+    def _job(conn: sqlite3.Connection) -> None:
+        repo.upsert_film_metadata(conn, slug, title, year, genres_text)
+
+    return _job
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -229,12 +222,18 @@ def main(argv: list[str] | None = None) -> None:
         action="store_true",
         help="Force refresh when fetching film pages.",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Bulk-load mode: batched commits, deferred indexes, ANALYZE at the end.",
+    )
     args = parser.parse_args(argv)
 
     db_path = args.db
     cache_root = args.cache_dir
     scrape = None
     user_agent = None
+    database = DatabaseConfig()
     if db_path is None or cache_root is None:
         from letterboxd_recs.config import load_config
 
@@ -243,6 +242,7 @@ def main(argv: list[str] | None = None) -> None:
         cache_root = Path(cfg.app.cache_dir)
         scrape = cfg.scrape
         user_agent = cfg.app.user_agent
+        database = cfg.database
 
     ensure_db(str(db_path))
     cache_dir = cache_root / "letterboxd" / args.username
@@ -271,9 +271,9 @@ def main(argv: list[str] | None = None) -> None:
             user_agent = "letterboxd-recs/0.1"
         client = LetterboxdClient(user_agent, scrape, cache_dir)
 
-    with repo.connect(str(db_path)) as conn:
-        updated = _upsert_film_metadata(conn, items, client, args.refresh)
-        conn.commit()
+    with bulk_load(str(db_path), database) if args.bulk else nullcontext():
+        with DbWriter(str(db_path)) as writer:
+            updated = _upsert_film_metadata(writer, items, client, args.refresh)
 
     LOG.info("Updated %s film records", updated)
 
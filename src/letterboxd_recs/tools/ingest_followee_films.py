@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
 from letterboxd_recs.config import load_config
 from letterboxd_recs.db import repo
+from letterboxd_recs.db.bulk import bulk_load
 from letterboxd_recs.db.conn import ensure_db
-from letterboxd_recs.ingest.letterboxd.ingest import ingest_user
+from letterboxd_recs.ingest.letterboxd.orchestrator import BatchProgress, format_eta, ingest_users
 from letterboxd_recs.tools import backfill_films
 from letterboxd_recs.util.logging import get_logger
 
@@ -27,6 +29,12 @@ def main() -> None:
     parser.add_argument("--min-followers", type=int, default=100)
     parser.add_argument("--min-watched", type=int, default=100)
     parser.add_argument("--limit", type=int, default=None, help="Limit number of followees to ingest.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Concurrent user ingests (defaults to scrape.workers).",
+    )
     parser.add_argument(
         "--refresh",
         action="store_true",
@@ -47,6 +55,11 @@ def main() -> None:
         action="store_true",
         help="Force refresh when fetching film pages in backfill.",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Bulk-load mode for first-time crawls (also applied to --backfill).",
+    )
     args = parser.parse_args()
 
     cfg = load_config(args.config)
@@ -77,20 +90,30 @@ def main() -> None:
         followees = followees[: args.limit]
 
     LOG.info("Ingesting %s followees", len(followees))
-    for idx, uname in enumerate(followees, start=1):
-        LOG.info("(%s/%s) ingest %s", idx, len(followees), uname)
-        try:
-            ingest_user(
-                uname,
-                cfg,
-                refresh=args.refresh,
-                include_diary=False,
-                include_films=True,
-                include_likes=False,
-                include_watchlist=True,
-            )
-        except Exception as exc:  # noqa: BLE001
-            LOG.warning("Failed ingest for %s: %s", uname, exc)
+
+    def on_progress(update: BatchProgress) -> None:
+        LOG.info(
+            "(%s/%s) ingested %s%s eta=%s",
+            update.done,
+            update.total,
+            update.username,
+            " [failed]" if update.error else "",
+            format_eta(update.eta_seconds),
+        )
+
+    with bulk_load(cfg.database_path, cfg.database) if args.bulk else nullcontext():
+        result = ingest_users(
+            followees,
+            cfg,
+            workers=args.workers,
+            on_progress=on_progress,
+            refresh=args.refresh,
+            include_diary=False,
+            include_films=True,
+            include_likes=False,
+            include_watchlist=True,
+        )
+    LOG.info("Followee ingest complete: ok=%s failed=%s", result.ok, result.failed)
 
     if args.backfill:
         LOG.info("Running backfill for film metadata (genres)")
@@ -102,6 +125,8 @@ def main() -> None:
         ]
         if args.backfill_refresh:
             backfill_args.append("--refresh")
+        if args.bulk:
+            backfill_args.append("--bulk")
         backfill_films.main(backfill_args)
 
 
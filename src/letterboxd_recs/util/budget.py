@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import threading
+
+
+class BudgetExhausted(Exception):
+    """Raised before a request that would exceed the crawl's request budget."""
+
+
+class RequestBudget:
+    """Thread-safe count of network requests against an optional hard limit."""
+
+    def __init__(self, max_requests: int | None = None) -> None:
+        self.max_requests = max_requests
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int | None:
+        if self.max_requests is None:
+            return None
+        return max(0, self.max_requests - self.spent)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_requests is not None and self.spent >= self.max_requests
+
+    def charge(self, requests: int = 1) -> None:
+        with self._lock:
+            if self.max_requests is not None and self.spent + requests > self.max_requests:
+                raise BudgetExhausted(
+                    f"Request budget of {self.max_requests} spent ({self.spent} used)"
+                )
+            self.spent += requests
@@ -1,6 +1,25 @@
+import threading
 import time
 
 
 def sleep_seconds(seconds: float) -> None:
     if seconds > 0:
         time.sleep(seconds)
+
+
+class RateLimiter:
+    """Space requests from any number of threads at least ``interval`` seconds apart."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        sleep_seconds(slot - now)
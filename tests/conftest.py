@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def scrape_cfg(tmp_path):
+    """Factory for the slice of ``Config`` the ingest and crawl code reads.
+
+    The database and cache live under ``tmp_path``; keyword arguments
+    override ``scrape`` settings.
+    """
+
+    def make(**scrape_overrides):
+        scrape = {
+            "use_browser": False,
+            "rate_limit_seconds": 0,
+            "max_retries": 1,
+            "max_pages": 1,
+            "cache_ttl_days": 7,
+            "parse_processes": 0,
+            "pipeline_depth": 4,
+            "workers": 1,
+            **scrape_overrides,
+        }
+        return SimpleNamespace(
+            database_path=str(tmp_path / "test.sqlite"),
+            app=SimpleNamespace(cache_dir=str(tmp_path / "cache"), user_agent="test", region="CA"),
+            scrape=SimpleNamespace(**scrape),
+            graph=SimpleNamespace(max_depth=2),
+        )
+
+    return make
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from letterboxd_recs.config import DatabaseConfig
+from letterboxd_recs.db import connections, repo
+from letterboxd_recs.db.bulk import DEFERRED_INDEXES, DEFERRED_TRIGGERS, bulk_load, defer_indexes
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+PROFILE = DatabaseConfig(bulk_batch_size=50)
+
+
+def _film(slug: str, rating: float | None = None) -> FilmItem:
+    return FilmItem(slug, slug.title(), 2020, rating, False, True, None, False)
+
+
+def _indexes(conn) -> set[str]:
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    return {row[0] for row in rows} & set(DEFERRED_INDEXES)
+
+
+def _triggers(conn) -> set[str]:
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    return {row[0] for row in rows} & set(DEFERRED_TRIGGERS)
+
+
+def _seed(db_path: str) -> int:
+    with repo.connect(db_path) as conn:
+        root = repo.ensure_user(conn, "root")
+        repo.upsert_interactions(conn, root, [_film(f"f{n}", 4.0) for n in range(20)])
+        repo.ensure_similarity_root(conn, "root")
+    return root
+
+
+def test_bulk_load_defers_indexes_and_rebuilds_on_exit(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    _seed(db_path)
+
+    with repo.connect(db_path) as conn:
+        version = repo.select_dataset_version(conn)
+    with bulk_load(db_path, PROFILE):
+        with repo.connect(db_path) as conn:
+            assert _indexes(conn) == set()
+            assert _triggers(conn) == set()
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM similarity_roots").fetchone()[0] == 0
+        with DbWriter(db_path) as writer:
+            assert writer.bulk and writer.batch_size == 50
+            for n in range(120):
+                user_id = writer.call(lambda conn, n=n: repo.ensure_user(conn, f"u{n}"))
+                films = [_film(f"f{k}", 3.0) for k in range(n % 20)]
+                writer.submit(lambda conn, u=user_id, f=films: repo.upsert_interactions(conn, u, f))
+
+    with repo.connect(db_path) as conn:
+        assert _indexes(conn) == set(DEFERRED_INDEXES)
+        assert _triggers(conn) == set(DEFERRED_TRIGGERS)
+        assert conn.execute("SELECT COUNT(*) FROM deferred_indexes").fetchone()[0] == 0
+        # One entry stands in for every interaction the load wrote.
+        changes = repo.select_changes_since(conn, version, ["interaction"])
+        assert [(c["op"], c["user_id"]) for c in changes] == [("bulk", None)]
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+        # The root was re-registered and its pairs rebuilt from the loaded rows.
+        rows = repo.select_similarity_rows(conn, "root")
+        assert len(rows) == 114
+        assert {row["overlap"] for row in rows} == set(range(1, 20))
+
+
+def test_aborted_bulk_load_keeps_committed_rows_and_indexes(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    _seed(db_path)
+
+    with pytest.raises(KeyboardInterrupt):
+        with bulk_load(db_path, PROFILE):
+            with DbWriter(db_path) as writer:
+                writer.submit(lambda conn: repo.ensure_user(conn, "early"))
+                raise KeyboardInterrupt
+
+    with repo.connect(db_path) as conn:
+        assert _indexes(conn) == set(DEFERRED_INDEXES)
+        assert "early" in repo.select_all_usernames(conn)
+        assert conn.execute("SELECT COUNT(*) FROM similarity_roots").fetchone()[0] == 1
+    assert connections.current_profile().synchronous == "NORMAL"
+
+
+def _defer_as(db_path: str, pid: int) -> None:
+    with repo.connect(db_path) as conn:
+        assert defer_indexes(conn) == len(DEFERRED_INDEXES + DEFERRED_TRIGGERS)
+        conn.execute("UPDATE deferred_indexes SET owner_pid = ?", (pid,))
+        conn.commit()
+        assert _indexes(conn) == set()
+
+
+def test_writer_rebuilds_indexes_left_by_a_killed_bulk_load(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    # What a bulk load leaves behind when its process dies before the cleanup.
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    _defer_as(db_path, dead.pid)
+
+    with DbWriter(db_path) as writer:
+        writer.call(lambda conn: repo.ensure_user(conn, "alice"))
+
+    with repo.connect(db_path) as conn:
+        assert _indexes(conn) == set(DEFERRED_INDEXES)
+
+
+def test_writer_leaves_a_running_bulk_load_deferred(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    _defer_as(db_path, os.getppid())
+
+    with DbWriter(db_path) as writer:
+        writer.call(lambda conn: repo.ensure_user(conn, "alice"))
+
+    with repo.connect(db_path) as conn:
+        assert _indexes(conn) == set()
+        owners = conn.execute("SELECT DISTINCT owner_pid FROM deferred_indexes").fetchall()
+        assert [row[0] for row in owners] == [os.getppid()]
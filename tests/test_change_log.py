@@ -0,0 +1,85 @@
+import sqlite3
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+
+def _film(slug: str, rating: float | None = None) -> FilmItem:
+    return FilmItem(slug, slug.title(), 2020, rating, False, True, None, False)
+
+
+def test_writes_are_logged_and_consumed_by_cursor(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        alice = repo.ensure_user(conn, "alice")
+        repo.upsert_interactions(conn, alice, [_film("a"), _film("b")])
+        changes = repo.select_changes_since(conn, 0)
+        assert [(c["entity"], c["op"]) for c in changes] == [
+            ("film", "insert"),
+            ("film", "insert"),
+            ("interaction", "insert"),
+            ("interaction", "insert"),
+        ]
+        assert {c["user_id"] for c in changes if c["entity"] == "interaction"} == {alice}
+
+        cursor = repo.select_dataset_version(conn)
+        repo.save_change_cursor(conn, "recommendations", cursor)
+        # Unchanged re-ingests and bookkeeping updates are not changes.
+        repo.upsert_interactions(conn, alice, [_film("a")])
+        repo.record_refresh(conn, alice, 0)
+        assert repo.select_changes_since(conn, cursor) == []
+
+        repo.upsert_interactions(conn, alice, [_film("a", rating=4.0)])
+        friend = repo.upsert_user_stats(conn, "friend", None, 10, 10, 300)
+        repo.upsert_graph_edge(conn, alice, friend, 1)
+        delta = repo.select_changes_since(conn, cursor, ["interaction", "edge"])
+        assert [(c["entity"], c["entity_id"], c["op"]) for c in delta] == [
+            ("interaction", repo.select_film_ids(conn, ["a"])["a"], "update"),
+            ("edge", friend, "insert"),
+        ]
+
+        version = repo.select_dataset_version(conn)
+        assert repo.prune_change_log(conn) == len(changes)
+        assert repo.select_oldest_change(conn) == cursor + 1
+        repo.save_change_cursor(conn, "recommendations", version)
+        repo.prune_change_log(conn)
+        assert repo.select_oldest_change(conn) is None
+        assert repo.select_dataset_version(conn) == version
+
+
+def test_prune_without_consumers_keeps_recent_entries(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        alice = repo.ensure_user(conn, "alice")
+        repo.upsert_interactions(conn, alice, [_film("a"), _film("b")])
+        old, *recent = [c["seq"] for c in repo.select_changes_since(conn, 0)]
+        conn.execute("UPDATE change_log SET changed_at = datetime('now', '-100 days') WHERE seq = ?", (old,))
+        assert repo.prune_change_log(conn) == 1
+        assert [c["seq"] for c in repo.select_changes_since(conn, 0)] == recent
+        assert repo.prune_change_log(conn) == 0
+
+
+def test_counter_dataset_version_carries_over(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE dataset_version (id INTEGER PRIMARY KEY, version INTEGER)")
+        conn.execute("INSERT INTO dataset_version VALUES (1, 500)")
+        conn.execute("CREATE TABLE films (id INTEGER PRIMARY KEY, title TEXT)")
+        conn.execute(
+            """
+            CREATE TRIGGER dataset_version_films_update AFTER UPDATE ON films
+            BEGIN UPDATE dataset_version SET version = version + 1; END
+            """
+        )
+
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        assert repo.select_dataset_version(conn) == 500
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert "dataset_version" not in names
+        assert "dataset_version_films_update" not in names
+        conn.execute("INSERT INTO films (title) VALUES ('A')")
+        assert repo.select_dataset_version(conn) == 501
@@ -0,0 +1,225 @@
+from contextlib import closing
+import sqlite3
+
+import pytest
+
+from letterboxd_recs.db import conn as db_conn
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import SCHEMA_VERSION, ensure_db
+from letterboxd_recs.db.pair_stats import PAIR_TRIGGERS
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+OLD_ROWS = [
+    # user, film, rating, liked, watched, watchlist, watch_date
+    ("alice", "a", 4.5, 1, 1, 0, "2024-01-02"),
+    ("alice", "b", None, 0, 0, 1, None),
+    ("alice", "c", 0.5, 0, 1, 0, "2023-12-31 21:15:00"),
+    ("bob", "a", 3.0, 0, 1, 0, "not a date"),
+    ("bob", "c", 5.0, 1, 1, 1, "1999-07-04"),
+]
+
+
+def _film_id(conn, slug: str) -> int:
+    return repo.upsert_films(conn, [FilmItem(slug, None, None, None, False, False, None, False)])[slug]
+
+
+def _legacy_database(db_path: str) -> None:
+    # The unversioned layout: booleans, the rating and the watch date stored as-is.
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.executescript(
+            """
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE films (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                letterboxd_id TEXT UNIQUE,
+                title TEXT NOT NULL,
+                year INTEGER,
+                genres TEXT
+            );
+            CREATE TABLE interactions (
+                user_id INTEGER NOT NULL,
+                film_id INTEGER NOT NULL,
+                rating REAL,
+                liked BOOLEAN DEFAULT 0,
+                watched BOOLEAN DEFAULT 0,
+                watchlist BOOLEAN DEFAULT 0,
+                watch_date DATE,
+                PRIMARY KEY (user_id, film_id)
+            );
+            CREATE INDEX idx_interactions_watched_film
+                ON interactions (film_id, user_id, rating, watched) WHERE watched = 1;
+            """
+        )
+        for username, slug, rating, liked, watched, watchlist, watch_date in OLD_ROWS:
+            conn.execute("INSERT OR IGNORE INTO users (username) VALUES (?)", (username,))
+            conn.execute(
+                "INSERT OR IGNORE INTO films (letterboxd_id, title) VALUES (?, ?)", (slug, slug)
+            )
+            conn.execute(
+                """
+                INSERT INTO interactions (
+                    user_id, film_id, rating, liked, watched, watchlist, watch_date
+                )
+                SELECT u.id, f.id, ?, ?, ?, ?, ?
+                FROM users u, films f WHERE u.username = ? AND f.letterboxd_id = ?
+                """,
+                (rating, liked, watched, watchlist, watch_date, username, slug),
+            )
+
+
+def _rows(conn) -> list[tuple]:
+    rows = conn.execute(
+        """
+        SELECT u.username, f.letterboxd_id,
+               i.rating, i.liked, i.watched, i.watchlist, i.watch_date
+        FROM interactions i
+        JOIN users u ON u.id = i.user_id
+        JOIN films f ON f.id = i.film_id
+        ORDER BY u.username, f.letterboxd_id
+        """
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _table(conn, name: str) -> list[tuple]:
+    return [tuple(row) for row in conn.execute(f"SELECT * FROM {name} ORDER BY 1, 2")]
+
+
+def _fresh(tmp_path) -> sqlite3.Connection:
+    db_path = str(tmp_path / "fresh.sqlite")
+    ensure_db(db_path)
+    return repo.connect(db_path)
+
+
+def _schema(conn) -> dict[str, str]:
+    """Trigger and index definitions on ``interactions``, whitespace-normalised."""
+    rows = conn.execute(
+        """
+        SELECT name, sql FROM sqlite_master
+        WHERE tbl_name = 'interactions' AND type IN ('trigger', 'index') AND sql IS NOT NULL
+        """
+    )
+    return {name: " ".join(sql.split()) for name, sql in rows}
+
+
+def test_migration_packs_rows_and_keeps_derived_state(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    _legacy_database(db_path)
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'interactions'"
+        ).fetchone()[0]
+        assert sql.rstrip().endswith("WITHOUT ROWID")
+        assert _rows(conn) == [
+            ("alice", "a", 4.5, 1, 1, 0, "2024-01-02"),
+            ("alice", "b", None, 0, 0, 1, None),
+            ("alice", "c", 0.5, 0, 1, 0, "2023-12-31"),
+            ("bob", "a", 3.0, 0, 1, 0, None),
+            ("bob", "c", 5.0, 1, 1, 1, "1999-07-04"),
+        ]
+        stored = conn.execute(
+            "SELECT flags, rating_half, watch_day FROM interactions ORDER BY user_id, film_id"
+        ).fetchall()
+        assert [tuple(row) for row in stored][0] == (
+            repo.LIKED | repo.WATCHED,
+            9,
+            repo.pack_day("2024-01-02"),
+        )
+        # Only the unparseable watch date drops out of the aggregates.
+        assert [row[1:] for row in _table(conn, "user_stats")] == [
+            (2, 2, 5.0, 20.5, 1, "2024-01-02"),
+            (2, 2, 8.0, 34.0, 1, "1999-07-04"),
+        ]
+        triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        assert set(PAIR_TRIGGERS) <= {row[0] for row in triggers}
+        assert _schema(conn) == _schema(_fresh(tmp_path))
+
+
+def test_fresh_database_starts_compact(tmp_path, monkeypatch) -> None:
+    def rebuild(conn):
+        raise AssertionError("a fresh database was rebuilt")
+
+    monkeypatch.setattr(db_conn, "_rebuild_interactions", rebuild)
+    conn = _fresh(tmp_path)
+    update_of = {
+        row[0]: row[1]
+        for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'interactions'"
+        )
+    }
+    assert "rating_half, flags" in update_of["change_log_interactions_update"]
+    assert "rating_half, flags, watch_day" in update_of["interactions_stats_update"]
+
+
+def test_triggers_follow_the_packed_columns(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    _legacy_database(db_path)
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        repo.ensure_similarity_root(conn, "alice")
+        bob = repo.select_user_id(conn, "bob")
+        assert tuple(
+            conn.execute(
+                "SELECT overlap, rated_overlap, cross_sum FROM user_pair_stats WHERE other_id = ?",
+                (bob,),
+            ).fetchone()
+        ) == (2, 2, 4.5 * 3.0 + 0.5 * 5.0)
+        cursor = repo.select_dataset_version(conn)
+        # Watching a watchlisted film, a new rating and a new watch date.
+        repo.upsert_interactions(
+            conn,
+            bob,
+            [
+                FilmItem("b", None, None, 2.0, False, True, "2024-06-01", False),
+                FilmItem("c", None, None, 4.0, False, False, None, False),
+            ],
+        )
+        assert _rows(conn)[-3:] == [
+            ("bob", "a", 3.0, 0, 1, 0, None),
+            ("bob", "b", 2.0, 0, 1, 0, "2024-06-01"),
+            # Flags only ever gain bits; the rating is replaced.
+            ("bob", "c", 4.0, 1, 1, 1, "1999-07-04"),
+        ]
+        changes = repo.select_changes_since(conn, cursor, ["interaction"])
+        assert [c["op"] for c in changes] == ["insert", "update"]
+        stats = conn.execute(
+            """
+            SELECT watched_count, rated_count, rating_sum, last_watch_date
+            FROM user_stats WHERE user_id = ?
+            """,
+            (bob,),
+        ).fetchone()
+        assert tuple(stats) == (3, 3, 9.0, "2024-06-01")
+        pair = conn.execute(
+            "SELECT overlap, rated_overlap, cross_sum FROM user_pair_stats WHERE other_id = ?",
+            (bob,),
+        ).fetchone()
+        assert tuple(pair) == (2, 2, 4.5 * 3.0 + 0.5 * 4.0)
+
+
+def test_pack_helpers() -> None:
+    assert repo.pack_flags(True, False, True) == repo.LIKED | repo.WATCHLIST
+    assert repo.pack_rating(3.5) == 7
+    assert repo.pack_rating(None) is None
+    assert repo.pack_day("1970-01-02") == 1
+    assert repo.pack_day("2024-05-05T10:00:00") == repo.pack_day("2024-05-05")
+    assert repo.pack_day("") is None
+    assert repo.pack_day("05/05/2024") is None
+
+
+def test_generated_columns_cannot_be_written(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        alice = repo.ensure_user(conn, "alice")
+        film_id = _film_id(conn, "a")
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute(
+                "INSERT INTO interactions (user_id, film_id, watched) VALUES (?, ?, 1)",
+                (alice, film_id),
+            )
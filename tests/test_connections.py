@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+
+import pytest
+
+from letterboxd_recs.config import DatabaseConfig
+from letterboxd_recs.db import connections, repo
+from letterboxd_recs.db.conn import ensure_db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.sqlite")
+    ensure_db(path)
+    yield path
+    connections.close_all()
+    connections.configure(DatabaseConfig())
+
+
+def test_connections_are_cached_per_thread_and_reopened_after_close(db_path) -> None:
+    conn = repo.connect(db_path)
+    assert repo.connect(db_path) is conn
+    assert repo.connect(db_path, readonly=True) is not conn
+
+    others: list[sqlite3.Connection] = []
+    thread = threading.Thread(target=lambda: others.append(repo.connect(db_path)))
+    thread.start()
+    thread.join()
+    assert others[0] is not conn
+
+    conn.close()
+    reopened = repo.connect(db_path)
+    assert reopened is not conn
+    assert reopened.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+
+def test_profile_pragmas_are_applied(db_path) -> None:
+    connections.close_all()
+    connections.configure(DatabaseConfig(cache_size_mb=8, mmap_size_mb=1, synchronous="FULL"))
+    conn = repo.connect(db_path)
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -8 * 1024
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 1024 * 1024
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    connections.configure(DatabaseConfig(synchronous="SOMETIMES"))
+    with pytest.raises(ValueError):
+        connections.open_connection(db_path)
+
+
+def test_snapshot_is_read_only_and_isolated_from_writers(db_path) -> None:
+    with repo.connect(db_path) as conn:
+        repo.ensure_user(conn, "alice")
+
+    with repo.snapshot(db_path) as snap:
+        with pytest.raises(sqlite3.OperationalError):
+            snap.execute("INSERT INTO users (username) VALUES ('mallory')")
+        assert repo.select_all_usernames(snap) == ["alice"]
+        with repo.connect(db_path) as conn:
+            repo.ensure_user(conn, "bob")
+        # The writer committed, but the snapshot keeps its view.
+        assert repo.select_all_usernames(snap) == ["alice"]
+        with repo.snapshot(db_path) as nested:
+            assert nested is snap
+
+    with repo.snapshot(db_path) as snap:
+        assert sorted(repo.select_all_usernames(snap)) == ["alice", "bob"]
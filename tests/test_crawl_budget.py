@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+from letterboxd_recs import cli
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.graph import ingest as graph_ingest
+from letterboxd_recs.graph.plan import estimate_follow_graph
+from letterboxd_recs.ingest.letterboxd.social import FolloweeSummary
+from letterboxd_recs.util.budget import BudgetExhausted, RequestBudget
+
+GRAPH = {
+    "root": ["a", "b"],
+    "a": ["c"],
+    "b": ["d"],
+    "c": [],
+    "d": [],
+}
+
+
+def test_request_budget_stops_at_limit() -> None:
+    budget = RequestBudget(2)
+    budget.charge()
+    budget.charge()
+    assert budget.exhausted
+    with pytest.raises(BudgetExhausted):
+        budget.charge()
+    assert budget.spent == 2
+
+    unlimited = RequestBudget()
+    unlimited.charge(1000)
+    assert unlimited.remaining is None and not unlimited.exhausted
+
+
+def test_graph_crawl_checkpoints_and_resumes(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg(rate_limit_seconds=1.0)
+    crawled: list[str] = []
+
+    def fake_collect(username, client, refresh):
+        client.charge()
+        crawled.append(username)
+        return graph_ingest.FollowingList([FolloweeSummary(name, None, 500, 10, 500) for name in GRAPH[username]])
+
+    monkeypatch.setattr(graph_ingest, "_collect_followees", fake_collect)
+
+    first = graph_ingest.ingest_follow_graph(
+        "root", cfg, ingest_interactions=False, budget=RequestBudget(2)
+    )
+    assert first.complete is False
+    assert crawled == ["root", "a"]
+    with repo.connect(cfg.database_path) as conn:
+        state = repo.select_checkpoint(conn, "graph:root")
+    assert state["queue"] == [["b", 1], ["c", 2]]
+
+    second = graph_ingest.ingest_follow_graph(
+        "root", cfg, ingest_interactions=False, budget=RequestBudget(10)
+    )
+    assert second.complete is True
+    assert crawled == ["root", "a", "b"]
+    with repo.connect(cfg.database_path) as conn:
+        assert repo.select_checkpoint(conn, "graph:root") is None
+        edges = conn.execute("SELECT COUNT(*) FROM graph_edges").fetchone()[0]
+    assert edges == 4
+
+
+def test_estimate_follow_graph_uses_known_edges_and_counts(scrape_cfg) -> None:
+    cfg = scrape_cfg(rate_limit_seconds=1.0)
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        root = repo.upsert_user_stats(conn, "root", None, 10, 60, 500)
+        for name in ("a", "b"):
+            dst = repo.upsert_user_stats(conn, name, None, 10, 30, 500)
+            repo.upsert_graph_edge(conn, root, dst, 1)
+        conn.commit()
+
+    estimate = estimate_follow_graph(cfg, "root", max_depth=1)
+    assert estimate.requests == 3  # 60 followees over 25-per-page following pages
+    assert estimate.users == 2
+    assert estimate.seconds == pytest.approx(3 * 2.0)
+
+    deeper = estimate_follow_graph(cfg, "root", max_depth=2, ingest_interactions=True)
+    # a and b have 30 followees each (2 pages); a third of 60 followees passed the filters.
+    assert deeper.requests > 3 + 4
+    assert deeper.users == pytest.approx(2 + 2 * 30 * (2 / 60))
+
+
+def test_availability_update_is_charged_to_the_budget(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg(rate_limit_seconds=1.0)
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        conn.executemany(
+            "INSERT INTO films (id, letterboxd_id, title) VALUES (?, ?, ?)",
+            [(n, f"f{n}", f"F{n}") for n in range(1, 4)],
+        )
+        conn.commit()
+    top = [SimpleNamespace(film_id=n) for n in range(1, 4)]
+    monkeypatch.setattr(cli, "_base_recommendations", lambda *args, **kwargs: top)
+    fetched = []
+
+    def fake_fetch(url, user_agent):
+        fetched.append(url)
+        return SimpleNamespace(content="<html></html>")
+
+    monkeypatch.setattr(cli, "browser_fetch", fake_fetch)
+
+    budget = RequestBudget(2)
+    updated, skipped = cli._update_top_availability(cfg, "root", top_n=3, budget=budget)
+    assert (updated, skipped) == (2, 0)
+    assert len(fetched) == 2
+    assert budget.exhausted
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+import zipfile
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd import data_export
+from letterboxd_recs.ingest.letterboxd.data_export import (
+    import_export,
+    iter_export_rows,
+    parse_export_row,
+)
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+HEADER = "Date,Name,Year,Letterboxd URI"
+
+
+def _write_export(path) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "watched.csv",
+            "\n".join(
+                [
+                    HEADER,
+                    "2024-01-02,Heat,1995,https://boxd.it/2aHi",
+                    "2024-01-03,Alien,1979,https://boxd.it/2b0k",
+                    "2024-01-04,Obscure Film,2001,https://boxd.it/zzzz",
+                ]
+            ),
+        )
+        archive.writestr(
+            "ratings.csv",
+            HEADER + ",Rating\n2024-01-02,Heat,1995,https://boxd.it/2aHi,4.5\n",
+        )
+        archive.writestr(
+            "diary.csv",
+            "Date,Name,Year,Letterboxd URI,Rating,Rewatch,Tags,Watched Date\n"
+            "2024-01-02,Heat,1995,https://letterboxd.com/me/film/heat/,3,,,2024-01-01\n",
+        )
+        archive.writestr(
+            "watchlist.csv",
+            HEADER + "\n2024-02-01,Paris; Texas,1984,https://boxd.it/29Qa\n",
+        )
+        archive.writestr("likes/films.csv", HEADER + "\n2024-01-05,Alien,1979,https://boxd.it/2b0k\n")
+
+
+def test_export_rows_stream_in_merge_order(tmp_path) -> None:
+    export = tmp_path / "export.zip"
+    _write_export(export)
+
+    rows = [parse_export_row(name, row) for name, row in iter_export_rows(export)]
+
+    assert [row.name for row in rows][:2] == ["Heat", "Heat"]
+    diary, watched = rows[0], rows[1]
+    assert diary.rating == 3.0 and diary.watch_date == "2024-01-01"
+    assert watched.uri == "https://boxd.it/2aHi" and watched.watch_date is None
+    liked = next(row for row in rows if row.liked)
+    assert liked.name == "Alien" and liked.watched
+    watchlist = next(row for row in rows if row.watchlist)
+    assert watchlist.name == "Paris; Texas" and not watchlist.watched
+    assert rows[-1].name == "Heat" and rows[-1].rating == 4.5
+
+
+def test_import_export_writes_in_batches_and_keeps_latest_date(tmp_path, monkeypatch) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    cfg = SimpleNamespace(database_path=db_path)
+    export = tmp_path / "export.zip"
+    with zipfile.ZipFile(export, "w") as archive:
+        archive.writestr(
+            "diary.csv",
+            "Date,Name,Year,Letterboxd URI,Rating,Rewatch,Tags,Watched Date\n"
+            "2024-03-02,Heat,1995,https://letterboxd.com/me/film/heat/,4,,,2024-03-01\n"
+            "2024-01-02,Heat,1995,https://letterboxd.com/me/film/heat/1/,3,,,2024-01-01\n"
+            "2024-01-05,Alien,1979,https://letterboxd.com/me/film/alien/,,,,2024-01-04\n",
+        )
+    monkeypatch.setattr(data_export, "EXPORT_BATCH_ROWS", 1)
+
+    result = import_export("me", export, cfg, resolve=False)
+
+    assert result.films == 2 and result.rated == 1
+    with repo.connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT f.letterboxd_id, i.rating, i.watch_date
+            FROM interactions i JOIN films f ON f.id = i.film_id
+            """
+        ).fetchall()
+    by_slug = {row["letterboxd_id"]: row for row in rows}
+    assert by_slug["heat"]["watch_date"] == "2024-03-01"
+    assert by_slug["heat"]["rating"] == 3.0
+    assert by_slug["alien"]["watch_date"] == "2024-01-04"
+
+
+def test_import_export_resolves_and_merges(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    cfg = SimpleNamespace(database_path=db_path)
+    export = tmp_path / "export.zip"
+    _write_export(export)
+
+    with repo.connect(db_path) as conn:
+        user_id = repo.ensure_user(conn, "me")
+        alien = FilmItem("alien", "Alien", 1979, 5.0, False, True, "2020-05-05", False)
+        repo.upsert_interactions(conn, user_id, [alien])
+
+    redirects = {"https://boxd.it/29Qa": "https://letterboxd.com/film/paris-texas/"}
+    calls = []
+
+    def resolve_redirect(uri):
+        calls.append(uri)
+        if uri not in redirects:
+            raise RuntimeError("not found")
+        return redirects[uri]
+
+    client = SimpleNamespace(resolve_redirect=resolve_redirect)
+    result = import_export("me", export, cfg, client=client)
+
+    assert result.films == 3
+    assert result.unresolved == ["Obscure Film (2001)"]
+    # Heat comes from the diary URI, Alien from the existing title/year match.
+    assert sorted(calls) == ["https://boxd.it/29Qa", "https://boxd.it/zzzz"]
+
+    with repo.connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT f.letterboxd_id, i.rating, i.liked, i.watched, i.watchlist, i.watch_date
+            FROM interactions i JOIN films f ON f.id = i.film_id
+            ORDER BY f.letterboxd_id
+            """
+        ).fetchall()
+        cached = repo.select_uri_slugs(conn)
+    by_slug = {row["letterboxd_id"]: row for row in rows}
+    assert set(by_slug) == {"alien", "heat", "paris-texas"}
+    assert by_slug["alien"]["rating"] == 5.0
+    assert by_slug["alien"]["watch_date"] == "2020-05-05"
+    assert by_slug["alien"]["liked"] == 1
+    assert by_slug["heat"]["rating"] == 4.5
+    assert by_slug["paris-texas"]["watchlist"] == 1
+    assert cached["https://boxd.it/2aHi"] == "heat"
+
+    calls.clear()
+    again = import_export("me", export, cfg, client=client)
+    assert again.films == 3
+    assert calls == ["https://boxd.it/zzzz"]
+    with repo.connect(db_path) as conn:
+        assert repo.count_user_interactions(conn, user_id) == 3
@@ -92,7 +92,7 @@ def test_export_html_includes_movement_from_previous_publish(
     )
     monkeypatch.setattr(
         cli.repo,
-        "connect",
+        "snapshot",
         lambda path: _FakeConn(),
     )
     monkeypatch.setattr(
@@ -146,7 +146,7 @@ def test_export_html_preserves_raw_scores_in_payload(tmp_path, monkeypatch) -> N
     monkeypatch.setattr(cli, "_base_recommendations", lambda *args, **kwargs: results)
     monkeypatch.setattr(
         cli.repo,
-        "connect",
+        "snapshot",
         lambda path: _FakeConn(),
     )
     monkeypatch.setattr(
@@ -237,6 +237,7 @@ def test_weekly_exports_top_5000_movies(monkeypatch) -> None:
     monkeypatch.setattr(cli, "_refresh_similar_users", lambda *args, **kwargs: (0, 0))
     monkeypatch.setattr(cli, "_refresh_similarity_pool", lambda *args, **kwargs: [])
     monkeypatch.setattr(cli, "_update_top_availability", lambda *args, **kwargs: (0, 0))
+    monkeypatch.setattr(cli, "_prune_change_log", lambda cfg: 0)
 
     def _fake_export_html(username, limit, out, similar_user_limit=100):
         called["limit"] = limit
@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+from letterboxd_recs.config import ScrapeConfig
+from letterboxd_recs.db import repo
+from letterboxd_recs.ingest.letterboxd import ingest
+from letterboxd_recs.ingest.letterboxd.client import FetchError, LetterboxdClient
+from letterboxd_recs.ingest.letterboxd.ingest import IngestResult
+from letterboxd_recs.ingest.letterboxd.orchestrator import ingest_users
+from letterboxd_recs.ingest.letterboxd.outcomes import MAX_BACKOFF_HOURS, backoff_hours
+
+
+def test_backoff_doubles_and_caps() -> None:
+    assert backoff_hours("empty", 1) == 7 * 24.0
+    assert backoff_hours("not_found", 2) == 14 * 24.0
+    assert backoff_hours("not_found", 20) == MAX_BACKOFF_HOURS
+    assert backoff_hours("private", 1) == 7 * 24.0
+    # Challenges only back off once they repeat.
+    assert backoff_hours("challenge", 2) is None
+    assert backoff_hours("challenge", 3) == 24.0
+    assert backoff_hours("challenge", 4) == 48.0
+    assert backoff_hours("error", 3) is None
+
+
+def test_client_fails_fast_on_not_found(tmp_path, monkeypatch) -> None:
+    scrape = ScrapeConfig(rate_limit_seconds=0, max_retries=3, cache_ttl_days=30, use_browser=False)
+    client = LetterboxdClient("letterboxd-recs/0.1", scrape, tmp_path)
+    calls = []
+
+    class NotFound:
+        status_code = 404
+
+        def raise_for_status(self) -> None:
+            raise requests.HTTPError("404", response=self)
+
+    def fake_get(*_args, **_kwargs):
+        calls.append(1)
+        return NotFound()
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    with pytest.raises(FetchError) as info:
+        client.fetch_html("https://letterboxd.com/gone/", cache_key="profile_gone", refresh=True)
+    assert info.value.status == 404
+    assert info.value.reason == "not_found"
+    assert len(calls) == 1
+
+
+def test_failed_users_are_deferred_until_backoff_expires(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+
+    def fake_fetch(_client, url, cache_key, refresh):
+        raise FetchError(f"Failed to fetch {url}: HTTP 404", 404, "not_found")
+
+    monkeypatch.setattr(ingest, "_fetch_page", fake_fetch)
+
+    first = ingest_users(["gone"], cfg, refresh=True)
+    assert first.failed == 1
+    with repo.connect(cfg.database_path) as conn:
+        row = conn.execute("SELECT * FROM fetch_outcomes WHERE username = 'gone'").fetchone()
+        assert (row["status"], row["reason"], row["consecutive_failures"]) == (404, "not_found", 1)
+        assert repo.select_backed_off_usernames(conn) == {"gone"}
+
+    calls = []
+
+    def fake_ingest(username, cfg, writer, refresh, limiter):
+        calls.append(username)
+        return IngestResult(username=username, films_seen=0, likes=0, watchlist=0)
+
+    second = ingest_users(["gone", "active"], cfg, ingest=fake_ingest, refresh=True)
+    assert calls == ["active"]
+    assert second.deferred == ["gone"]
+
+    with repo.connect(cfg.database_path) as conn:
+        conn.execute("UPDATE fetch_outcomes SET next_eligible_at = datetime('now', '-1 hour')")
+        conn.commit()
+    third = ingest_users(["gone"], cfg, refresh=True)
+    assert third.failed == 1
+    with repo.connect(cfg.database_path) as conn:
+        assert repo.select_consecutive_failures(conn, "gone") == 2
+
+
+def test_repeated_challenges_back_off_and_errors_never_do(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+
+    def failing(_client, url, cache_key, refresh):
+        if "alice" in url:
+            raise FetchError("Blocked by Cloudflare challenge on profile page.", reason="challenge")
+        raise RuntimeError(f"Failed to fetch {url}: connection reset")
+
+    monkeypatch.setattr(ingest, "_fetch_page", failing)
+    for _ in range(2):
+        assert ingest_users(["alice", "bob"], cfg, refresh=True).failed == 2
+    with repo.connect(cfg.database_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT username, reason, consecutive_failures, next_eligible_at
+            FROM fetch_outcomes ORDER BY username
+            """
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [("alice", "challenge", 2, None), ("bob", "error", 0, None)]
+        assert repo.select_backed_off_usernames(conn) == set()
+
+    ingest_users(["alice", "bob"], cfg, refresh=True)
+    with repo.connect(cfg.database_path) as conn:
+        assert repo.select_backed_off_usernames(conn) == {"alice"}
+
+
+def test_private_profiles_back_off(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+    monkeypatch.setattr(
+        ingest, "_fetch_page", lambda _client, url, cache_key, refresh: "<p>This profile is private</p>"
+    )
+    assert ingest_users(["hidden"], cfg, refresh=True).failed == 1
+    with repo.connect(cfg.database_path) as conn:
+        row = conn.execute("SELECT reason FROM fetch_outcomes WHERE username = 'hidden'").fetchone()
+        assert row["reason"] == "private"
+        assert repo.select_backed_off_usernames(conn) == {"hidden"}
@@ -0,0 +1,262 @@
+from functools import partial
+import threading
+from pathlib import Path
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.graph import ingest as graph_ingest
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem, Profile
+from letterboxd_recs.ingest.letterboxd.social import FolloweeSummary
+from letterboxd_recs.util.budget import RequestBudget
+from letterboxd_recs.util.ratelimit import RateLimiter
+
+GRAPH = {
+    "root": ["a", "b", "c"],
+    "a": ["d"],
+    "b": ["d", "e"],
+    "c": [],
+}
+
+
+def test_rate_limiter_spaces_requests_across_threads() -> None:
+    limiter = RateLimiter(0.05)
+    started: list[float] = []
+    lock = threading.Lock()
+
+    def request() -> None:
+        limiter.wait()
+        with lock:
+            started.append(time.monotonic())
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    started.sort()
+    gaps = [later - earlier for earlier, later in zip(started, started[1:])]
+    assert min(gaps) >= 0.04
+
+
+def test_frontier_is_fetched_concurrently(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg(workers=3)
+    # Every depth-1 fetch waits for the other two, so a serial crawl would time out.
+    level_one = threading.Barrier(3, timeout=5)
+    ingested: list[str] = []
+
+    def fake_collect(username, client, refresh):
+        if username in ("a", "b", "c"):
+            level_one.wait()
+        return graph_ingest.FollowingList([FolloweeSummary(name, None, 500, 10, 500) for name in GRAPH[username]])
+
+    def fake_ingest(username, cfg, refresh, writer, budget, limiter):
+        ingested.append(username)
+
+    monkeypatch.setattr(graph_ingest, "_collect_followees", fake_collect)
+    monkeypatch.setattr(graph_ingest, "ingest_user", fake_ingest)
+
+    result = graph_ingest.ingest_follow_graph("root", cfg)
+    assert result.complete is True
+    assert result.nodes == 6
+    assert result.edges == 6
+    assert sorted(ingested) == ["a", "b", "c", "d", "e"]
+    with repo.connect(cfg.database_path) as conn:
+        depths = conn.execute(
+            """
+            SELECT u.username, MIN(g.depth)
+            FROM graph_edges g JOIN users u ON u.id = g.dst_user_id
+            GROUP BY u.username
+            """
+        ).fetchall()
+    assert dict((row[0], row[1]) for row in depths) == {"a": 1, "b": 1, "c": 1, "d": 2, "e": 2}
+
+
+def test_bulk_followee_writes_merge_stats_and_keep_min_depth(scrape_cfg) -> None:
+    cfg = scrape_cfg()
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        graph_ingest._write_edges(conn, "root", [FolloweeSummary("a", "A", 500, 10, 500)], 2, 1)
+        graph_ingest._write_edges(
+            conn,
+            "root",
+            [FolloweeSummary("a", None, 600, None, 500), FolloweeSummary("b", None, 100, 5, 200)],
+            1,
+            2,
+        )
+        conn.commit()
+        row = conn.execute(
+            "SELECT display_name, follower_count, following_count FROM users WHERE username = 'a'"
+        ).fetchone()
+        assert tuple(row) == ("A", 600, 10)
+        depths = conn.execute("SELECT depth FROM graph_edges ORDER BY dst_user_id").fetchall()
+    assert [row[0] for row in depths] == [1, 1]
+
+
+def test_best_first_spends_budget_on_similar_branch(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+    ensure_db(cfg.database_path)
+    graph = {"root": ["a", "b"], "a": ["a1", "a2"], "b": ["b1", "b2"]}
+    films = {"root": "f", "a": "f", "a1": "f", "a2": "f", "b": "g", "b1": "g", "b2": "g"}
+
+    def items(prefix):
+        return [FilmItem(f"{prefix}{n}", None, None, None, False, True, None, False) for n in range(10)]
+
+    with repo.connect(cfg.database_path) as conn:
+        repo.upsert_interactions(conn, repo.ensure_user(conn, "root"), items("f"))
+        conn.commit()
+    ingested: list[str] = []
+
+    def fake_collect(username, client, refresh):
+        client.charge()
+        return graph_ingest.FollowingList(
+            [FolloweeSummary(name, None, 500, 10, 500) for name in graph.get(username, [])]
+        )
+
+    def fake_ingest(username, cfg, refresh, writer, budget, limiter):
+        budget.charge()
+        ingested.append(username)
+        writer.call(
+            lambda conn: repo.upsert_interactions(conn, repo.ensure_user(conn, username), items(films[username]))
+        )
+
+    monkeypatch.setattr(graph_ingest, "_collect_followees", fake_collect)
+    monkeypatch.setattr(graph_ingest, "ingest_user", fake_ingest)
+
+    result = graph_ingest.ingest_follow_graph_best_first("root", cfg, budget=RequestBudget(5))
+    assert result.complete is False
+    # b ties with a as a root followee, but once a measures as similar its followees jump ahead.
+    assert ingested == ["a", "a1", "a2"]
+
+
+def test_best_first_leaves_failed_ingests_eligible(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+    attempts: list[str] = []
+
+    def fake_ingest(username, cfg, refresh, writer, budget, limiter):
+        attempts.append(username)
+        if len(attempts) == 1:
+            raise RuntimeError("Blocked by Cloudflare challenge")
+
+    monkeypatch.setattr(graph_ingest, "ingest_user", fake_ingest)
+    expand = partial(
+        graph_ingest._expand_user,
+        "a",
+        cfg,
+        None,
+        False,
+        fetch_following=False,
+        budget=None,
+        limiter=RateLimiter(0),
+        writer=None,
+    )
+    assert expand(ingest=True) == (False, None)
+    assert expand(ingest=True) == (True, None)
+    # Skipped (e.g. backed off): nothing was ingested.
+    assert expand(ingest=False) == (False, None)
+    assert attempts == ["a", "a"]
+
+
+def test_graph_refresh_recrawls_changed_counts_and_tombstones(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg(workers=2)
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        graph_ingest._write_edges(conn, "root", [FolloweeSummary("a", None, 500, 1, 500)], 1, 1)
+        graph_ingest._write_edges(conn, "a", [FolloweeSummary("c", None, 500, 0, 500)], 2, 1)
+        conn.commit()
+
+    following = {"root": 1, "a": 2, "c": 0}
+    crawled: list[str] = []
+
+    def fake_fetch(client, url, cache_key, refresh):
+        client.charge()
+        return ""
+
+    def fake_collect(username, client, refresh):
+        client.charge()
+        crawled.append(username)
+        # One of a's two followees is hidden from the list.
+        return graph_ingest.FollowingList([FolloweeSummary("d", None, 500, 0, 500)], 2)
+
+    monkeypatch.setattr(graph_ingest, "_fetch_following_page", fake_fetch)
+    monkeypatch.setattr(
+        graph_ingest,
+        "parse_profile",
+        lambda username, html: Profile(username, None, following_count=following[username]),
+    )
+    monkeypatch.setattr(graph_ingest, "_collect_followees", fake_collect)
+
+    budget = RequestBudget()
+    result = graph_ingest.refresh_follow_graph(cfg, budget=budget)
+    assert (result.checked, result.changed, result.added, result.removed) == (2, 1, 1, 1)
+    assert crawled == ["a"]
+    assert budget.spent == 3  # one profile per tracked source plus a's list
+    # The profile count is stored, so the shorter list doesn't trigger another crawl.
+    assert graph_ingest.refresh_follow_graph(cfg).changed == 0
+    assert crawled == ["a"]
+    with repo.connect(cfg.database_path) as conn:
+        assert repo.select_follow_adjacency(conn) == {"a": ["d"], "root": ["a"]}
+        removed = conn.execute("SELECT COUNT(*) FROM graph_edges WHERE removed_at IS NOT NULL").fetchone()[0]
+        assert removed == 1
+        # Re-following revives the tombstoned edge.
+        graph_ingest._write_edges(conn, "a", [FolloweeSummary("c", None, 500, 0, 500)], 2, 1)
+        assert repo.select_follow_adjacency(conn)["a"] == ["c"]
+
+
+def test_write_edges_keeps_followees_that_drop_below_filters(scrape_cfg) -> None:
+    cfg = scrape_cfg()
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        graph_ingest._write_edges(
+            conn,
+            "root",
+            [FolloweeSummary("a", None, 500, 0, 500), FolloweeSummary("b", None, 500, 0, 500)],
+            1,
+            2,
+        )
+        added, removed = graph_ingest._write_edges(
+            conn,
+            "root",
+            [FolloweeSummary("a", None, 500, 0, 500), FolloweeSummary("b", None, 99, 0, 500)],
+            1,
+            2,
+        )
+        assert (added, removed) == (0, 0)
+        assert repo.select_follow_adjacency(conn) == {"root": ["a", "b"]}
+        # Unfollowing is still a removal.
+        added, removed = graph_ingest._write_edges(conn, "root", [FolloweeSummary("a", None, 500, 0, 500)], 1, 1)
+        assert (added, removed) == (0, 1)
+        assert repo.select_follow_adjacency(conn) == {"root": ["a"]}
+
+
+def test_following_page_still_challenged_after_browser_raises(scrape_cfg, tmp_path, monkeypatch) -> None:
+    from letterboxd_recs.ingest.letterboxd import browser
+    from letterboxd_recs.ingest.letterboxd.client import FetchError, LetterboxdClient
+
+    cfg = scrape_cfg(use_browser=True)
+    client = LetterboxdClient("test", cfg.scrape, tmp_path / "cache", limiter=RateLimiter(0))
+    challenge = SimpleNamespace(content="<title>Just a moment...</title>")
+    monkeypatch.setattr(browser, "fetch_html", lambda url, user_agent: challenge)
+
+    with pytest.raises(FetchError) as raised:
+        graph_ingest._collect_followees("a", client, refresh=True)
+    assert raised.value.reason == "challenge"
+    assert not list((tmp_path / "cache").glob("*.html"))
+
+
+def test_harvest_following_reads_pages_cached_by_any_crawl(scrape_cfg, tmp_path) -> None:
+    cfg = scrape_cfg()
+    html = (Path(__file__).parent / "fixtures" / "following_rows.html").read_text(encoding="utf-8")
+    for root, page in (("root", ""), ("other-root", "page_2_")):
+        path = tmp_path / "cache" / "letterboxd" / root / f"letterboxd.com_alice_following_{page}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+
+    entries = graph_ingest.harvest_following("alice", cfg, fetch=False)
+    # Both copies are read and the duplicate followees collapse.
+    assert len(entries) == 2
+    assert entries[0].username == "forssam"
+    assert graph_ingest.harvest_following("bob", cfg, fetch=False) == []
@@ -0,0 +1,43 @@
+import pytest
+
+from letterboxd_recs.config import GraphConfig
+from letterboxd_recs.graph.csr import (
+    FollowGraph,
+    decay_influence,
+    influence_weights,
+    personalized_pagerank,
+)
+
+# 1 follows 2 and 3; both follow 4; 3 also follows 5; 6 is unreachable.
+EDGES = [(1, 2), (1, 3), (2, 4), (3, 4), (3, 5), (6, 1)]
+
+
+def test_csr_layout() -> None:
+    graph = FollowGraph.from_edges(EDGES)
+    assert len(graph) == 6
+    assert graph.edge_count == 6
+    followees = {graph.user_ids[n] for n in graph.followees(graph.nodes[1])}
+    assert followees == {2, 3}
+    assert list(graph.followees(graph.nodes[4])) == []
+
+
+def test_decay_influence_counts_paths() -> None:
+    graph = FollowGraph.from_edges(EDGES)
+    influence = decay_influence(graph, 1, decay=0.5, max_hops=2)
+    assert influence[2] == pytest.approx(0.5)
+    # Two followees lead to 4, one to 5.
+    assert influence[4] == pytest.approx(0.5)
+    assert influence[5] == pytest.approx(0.25)
+    assert 1 not in influence and 6 not in influence
+
+
+def test_personalized_pagerank_prefers_shared_followees() -> None:
+    graph = FollowGraph.from_edges(EDGES)
+    rank = personalized_pagerank(graph, 1, damping=0.5)
+    assert rank[4] > rank[5] > 0
+    assert 6 not in rank
+
+    weights = influence_weights(graph, 1, GraphConfig(max_depth=2, decay=0.5, influence="ppr"))
+    assert max(weights.values()) == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        influence_weights(graph, 1, GraphConfig(max_depth=2, decay=0.5, influence="katz"))
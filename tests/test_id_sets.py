@@ -0,0 +1,55 @@
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+
+IDS = 100_000
+
+
+def test_id_set_queries_accept_100k_ids(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO films (id, letterboxd_id, title) VALUES (?, ?, ?)",
+            [(n, f"f{n}", f"F{n}") for n in range(1, 11)],
+        )
+        for film_id in (2, 4):
+            repo.upsert_film_availability_flags(conn, film_id, "CA", {"netflix": True})
+        repo.ensure_user(conn, "root")
+        alice = repo.ensure_user(conn, "alice")
+        conn.execute(
+            "INSERT INTO interactions (user_id, film_id, rating_half, flags) VALUES (?, 3, 8, ?)",
+            (alice, repo.WATCHED),
+        )
+
+        # Far past SQLite's bound-variable limit, with duplicates and unknown ids.
+        film_ids = list(range(IDS, 0, -1)) + [2, 2]
+        user_ids = list(range(alice, alice + IDS)) + [alice]
+        slugs = repo.select_film_slugs(conn, film_ids)
+        assert slugs == {n: f"f{n}" for n in range(1, 11)}
+        assert repo.select_available_film_ids(conn, film_ids, "netflix", "CA") == {2, 4}
+        assert set(repo.select_availability_map(conn, film_ids, ["netflix"])) == {2, 4}
+        assert repo.select_user_names(conn, user_ids) == {alice: ("alice", None)}
+        assert repo.select_followee_watched_counts(conn, user_ids) == {alice: 1}
+
+        # Each call replaces the set, so a smaller one doesn't see the old ids.
+        assert repo.select_film_slugs(conn, [7]) == {7: "f7"}
+        rows = repo.select_social_rows(conn, "root", user_ids)
+        assert [row["film_id"] for row in rows] == [3]
+        assert repo.select_social_rows(conn, "root", [alice + 1]) == []
+
+
+def test_id_sets_leave_no_transaction_open(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        conn.execute("INSERT INTO films (id, letterboxd_id, title) VALUES (1, 'f1', 'F1')")
+        conn.commit()
+        assert repo.select_film_slugs(conn, [1]) == {1: "f1"}
+        assert not conn.in_transaction
+
+        # A caller's own open transaction is left for the caller to commit.
+        repo.ensure_user(conn, "alice")
+        repo.select_film_slugs(conn, [1])
+        assert conn.in_transaction
+        conn.rollback()
+        assert repo.select_user_id(conn, "alice") is None
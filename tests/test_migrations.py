@@ -0,0 +1,70 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from letterboxd_recs.db import conn as db_conn
+from letterboxd_recs.db.conn import SCHEMA_VERSION, ensure_db
+
+
+def _version(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_up_to_date_database_skips_migrations(tmp_path, monkeypatch) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    assert _version(db_path) == SCHEMA_VERSION
+
+    def fail(conn):
+        raise AssertionError("migration ran on an up-to-date database")
+
+    monkeypatch.setattr(db_conn, "MIGRATIONS", (fail,) * SCHEMA_VERSION)
+    ensure_db(db_path)
+
+
+def test_unversioned_database_is_upgraded(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL)")
+        conn.execute("INSERT INTO users (username) VALUES ('alice')")
+
+    ensure_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        assert {"watched_count", "refresh_signature", "crawled_following_count"} <= columns
+        assert conn.execute("SELECT username FROM users").fetchall() == [("alice",)]
+    assert _version(db_path) == SCHEMA_VERSION
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise sqlite3.OperationalError("boom")
+
+    monkeypatch.setattr(db_conn, "MIGRATIONS", (*db_conn.MIGRATIONS, broken))
+    monkeypatch.setattr(db_conn, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+    with pytest.raises(sqlite3.OperationalError):
+        ensure_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    assert _version(db_path) == 0
+
+
+def test_concurrent_startups_migrate_once(tmp_path, monkeypatch) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    runs: list[int] = []
+    baseline = db_conn.MIGRATIONS[0]
+
+    def counting(conn):
+        runs.append(1)
+        baseline(conn)
+
+    monkeypatch.setattr(db_conn, "MIGRATIONS", (counting, *db_conn.MIGRATIONS[1:]))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: ensure_db(db_path), range(8)))
+    assert runs == [1]
+    assert _version(db_path) == SCHEMA_VERSION
@@ -0,0 +1,68 @@
+import pytest
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.writer import DbWriter
+from letterboxd_recs.ingest.letterboxd.ingest import IngestResult
+from letterboxd_recs.ingest.letterboxd.orchestrator import format_eta, ingest_users
+
+
+def test_db_writer_commits_jobs_and_isolates_failures(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+
+    def failing(conn):
+        repo.ensure_user(conn, "rolled-back")
+        raise ValueError("boom")
+
+    with DbWriter(db_path, batch_size=10) as writer:
+        first = writer.submit(lambda conn: repo.ensure_user(conn, "alice"))
+        bad = writer.submit(failing)
+        second = writer.submit(lambda conn: repo.ensure_user(conn, "bob"))
+        assert first.result() > 0
+        assert second.result() > 0
+        with pytest.raises(ValueError):
+            bad.result()
+
+    with repo.connect(db_path) as conn:
+        assert repo.select_all_usernames(conn) == ["alice", "bob"]
+
+
+def test_ingest_users_runs_concurrently_and_reports_progress(scrape_cfg) -> None:
+    cfg = scrape_cfg(workers=3)
+    db_path = cfg.database_path
+    calls = []
+    limiters = set()
+
+    def fake_ingest(username, cfg, writer, refresh, limiter):
+        calls.append((username, refresh))
+        limiters.add(id(limiter))
+        if username == "broken":
+            raise RuntimeError("blocked")
+        writer.call(lambda conn: repo.ensure_user(conn, username))
+        return IngestResult(username=username, films_seen=1, likes=0, watchlist=0)
+
+    updates = []
+    result = ingest_users(
+        ["a", "broken", "b", "c", "a"],
+        cfg,
+        on_progress=updates.append,
+        ingest=fake_ingest,
+        refresh=True,
+    )
+
+    assert result.ok == 3
+    assert result.failed == 1
+    assert result.errors == {"broken": "blocked"}
+    assert sorted(name for name, _ in calls) == ["a", "b", "broken", "c"]
+    assert len(limiters) == 1
+    assert [u.done for u in updates] == [1, 2, 3, 4]
+    assert updates[-1].eta_seconds == 0
+    with repo.connect(db_path) as conn:
+        assert repo.select_all_usernames(conn) == ["a", "b", "c"]
+
+
+def test_format_eta() -> None:
+    assert format_eta(None) == "--:--"
+    assert format_eta(65) == "01:05"
+    assert format_eta(3725) == "1:02:05"
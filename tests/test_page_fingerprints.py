@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.ingest.letterboxd import ingest
+from letterboxd_recs.ingest.letterboxd.parse import page_fingerprint
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PROFILE_HTML = (FIXTURES / "profile.html").read_text(encoding="utf-8")
+
+
+def test_page_fingerprint_ignores_volatile_markup() -> None:
+    html = (FIXTURES / "films.html").read_text(encoding="utf-8")
+    rotated = html.replace("6ac2c855d0d32dba2fec", "ffffffffffffffffffff")
+    rotated = rotated.replace("</body>", "<!-- rendered in 12ms -->\n</body>")
+
+    assert page_fingerprint(rotated) == page_fingerprint(html)
+    assert page_fingerprint(html.replace("the-holdovers", "the-holdovers-2")) != page_fingerprint(html)
+
+
+def test_unchanged_pages_are_not_reparsed(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg(max_pages=10)
+    diary = "https://letterboxd.com/spazznolo/films/diary/"
+    pages = {
+        diary: '<p>one</p><a class="next" href="/spazznolo/films/diary/page/2/">Older</a>',
+        f"{diary}page/2/": '<p>two</p><a class="next" href="/spazznolo/films/diary/page/3/">Older</a>',
+        f"{diary}page/3/": "<p>three</p>",
+    }
+    fetched: list[str] = []
+    parsed: list[str] = []
+
+    def fake_fetch(_client, url, cache_key, refresh):
+        if url.endswith("/spazznolo/"):
+            return PROFILE_HTML
+        fetched.append(url)
+        return pages[url]
+
+    def fake_parse(html):
+        parsed.append(html)
+        return []
+
+    monkeypatch.setattr(ingest, "_fetch_page", fake_fetch)
+    monkeypatch.setattr(ingest, "parse_diary", fake_parse)
+    monkeypatch.setattr(ingest, "sleep_seconds", lambda *_: None)
+    kwargs = dict(include_films=False, include_likes=False, include_watchlist=False)
+
+    first = ingest.ingest_user("spazznolo", cfg, **kwargs)
+    assert len(fetched) == 3 and len(parsed) == 3
+    assert first.pages_unchanged == 0
+
+    fetched.clear()
+    parsed.clear()
+    second = ingest.ingest_user("spazznolo", cfg, **kwargs)
+    assert fetched == [diary]
+    assert parsed == []
+    assert second.pages_unchanged == 1
+
+    fetched.clear()
+    pages[diary] = pages[diary].replace("one", "new entry")
+    ingest.ingest_user("spazznolo", cfg, **kwargs)
+    assert fetched == [diary, f"{diary}page/2/"]
+    assert parsed == [pages[diary]]
+
+    with repo.connect(cfg.database_path) as conn:
+        assert set(repo.select_page_fingerprints(conn, "spazznolo")) == set(pages)
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.db.pair_stats import PAIR_COLUMNS, pair_deltas
+
+FILMS = 30
+
+
+def _expected(conn, root_id: int) -> list[tuple]:
+    sums = ", ".join(f"SUM({expr})" for expr in pair_deltas("i1.rating", "i2.rating"))
+    rows = conn.execute(
+        f"""
+        SELECT i2.user_id, {sums}
+        FROM interactions i1
+        JOIN interactions i2 ON i1.film_id = i2.film_id
+        WHERE i1.user_id = ? AND i2.user_id != ? AND i1.watched = 1 AND i2.watched = 1
+        GROUP BY i2.user_id
+        ORDER BY i2.user_id
+        """,
+        (root_id, root_id),
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _stored(conn, root_id: int) -> list[tuple]:
+    rows = conn.execute(
+        f"""
+        SELECT other_id, {", ".join(PAIR_COLUMNS)}
+        FROM user_pair_stats
+        WHERE root_id = ? AND overlap > 0
+        ORDER BY other_id
+        """,
+        (root_id,),
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _random_row(rng, user_id: int, film_id: int) -> tuple:
+    rating = rng.choice([None, 1.0, 2.5, 3.5, 5.0])
+    flags = repo.pack_flags(False, rng.random() < 0.8, rng.random() < 0.2)
+    return (user_id, film_id, repo.pack_rating(rating), flags)
+
+
+def test_pair_stats_follow_interaction_changes(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    rng = random.Random(7)
+    with repo.connect(db_path) as conn:
+        users = [repo.ensure_user(conn, f"u{n}") for n in range(6)]
+        for n in range(FILMS):
+            conn.execute("INSERT INTO films (letterboxd_id, title) VALUES (?, ?)", (f"f{n}", f"F{n}"))
+        upsert = """
+            INSERT INTO interactions (user_id, film_id, rating_half, flags)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, film_id) DO UPDATE SET
+                rating_half = excluded.rating_half,
+                flags = excluded.flags
+        """
+        conn.executemany(
+            upsert,
+            [_random_row(rng, user, film) for user in users for film in range(1, 16)],
+        )
+        # Both roots are built from existing rows; every later change goes through the triggers.
+        repo.ensure_similarity_root(conn, "u0")
+        repo.ensure_similarity_root(conn, "u1")
+        assert _stored(conn, users[0]) == _expected(conn, users[0])
+
+        for _ in range(200):
+            user = rng.choice(users)
+            film = rng.randint(1, FILMS)
+            if rng.random() < 0.25:
+                conn.execute(
+                    "DELETE FROM interactions WHERE user_id = ? AND film_id = ?", (user, film)
+                )
+            else:
+                conn.execute(upsert, _random_row(rng, user, film))
+
+        for root in users[:2]:
+            assert _stored(conn, root) == [
+                pytest.approx(row) for row in _expected(conn, root)
+            ]
+        assert conn.execute(
+            "SELECT COUNT(*) FROM user_pair_stats WHERE root_id NOT IN (?, ?)", users[:2]
+        ).fetchone()[0] == 0
+
+        rows = repo.select_similarity_rows(conn, "u0")
+        expected = _expected(conn, users[0])
+        assert [row["followee_id"] for row in rows] == [row[0] for row in expected]
+        for row, exp in zip(rows, expected):
+            assert row["overlap"] == exp[1]
+            assert row["avg_diff"] == (pytest.approx(exp[3] / exp[2]) if exp[2] else None)
+
+        repo.delete_user_data(conn, users[1])
+        assert conn.execute(
+            "SELECT COUNT(*) FROM user_pair_stats WHERE root_id = ? OR other_id = ?",
+            (users[1], users[1]),
+        ).fetchone()[0] == 0
+        assert _stored(conn, users[0]) == [pytest.approx(row) for row in _expected(conn, users[0])]
@@ -7,6 +7,7 @@ from letterboxd_recs.availability import (
 )
 from letterboxd_recs.ingest.letterboxd.parse import (
     is_challenge_page,
+    is_private_profile,
     parse_diary,
     parse_film_page,
     parse_films_list,
@@ -30,6 +31,7 @@ def test_profile_parsing() -> None:
     assert profile.username == "spazznolo"
     assert profile.display_name
     assert not is_challenge_page(html)
+    assert not is_private_profile(html)
 
 
 def test_pages_not_challenge() -> None:
@@ -119,3 +121,15 @@ def test_csi_availability_url_and_source_provider_mapping() -> None:
     assert flags["netflix"] is True
     assert flags["prime_video"] is True
     assert has_stream is True
+
+
+def test_profile_parses_stats_and_latest_diary_entry() -> None:
+    profile = parse_profile("spazznolo", load("profile.html"))
+    assert profile.films_count == 367
+    assert profile.films_this_year == 6
+    assert profile.lists_count == 3
+    assert profile.following_count == 44
+    assert profile.followers_count == 18
+    assert profile.watchlist_count == 415
+    assert profile.latest_diary_entry == "/spazznolo/film/the-holdovers/2/"
+    assert profile.signature == "367|415|/spazznolo/film/the-holdovers/2/"
@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+from pathlib import Path
+import time
+
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem, parse_films_list
+from letterboxd_recs.ingest.letterboxd.pipeline import (
+    PagePipeline,
+    parse_pool,
+    shutdown_parse_pools,
+)
+
+FILMS_HTML = (Path(__file__).parent / "fixtures" / "films.html").read_text(encoding="utf-8")
+
+
+def _item(slug: str) -> FilmItem:
+    return FilmItem(slug, None, None, None, False, True, None, False)
+
+
+def _done(value=None) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def test_pipeline_persists_pages_in_order_with_bounded_backlog() -> None:
+    persisted: list[list[str]] = []
+    in_flight = []
+
+    def slow_parser(html: str) -> list[FilmItem]:
+        time.sleep(0.01)
+        return [_item(html)]
+
+    def persist(items):
+        persisted.append([item.slug for item in items])
+        return _done()
+
+    with PagePipeline(persist, max_pending=2) as pipeline:
+        for page in ("p1", "p2", "p3", "p4", "p5"):
+            pipeline.submit(slow_parser, page)
+            in_flight.append(len(pipeline._parsing))
+        pipeline.add([_item("rss")])
+        items = pipeline.finish()
+
+    assert max(in_flight) <= 2
+    assert persisted == [["p1"], ["p2"], ["p3"], ["p4"], ["p5"], ["rss"]]
+    assert [item.slug for item in items] == ["p1", "p2", "p3", "p4", "p5", "rss"]
+
+
+def test_pipeline_process_pool_matches_inline_parse() -> None:
+    with PagePipeline(lambda _items: _done(), processes=1) as pipeline:
+        pipeline.submit(parse_films_list, FILMS_HTML)
+        items = pipeline.finish()
+
+    assert items == parse_films_list(FILMS_HTML)
+
+
+def test_parse_pools_are_shut_down() -> None:
+    pool = parse_pool(1)
+    assert parse_pool(1) is pool
+    assert pool.submit(len, "abc").result() == 3
+    shutdown_parse_pools()
+    assert parse_pool(1) is not pool
+    shutdown_parse_pools()
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd import ingest
+
+PROFILE_HTML = (Path(__file__).parent / "fixtures" / "profile.html").read_text(encoding="utf-8")
+
+
+def test_refresh_skips_list_pages_when_profile_unchanged(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+    list_pages: list[str] = []
+
+    def fake_fetch(_client, url, cache_key, refresh):
+        if url.endswith("/spazznolo/"):
+            return PROFILE_HTML
+        list_pages.append(url)
+        return "<html></html>"
+
+    monkeypatch.setattr(ingest, "_fetch_page", fake_fetch)
+    monkeypatch.setattr(ingest, "sleep_seconds", lambda *_: None)
+
+    first = ingest.ingest_user("spazznolo", cfg, refresh=True, include_diary=False, include_likes=False)
+    assert first.skipped is False
+    assert len(list_pages) == 2
+
+    second = ingest.ingest_user("spazznolo", cfg, refresh=True, include_diary=False, include_likes=False)
+    assert second.skipped is True
+    assert len(list_pages) == 2
+
+    with repo.connect(cfg.database_path) as conn:
+        row = conn.execute(
+            "SELECT watched_count, watchlist_count, latest_diary_entry FROM users WHERE username = ?",
+            ("spazznolo",),
+        ).fetchone()
+        conn.execute("UPDATE users SET refresh_signature = 'stale' WHERE username = 'spazznolo'")
+        conn.commit()
+    assert tuple(row) == (367, 415, "/spazznolo/film/the-holdovers/2/")
+
+    third = ingest.ingest_user("spazznolo", cfg, refresh=True, include_diary=False, include_likes=False)
+    assert third.skipped is False
+    assert len(list_pages) == 4
+
+
+def test_full_ingest_never_skips(scrape_cfg, monkeypatch) -> None:
+    cfg = scrape_cfg()
+    ensure_db(cfg.database_path)
+    pages: list[str] = []
+
+    def fake_fetch(_client, url, cache_key, refresh):
+        pages.append(url)
+        return PROFILE_HTML if url.endswith("/spazznolo/") else "<html></html>"
+
+    monkeypatch.setattr(ingest, "_fetch_page", fake_fetch)
+    monkeypatch.setattr(ingest, "sleep_seconds", lambda *_: None)
+
+    ingest.ingest_user("spazznolo", cfg, refresh=True, include_diary=False, include_likes=False)
+    result = ingest.ingest_user("spazznolo", cfg, refresh=False, include_diary=False, include_likes=False)
+
+    assert result.skipped is False
+    assert len(pages) == 6
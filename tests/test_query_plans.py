@@ -0,0 +1,206 @@
+import inspect
+import random
+
+import pytest
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+
+USERS = 60
+FILMS = 400
+FILMS_PER_USER = 80
+FOLLOWEES = list(range(2, 30))
+
+# Plan details a query may show, and why. Anything else that reads a table
+# without an index (``SCAN x``, or ``SEARCH x`` with no ``USING``) or sorts
+# into a temp b-tree fails.
+ALLOWED = {
+    # Watched or watchlisted rows of every user: nearly all of interactions, and
+    # more than the watched-only partial index holds, so the clustered table is
+    # walked once. test_social_rows_all_scans_interactions_once pins the rest.
+    "select_social_rows_all": {"SCAN i"},
+    # Whole-table reads: every row is returned, so a scan is the plan.
+    "select_watched_overlaps_all": {"SCAN i"},
+    "select_film_slugs_by_title_year": {"SCAN films"},
+    "select_uri_slugs": {"SCAN letterboxd_uris"},
+    "select_user_counts": {"SCAN users"},
+    "select_graph_edge_ids": {"SCAN graph_edges"},
+    "select_follow_adjacency": {"SCAN e", "USE TEMP B-TREE FOR ORDER BY"},
+    # sqlite_sequence holds one row per AUTOINCREMENT table.
+    "select_dataset_version": {"SCAN sqlite_sequence"},
+    # MIN(rowid) reads one end of the table b-tree.
+    "select_oldest_change": {"SEARCH change_log"},
+    # MIN over change_cursors (one row per consumer). Without consumers, the
+    # walk from the oldest entry stops at the first one inside the retention
+    # window, so it only reads the entries it deletes.
+    "prune_change_log": {"SEARCH change_cursors", "SCAN change_log", "SCAN sqlite_sequence"},
+    # One-off build of a root's pairs: a join keyed by film, grouped by user.
+    "ensure_similarity_root": {"USE TEMP B-TREE FOR GROUP BY"},
+    # Sorts one user's followees by popularity.
+    "select_followees_for_ingest": {"USE TEMP B-TREE FOR ORDER BY"},
+    "select_missing_followees": {"USE TEMP B-TREE FOR ORDER BY"},
+}
+
+CASES = {
+    "select_refresh_state": lambda conn: repo.select_refresh_state(conn, "u0"),
+    "select_user_ids": lambda conn: repo.select_user_ids(conn, ["u1", "u2"]),
+    "select_film_ids": lambda conn: repo.select_film_ids(conn, ["f1", "f2"]),
+    "select_film_slugs_by_title_year": repo.select_film_slugs_by_title_year,
+    "select_uri_slugs": repo.select_uri_slugs,
+    "select_page_fingerprints": lambda conn: repo.select_page_fingerprints(conn, "u0"),
+    "select_consecutive_failures": lambda conn: repo.select_consecutive_failures(conn, "u0"),
+    "select_backed_off_usernames": repo.select_backed_off_usernames,
+    "select_checkpoint": lambda conn: repo.select_checkpoint(conn, "graph:u0"),
+    "select_followee_ids": lambda conn: repo.select_followee_ids(conn, 1),
+    "select_graph_sources": repo.select_graph_sources,
+    "select_followees_for_ingest": lambda conn: repo.select_followees_for_ingest(conn, "u0", 0, 0),
+    "select_missing_followees": lambda conn: repo.select_missing_followees(conn, "u0", 0, 0),
+    "select_social_rows_all": lambda conn: repo.select_social_rows(conn, "u0"),
+    "select_social_rows": lambda conn: repo.select_social_rows(conn, "u0", FOLLOWEES),
+    "ensure_similarity_root": lambda conn: repo.ensure_similarity_root(conn, "u1"),
+    "select_similarity_rows": lambda conn: repo.select_similarity_rows(conn, "u0"),
+    "select_user_watchlist": lambda conn: repo.select_user_watchlist(conn, "u0"),
+    "select_all_usernames": repo.select_all_usernames,
+    "select_root_usernames": repo.select_root_usernames,
+    "select_refresh_stats": repo.select_refresh_stats,
+    "select_user_counts": repo.select_user_counts,
+    "select_follow_adjacency": repo.select_follow_adjacency,
+    "select_watched_overlaps_all": lambda conn: repo.select_watched_overlaps(conn, "u0"),
+    "select_watched_overlaps": lambda conn: repo.select_watched_overlaps(conn, "u0", ["u1", "u2"]),
+    "select_graph_edge_ids": repo.select_graph_edge_ids,
+    "count_user_interactions": lambda conn: repo.count_user_interactions(conn, 1),
+    "select_user_id": lambda conn: repo.select_user_id(conn, "u0"),
+    "select_user_rating_stats": lambda conn: repo.select_user_rating_stats(conn, FOLLOWEES),
+    "select_shared_ratings": lambda conn: repo.select_shared_ratings(conn, 1, FOLLOWEES),
+    "select_shared_rated_films": lambda conn: repo.select_shared_rated_films(conn, 1, 2),
+    "select_watched_count": lambda conn: repo.select_watched_count(conn, "u0"),
+    "select_followee_watched_count": lambda conn: repo.select_followee_watched_count(conn, 2),
+    "select_followee_watched_counts": lambda conn: repo.select_followee_watched_counts(conn, FOLLOWEES),
+    "select_user_names": lambda conn: repo.select_user_names(conn, FOLLOWEES),
+    "select_following_count": lambda conn: repo.select_following_count(conn, "u0"),
+    "select_film_slugs": lambda conn: repo.select_film_slugs(conn, [1, 2, 3]),
+    "select_available_film_ids": lambda conn: repo.select_available_film_ids(
+        conn, [1, 2, 3], "netflix", "CA"
+    ),
+    "select_availability_map": lambda conn: repo.select_availability_map(conn, [1, 2], ["netflix"]),
+    "tombstone_graph_edges": lambda conn: repo.tombstone_graph_edges(conn, 1, [2, 3]),
+    "set_crawled_following": lambda conn: repo.set_crawled_following(conn, 1, 30),
+    "record_refresh": lambda conn: repo.record_refresh(conn, 1, 5),
+    "select_dataset_version": repo.select_dataset_version,
+    "select_changes_since": lambda conn: repo.select_changes_since(conn, 10, ["interaction"]),
+    "select_oldest_change": repo.select_oldest_change,
+    "select_change_cursor": lambda conn: repo.select_change_cursor(conn, "recommendations"),
+    "select_recommendations": lambda conn: repo.select_recommendations(conn, 1, "social:x:1"),
+    "prune_change_log": repo.prune_change_log,
+    "delete_checkpoint": lambda conn: repo.delete_checkpoint(conn, "graph:u0"),
+    "delete_user_by_username": lambda conn: repo.delete_user_by_username(conn, "u5"),
+}
+
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("plans") / "plans.sqlite")
+    ensure_db(path)
+    rng = random.Random(0)
+    with repo.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO users (username, follower_count, watched_count) VALUES (?, ?, ?)",
+            [(f"u{n}", rng.randint(0, 999), rng.randint(0, 999)) for n in range(USERS)],
+        )
+        conn.executemany(
+            "INSERT INTO films (letterboxd_id, title, year) VALUES (?, ?, ?)",
+            [(f"f{n}", f"Film {n}", 2000 + n % 20) for n in range(FILMS)],
+        )
+        conn.executemany(
+            """
+            INSERT INTO interactions (user_id, film_id, rating_half, flags)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (
+                    user,
+                    film,
+                    rng.choice([None, 6, 9]),
+                    repo.pack_flags(False, rng.random() < 0.8, rng.random() < 0.2),
+                )
+                for user in range(1, USERS + 1)
+                for film in rng.sample(range(1, FILMS + 1), FILMS_PER_USER)
+            ],
+        )
+        for dst in FOLLOWEES:
+            repo.upsert_graph_edge(conn, 1, dst, 1)
+            repo.upsert_graph_edge(conn, dst, dst + 30, 2)
+        repo.upsert_page_fingerprints(conn, 1, {"https://letterboxd.com/u0/films/": "abc"})
+        repo.upsert_fetch_outcome(conn, "u9", 404, "not_found", 1, 24.0)
+        repo.upsert_film_availability_flags(conn, 1, "CA", {"netflix": True})
+        repo.ensure_similarity_root(conn, "u0")
+        conn.commit()
+    return path
+
+
+def _plans(db_path: str, case) -> list[tuple[str, list[str]]]:
+    statements: list[str] = []
+    with repo.connect(db_path) as conn:
+        conn.set_trace_callback(statements.append)
+        case(conn)
+        conn.set_trace_callback(None)
+        plans = [
+            (sql, [str(row[3]) for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")])
+            for sql in statements
+            if sql.lstrip().split(None, 1)[0].upper() in {"SELECT", "UPDATE", "DELETE", "INSERT"}
+        ]
+        conn.rollback()
+    return plans
+
+
+def _violations(details: list[str], allowed: set[str]) -> list[str]:
+    bad = []
+    for detail in details:
+        full_scan = detail.startswith(("SCAN ", "SEARCH ")) and " USING " not in detail
+        if (full_scan or "TEMP B-TREE" in detail) and detail not in allowed:
+            bad.append(detail)
+    return bad
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_repo_query_uses_indexes(db_path, name) -> None:
+    plans = _plans(db_path, CASES[name])
+    assert plans, f"{name} ran no SQL"
+    for sql, details in plans:
+        assert not _violations(details, ALLOWED.get(name, set())), (
+            f"{name}: {' '.join(sql.split())}\n" + "\n".join(details)
+        )
+
+
+def test_every_repo_query_has_a_plan_case() -> None:
+    queries = {
+        name
+        for name, fn in inspect.getmembers(repo, inspect.isfunction)
+        if fn.__module__ == repo.__name__
+        and name.startswith(("select_", "count_", "delete_"))
+    }
+    # Column introspection only; delete_user_data runs under delete_user_by_username.
+    covered = set(CASES) | {"select_availability_columns", "delete_user_data"}
+    assert queries <= covered, sorted(queries - covered)
+
+
+def test_similarity_and_stats_reads_use_their_indexes(db_path) -> None:
+    expected = {
+        "ensure_similarity_root": "COVERING INDEX idx_interactions_watched_film",
+        "select_similarity_rows": "SEARCH user_pair_stats USING PRIMARY KEY",
+        "select_shared_ratings": "SEARCH i2 USING PRIMARY KEY (user_id=? AND film_id=?)",
+        "select_user_rating_stats": "SEARCH user_stats",
+        "select_watched_count": "SEARCH s",
+        "select_followee_watched_counts": "SEARCH s",
+    }
+    for name, index in expected.items():
+        details = [d for _sql, plan in _plans(db_path, CASES[name]) for d in plan]
+        assert any(index in detail for detail in details), (name, details)
+
+
+def test_social_rows_all_scans_interactions_once(db_path) -> None:
+    details = [d for _sql, plan in _plans(db_path, CASES["select_social_rows_all"]) for d in plan]
+    assert [d for d in details if d.startswith("SCAN ")] == ["SCAN i"]
+    # Films and the root's own watched films are looked up per row, not scanned.
+    assert "SEARCH f USING INTEGER PRIMARY KEY (rowid=?)" in details
+    assert "SEARCH interactions USING PRIMARY KEY (user_id=?)" in details
@@ -0,0 +1,92 @@
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+from letterboxd_recs.ingest.letterboxd.schedule import (
+    REFRESH_REQUESTS,
+    RefreshCandidate,
+    plan_refresh,
+    rank_refresh_candidates,
+)
+
+
+def test_rank_refresh_candidates_prefers_similar_stale_active_users(tmp_path) -> None:
+    db_path = tmp_path / "test.sqlite"
+    ensure_db(str(db_path))
+
+    film = FilmItem("film-a", "Film A", 2020, None, False, True, None, False)
+    with repo.connect(str(db_path)) as conn:
+        film_id = repo.upsert_film(conn, film)
+        for name, days, rate in (
+            ("similar-stale", 30, 1.0),
+            ("similar-fresh", 0, 1.0),
+            ("dissimilar-stale", 30, 1.0),
+        ):
+            user_id = repo.upsert_user_stats(conn, name, None, 10, 10, 500)
+            repo.upsert_interaction(conn, user_id, film_id, film)
+            conn.execute(
+                "UPDATE users SET refreshed_at = datetime('now', ?), activity_rate = ? WHERE id = ?",
+                (f"-{days} days", rate, user_id),
+            )
+        repo.upsert_user_stats(conn, "never-ingested", None, 10, 10, 144)
+        conn.commit()
+
+        ranked = rank_refresh_candidates(
+            conn,
+            {"similar-stale": 0.9, "similar-fresh": 0.9, "dissimilar-stale": 0.1},
+        )
+
+    names = [c.username for c in ranked]
+    assert names.index("similar-stale") < names.index("dissimilar-stale")
+    assert names.index("similar-stale") < names.index("similar-fresh")
+    by_name = {c.username: c for c in ranked}
+    assert by_name["similar-stale"].requests == REFRESH_REQUESTS
+    assert by_name["never-ingested"].full_ingest is True
+    assert by_name["never-ingested"].requests > REFRESH_REQUESTS
+
+
+def test_record_refresh_tracks_activity_rate(tmp_path) -> None:
+    db_path = tmp_path / "test.sqlite"
+    ensure_db(str(db_path))
+
+    with repo.connect(str(db_path)) as conn:
+        user_id = repo.ensure_user(conn, "u")
+        repo.record_refresh(conn, user_id, 100)
+        row = conn.execute("SELECT refreshed_at, activity_rate FROM users WHERE id = ?", (user_id,)).fetchone()
+        assert row["refreshed_at"] is not None
+        assert row["activity_rate"] is None
+
+        conn.execute("UPDATE users SET refreshed_at = datetime('now', '-10 days') WHERE id = ?", (user_id,))
+        repo.record_refresh(conn, user_id, 5)
+        rate = conn.execute("SELECT activity_rate FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+
+    assert abs(rate - 0.5) < 0.01
+
+
+def test_plan_refresh_respects_request_and_time_budget() -> None:
+    candidates = [
+        _candidate("a", score=5.0, requests=3),
+        _candidate("b", score=4.0, requests=20),
+        _candidate("c", score=3.0, requests=3),
+        _candidate("d", score=2.0, requests=3),
+    ]
+
+    planned = plan_refresh(candidates, max_requests=10)
+    assert [c.username for c in planned] == ["a", "c", "d"]
+
+    planned = plan_refresh(candidates, max_seconds=12, seconds_per_request=2.0)
+    assert [c.username for c in planned] == ["a", "c"]
+
+    assert len(plan_refresh(candidates)) == 4
+
+
+def _candidate(name: str, score: float, requests: int) -> RefreshCandidate:
+    return RefreshCandidate(
+        username=name,
+        score=score,
+        value=score * requests,
+        requests=requests,
+        similarity=1.0,
+        staleness_days=1.0,
+        activity_rate=1.0,
+        full_ingest=False,
+    )
@@ -0,0 +1,76 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from letterboxd_recs.ingest.letterboxd import ingest
+from letterboxd_recs.ingest.letterboxd.rss import parse_rss
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PROFILE_HTML = (FIXTURES / "profile.html").read_text(encoding="utf-8")
+RSS_XML = (FIXTURES / "rss.xml").read_text(encoding="utf-8")
+
+
+def test_parse_rss_maps_diary_entries_and_skips_lists() -> None:
+    entries = parse_rss(RSS_XML)
+
+    assert [e.item.slug for e in entries] == [
+        "the-holdovers",
+        "jay-kelly",
+        "the-thursday-murder-club",
+        "hypernormalisation",
+    ]
+    first = entries[0]
+    assert first.entry == "/spazznolo/film/the-holdovers/2/"
+    assert first.rewatch is True
+    assert first.item.title == "The Holdovers"
+    assert first.item.year == 2023
+    assert first.item.rating == 4.0
+    assert first.item.liked is True
+    assert first.item.watched is True
+    assert first.item.watch_date == "2025-12-14"
+    assert entries[2].item.rating is None
+    assert entries[2].item.liked is False
+
+
+def _state(signature: str, latest: str):
+    return {"refresh_signature": signature, "latest_diary_entry": latest}
+
+
+def _client(xml_text: str):
+    return SimpleNamespace(
+        fetch_html=lambda url, cache_key, refresh: SimpleNamespace(content=xml_text)
+    )
+
+
+def test_collect_rss_uses_feed_when_window_reaches_last_entry() -> None:
+    profile = ingest.parse_profile("spazznolo", PROFILE_HTML)
+    state = _state("366|415|x", "/spazznolo/film/the-thursday-murder-club/")
+
+    items = ingest._collect_rss("spazznolo", _client(RSS_XML), True, state, profile)
+
+    assert items is not None
+    assert {item.slug for item in items} == {
+        "the-holdovers",
+        "jay-kelly",
+        "the-thursday-murder-club",
+        "hypernormalisation",
+    }
+
+
+def test_collect_rss_falls_back_when_window_misses_last_entry() -> None:
+    profile = ingest.parse_profile("spazznolo", PROFILE_HTML)
+    state = _state("366|415|x", "/spazznolo/film/ida/")
+
+    assert ingest._collect_rss("spazznolo", _client(RSS_XML), True, state, profile) is None
+
+
+def test_collect_rss_falls_back_when_films_were_marked_without_diary() -> None:
+    profile = ingest.parse_profile("spazznolo", PROFILE_HTML)
+    # Only one first watch (jay-kelly) is newer than the known entry, but 3 films were added.
+    state = _state("364|415|x", "/spazznolo/film/the-thursday-murder-club/")
+
+    assert ingest._collect_rss("spazznolo", _client(RSS_XML), True, state, profile) is None
+
+
+def test_collect_rss_requires_known_entry() -> None:
+    profile = ingest.parse_profile("spazznolo", PROFILE_HTML)
+    assert ingest._collect_rss("spazznolo", _client(RSS_XML), True, None, profile) is None
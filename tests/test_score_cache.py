@@ -0,0 +1,93 @@
+from dataclasses import replace
+from pathlib import Path
+
+from letterboxd_recs.config import load_config
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+from letterboxd_recs.models import score_cache
+
+
+def _film(slug: str, watched: bool = True, rating: float | None = None) -> FilmItem:
+    return FilmItem(slug, slug.title(), 2020, rating, False, watched, None, False)
+
+
+def test_scores_are_cached_per_config_and_dataset_version(tmp_path, monkeypatch) -> None:
+    cfg = load_config(Path("config.example.toml"))
+    cfg = replace(cfg, app=replace(cfg.app, database_path=str(tmp_path / "test.sqlite")))
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        root = repo.ensure_user(conn, "root")
+        friend = repo.upsert_user_stats(conn, "friend", None, 200, 10, 100)
+        repo.upsert_graph_edge(conn, root, friend, 1)
+        repo.upsert_interactions(conn, root, [_film("shared", rating=4.0)])
+        repo.upsert_interactions(
+            conn, friend, [_film("shared", rating=4.5), _film("a"), _film("b", rating=5.0)]
+        )
+        conn.commit()
+
+    computed: list[str] = []
+    compute = score_cache.compute_social_scores
+
+    def counting_compute(db_path, username, **kwargs):
+        computed.append(username)
+        return compute(db_path, username, **kwargs)
+
+    monkeypatch.setattr(score_cache, "compute_social_scores", counting_compute)
+
+    first = score_cache.cached_social_scores(cfg, "root")
+    assert computed == ["root"] and first
+    second = score_cache.cached_social_scores(cfg, "root")
+    assert computed == ["root"]
+    assert {s.film_id: (s.title, s.score) for s in second} == {
+        s.film_id: (s.title, s.score) for s in first
+    }
+
+    score_cache.cached_social_scores(cfg, "root", recompute=True)
+    assert len(computed) == 2
+
+    # Re-ingesting unchanged rows keeps the dataset version; a new rating bumps it.
+    with repo.connect(cfg.database_path) as conn:
+        version = repo.select_dataset_version(conn)
+        repo.upsert_interactions(conn, friend, [_film("a")])
+        assert repo.select_dataset_version(conn) == version
+        repo.upsert_interactions(conn, friend, [_film("a", rating=1.0)])
+        assert repo.select_dataset_version(conn) > version
+        conn.commit()
+    score_cache.cached_social_scores(cfg, "root")
+    assert len(computed) == 3
+
+    changed = replace(cfg, graph=replace(cfg.graph, influence_weight=0.5))
+    assert score_cache.scoring_hash(changed) != score_cache.scoring_hash(cfg)
+    score_cache.cached_social_scores(changed, "root")
+    assert len(computed) == 4
+    with repo.connect(cfg.database_path) as conn:
+        versions = conn.execute("SELECT DISTINCT model_version FROM recommendations").fetchall()
+    assert len(versions) == 1
+
+
+def test_scores_are_not_stored_when_a_write_lands_while_scoring(tmp_path, monkeypatch) -> None:
+    cfg = load_config(Path("config.example.toml"))
+    cfg = replace(cfg, app=replace(cfg.app, database_path=str(tmp_path / "test.sqlite")))
+    ensure_db(cfg.database_path)
+    with repo.connect(cfg.database_path) as conn:
+        root = repo.ensure_user(conn, "root")
+        friend = repo.upsert_user_stats(conn, "friend", None, 200, 10, 100)
+        repo.upsert_graph_edge(conn, root, friend, 1)
+        repo.upsert_interactions(conn, root, [_film("shared", rating=4.0)])
+        repo.upsert_interactions(conn, friend, [_film("shared", rating=4.5), _film("a")])
+        conn.commit()
+
+    compute = score_cache.compute_social_scores
+
+    def racing_compute(db_path, username, **kwargs):
+        results = compute(db_path, username, **kwargs)
+        with repo.connect(db_path) as conn:
+            repo.upsert_interactions(conn, friend, [_film("b", rating=5.0)])
+            conn.commit()
+        return results
+
+    monkeypatch.setattr(score_cache, "compute_social_scores", racing_compute)
+    assert score_cache.cached_social_scores(cfg, "root")
+    with repo.connect(cfg.database_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0] == 0
@@ -41,3 +41,31 @@ def _film(slug: str, title: str, year: int, watched: bool = False):
         watch_date=None,
         watchlist=False,
     )
+
+
+
+
+def test_graph_influence_factor_favours_reachable_users(tmp_path) -> None:
+    from letterboxd_recs.config import GraphConfig
+    from letterboxd_recs.models.social_simple import _apply_influence
+
+    db_path = tmp_path / "test.sqlite"
+    ensure_db(str(db_path))
+
+    with repo.connect(str(db_path)) as conn:
+        root_id = repo.ensure_user(conn, "root")
+        u1 = repo.upsert_user_stats(conn, "u1", "U1", 200, 10, 100)
+        u2 = repo.upsert_user_stats(conn, "u2", "U2", 200, 10, 100)
+        # Only u2 is in the root's follow graph; u1 was found some other way.
+        repo.upsert_graph_edge(conn, root_id, u2, 1)
+        conn.commit()
+
+    sim_map = {u1: 1.0, u2: 0.5}
+    assert _apply_influence(str(db_path), root_id, sim_map, GraphConfig(max_depth=2, decay=0.5)) == sim_map
+    blended = _apply_influence(
+        str(db_path),
+        root_id,
+        sim_map,
+        GraphConfig(max_depth=2, decay=0.5, influence_weight=0.5),
+    )
+    assert blended == {u1: 0.5, u2: 0.5}
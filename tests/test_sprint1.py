@@ -201,6 +201,7 @@ def test_collect_paginated_calls_parser_and_stops(monkeypatch) -> None:
 
     class DummyClient:
         scrape = DummyScrape()
+        limiter = None
 
         @staticmethod
         def cache_key(url: str) -> str:
@@ -0,0 +1,95 @@
+import pytest
+
+from letterboxd_recs.db import repo
+from letterboxd_recs.db.conn import ensure_db
+from letterboxd_recs.ingest.letterboxd.parse import FilmItem
+
+AGGREGATE = """
+    SELECT
+        user_id,
+        SUM(watched IS 1),
+        COUNT(rating),
+        COALESCE(SUM(rating), 0),
+        COALESCE(SUM(rating * rating), 0),
+        SUM(watchlist IS 1),
+        MAX(watch_date)
+    FROM interactions
+    GROUP BY user_id
+    ORDER BY user_id
+"""
+
+
+def _stats(conn):
+    rows = conn.execute(
+        """
+        SELECT user_id, watched_count, rated_count, rating_sum, rating_sq_sum,
+               watchlist_count, last_watch_date
+        FROM user_stats
+        ORDER BY user_id
+        """
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _item(slug, rating=None, watched=True, watchlist=False, watch_date=None):
+    return FilmItem(slug, slug.title(), 2020, rating, False, watched, watch_date, watchlist)
+
+
+def test_triggers_keep_user_stats_in_sync(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        alice = repo.ensure_user(conn, "alice")
+        bob = repo.ensure_user(conn, "bob")
+        repo.upsert_interactions(
+            conn,
+            alice,
+            [
+                _item("a", 4.0, watch_date="2024-01-02"),
+                _item("b", 2.5, watch_date="2024-03-01"),
+                _item("c", watched=False, watchlist=True),
+            ],
+        )
+        repo.upsert_interactions(conn, bob, [_item("a", 3.5), _item("b")])
+        assert _stats(conn) == [tuple(row) for row in conn.execute(AGGREGATE)]
+        assert _stats(conn)[0] == (alice, 2, 2, 6.5, 22.25, 1, "2024-03-01")
+
+        # Re-ingest: a new rating, a watchlist film watched, and an unchanged row.
+        repo.upsert_interactions(
+            conn,
+            alice,
+            [_item("b", 3.0), _item("c", 5.0, watch_date="2024-05-05"), _item("a", 4.0)],
+        )
+        assert _stats(conn) == [tuple(row) for row in conn.execute(AGGREGATE)]
+
+        conn.execute(
+            "DELETE FROM interactions WHERE user_id = ? AND watch_date = '2024-05-05'",
+            (alice,),
+        )
+        assert _stats(conn)[0][6] == "2024-03-01"
+        assert _stats(conn) == [tuple(row) for row in conn.execute(AGGREGATE)]
+
+        repo.delete_user_data(conn, bob)
+        assert [row[0] for row in _stats(conn)] == [alice]
+
+        assert repo.select_user_rating_stats(conn, [alice]) == {
+            alice: pytest.approx((3.5, 0.5))
+        }
+        assert repo.select_watched_count(conn, "alice") == 2
+
+
+def test_ensure_db_backfills_user_stats(tmp_path) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        alice = repo.ensure_user(conn, "alice")
+        repo.upsert_interactions(conn, alice, [_item("a", 4.0), _item("b", 2.0)])
+        expected = _stats(conn)
+        # An unversioned database from before user_stats existed.
+        conn.execute("DELETE FROM user_stats")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+
+    ensure_db(db_path)
+    with repo.connect(db_path) as conn:
+        assert _stats(conn) == expected
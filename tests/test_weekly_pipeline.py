@@ -13,38 +13,56 @@ def test_refresh_similarity_pool_uses_shallow_ingest_and_skips_failures(
 
     with repo.connect(str(db_path)) as conn:
         repo.ensure_user(conn, "base-user")
+        repo.ensure_user(conn, "known-user")
         conn.commit()
 
     cfg = SimpleNamespace(
         database_path=str(db_path),
         social_similarity=SimpleNamespace(),
+        scrape=SimpleNamespace(workers=1, rate_limit_seconds=0),
     )
     scores = [SimpleNamespace(username="base-user", similarity=1.0)]
-    followees = iter(
-        [
-            SimpleNamespace(
-                username="blocked-user",
-                display_name="Blocked User",
-                followers=10,
-                following=10,
-                watched=10,
-            ),
-            SimpleNamespace(
-                username="good-user",
-                display_name="Good User",
-                followers=10,
-                following=10,
-                watched=10,
-            ),
-        ]
-    )
+    followees = [
+        SimpleNamespace(
+            username="known-user",
+            display_name="Known User",
+            followers=10,
+            following=10,
+            watched=500,
+        ),
+        SimpleNamespace(
+            username="blocked-user",
+            display_name="Blocked User",
+            followers=10,
+            following=10,
+            watched=10,
+        ),
+        SimpleNamespace(
+            username="good-user",
+            display_name="Good User",
+            followers=10,
+            following=10,
+            watched=10,
+        ),
+    ]
+    harvests: list[bool] = []
     ingest_calls: list[tuple[str, bool]] = []
 
     monkeypatch.setattr(cli, "compute_similarity_scores", lambda *args, **kwargs: scores)
-    monkeypatch.setattr(cli, "_random_followee", lambda username, cfg: next(followees, None))
+
+    limiters = []
+
+    def fake_harvest(username, cfg, budget=None, fetch=True, limiter=None):
+        harvests.append(fetch)
+        if fetch:
+            limiters.append(limiter)
+        return followees if fetch else []
+
+    monkeypatch.setattr(cli, "harvest_following", fake_harvest)
 
     def fake_ingest_user(username, cfg, refresh, **kwargs):
         ingest_calls.append((username, refresh))
+        limiters.append(kwargs["limiter"])
         if username == "blocked-user":
             raise RuntimeError("blocked")
         return SimpleNamespace()
@@ -63,4 +81,11 @@ def test_refresh_similarity_pool_uses_shallow_ingest_and_skips_failures(
         ("blocked-user", True),
         ("good-user", True),
     ]
+    # One cached pass and a single fetched page yield every candidate.
+    assert harvests == [False, True]
+    # Discovery fetches and followee ingests are paced by the same limiter.
+    assert limiters[0] is not None
+    assert all(limiter is limiters[0] for limiter in limiters)
+    with repo.connect(str(db_path)) as conn:
+        assert repo.select_follow_adjacency(conn) == {"base-user": ["blocked-user", "good-user"]}
 